@@ -6,10 +6,20 @@ from .assets import router as assets_router
 from .segments import router as segments_router
 from .notes import router as notes_router
 from .ogc import router as ogc_router
+from .zones import router as zones_router
+from .viewer import router as viewer_router
+from .internal import router as internal_router
+from .images import router as images_router
+from .sprites import router as sprites_router
 
 __all__ = [
     "assets_router",
     "segments_router",
     "notes_router",
-    "ogc_router"
+    "ogc_router",
+    "zones_router",
+    "viewer_router",
+    "internal_router",
+    "images_router",
+    "sprites_router"
 ]
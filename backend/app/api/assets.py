@@ -3,18 +3,36 @@ Tarihi Yarimada CBS - Assets API
 /api/v1/assets endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+import tempfile
+from dataclasses import asdict
+
+from anyio import to_thread
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from sqlalchemy import func, text
-from typing import Optional, List
+from typing import Optional, List, Union
 
+from ..config import get_settings
 from ..db.database import get_db
 from ..db.models import HeritageAsset, AssetSegment, Actor, AssetActor, Media
 from ..schemas.asset import (
     AssetCreate, AssetUpdate, AssetResponse, AssetWithLocation,
-    AssetFeatureCollection, AssetGeoJSONFeature, AssetGeoJSONProperties,
-    GeoJSONGeometry, ActorResponse, MediaResponse, DatasetMetadataResponse
+    AssetFeatureCollection, ActorResponse, MediaResponse, DatasetMetadataResponse,
+    AssetSelectRequest, AssetSelectIds, SelectionOutput, Language,
+    ImportFormat, AssetImportResult
+)
+from ..services.zones import refresh_asset_zones, ZONE_FILTER_SQL
+from ..services.images import get_image_pipeline
+from ..services.uploads import get_upload_store, UploadError
+from ..services.asset_import import import_assets, ImportReport
+from ..services.selection import prepare_selection_geometry, build_selection_sql
+from ..services.read_models import (
+    ha, asset_select, filter_assets, project_fields, fetch_rows,
+    rows_to_json, row_to_json
 )
+from ..core.cache import invalidate_on_commit
+from ..core.responses import dumps, json_response
 
 router = APIRouter(prefix="/api/v1/assets", tags=["assets"])
 
@@ -56,18 +74,62 @@ def asset_to_response(asset: HeritageAsset, include_location: bool = False) -> d
     return response
 
 
-def get_asset_coordinates(db: Session, asset_id: int) -> tuple:
-    """Get asset coordinates from PostGIS geometry"""
-    result = db.execute(
-        text("""
-            SELECT ST_X(location) as lon, ST_Y(location) as lat
-            FROM heritage_assets WHERE id = :id
-        """),
-        {"id": asset_id}
-    ).fetchone()
-    if result:
-        return result.lon, result.lat
-    return None, None
+def _response_fields(fields: Optional[str], lang: Optional[Language]) -> tuple:
+    """Validated ?fields= / ?lang= projection (400 on unknown fields)"""
+    try:
+        return project_fields(fields, lang.value if lang else None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def row_to_geojson_feature(row, name_field: str = "name_tr") -> dict:
+    """
+    Convert a GEOJSON_SELECT_SQL row to a GeoJSON Feature (AssetGeoJSONFeature).
+
+    Built as a plain dict: the column types already match the schema, so
+    the feature is serialized directly instead of validated per row.
+    """
+    return {
+        "type": "Feature",
+        "id": row.identifier,
+        "geometry": {"type": "Point", "coordinates": [row.lon, row.lat]},
+        "properties": {
+            "identifier": row.identifier,
+            name_field: getattr(row, name_field),
+            "asset_type": row.asset_type,
+            "historical_period": row.historical_period,
+            "construction_year": row.construction_year,
+            "protection_status": row.protection_status,
+            "model_type": row.model_type,
+            "segment_count": row.segment_count
+        }
+    }
+
+
+def feature_collection_response(rows, name_field: str = "name_tr") -> Response:
+    """AssetFeatureCollection JSON for GEOJSON_SELECT_SQL rows"""
+    return json_response(dumps({
+        "type": "FeatureCollection",
+        "crs": {"type": "name", "properties": {"name": "EPSG:4326"}},
+        "features": [row_to_geojson_feature(row, name_field) for row in rows]
+    }))
+
+
+# GeoJSON features carry one name: Turkish unless ?lang=en
+GEOJSON_NAME_FIELDS = {Language.TR: "name_tr", Language.EN: "name_en"}
+
+GEOJSON_SELECT_TEMPLATE = """
+    SELECT
+        ha.id, ha.identifier, ha.{name_field}, ha.asset_type,
+        ha.historical_period, ha.construction_year,
+        ha.protection_status, ha.model_type,
+        ST_X(ha.location) as lon, ST_Y(ha.location) as lat,
+        COUNT(s.id) as segment_count
+    FROM heritage_assets ha
+    LEFT JOIN asset_segments s ON s.asset_id = ha.id
+    WHERE 1=1
+"""
+GEOJSON_SELECT_SQL = GEOJSON_SELECT_TEMPLATE.format(name_field="name_tr")
 
 
 # ==================================================
@@ -75,12 +137,15 @@ def get_asset_coordinates(db: Session, asset_id: int) -> tuple:
 # ==================================================
 
 @router.get("", response_model=List[AssetWithLocation])
-async def get_assets(
+def get_assets(
     asset_type: Optional[str] = None,
     historical_period: Optional[str] = None,
     neighborhood: Optional[str] = None,
     protection_status: Optional[str] = None,
+    zone_id: Optional[int] = None,
     search: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated response fields"),
+    lang: Optional[Language] = None,
     limit: int = Query(default=100, le=1000),
     offset: int = Query(default=0, ge=0),
     db: Session = Depends(get_db)
@@ -92,62 +157,43 @@ async def get_assets(
     - **historical_period**: Filter by period (bizans, osmanli_klasik, etc.)
     - **neighborhood**: Filter by neighborhood
     - **protection_status**: Filter by protection status
+    - **zone_id**: Filter by protection zone membership
     - **search**: Search in name fields
+    - **fields**: Return only these fields, e.g. `id,name_tr,longitude,latitude`
+    - **lang**: `tr` or `en` - omit the other language's name/description
     """
-    query = db.query(HeritageAsset)
-
-    if asset_type:
-        query = query.filter(func.lower(HeritageAsset.asset_type) == asset_type.lower())
-    if historical_period:
-        query = query.filter(func.lower(HeritageAsset.historical_period) == historical_period.lower())
-    if neighborhood:
-        query = query.filter(func.lower(HeritageAsset.neighborhood) == neighborhood.lower())
-    if protection_status:
-        query = query.filter(HeritageAsset.protection_status.ilike(f"%{protection_status}%"))
-    if search:
-        query = query.filter(
-            HeritageAsset.name_tr.ilike(f"%{search}%") |
-            HeritageAsset.name_en.ilike(f"%{search}%")
-        )
-
-    assets = query.offset(offset).limit(limit).all()
-
-    # Koordinatları ekle
-    result = []
-    for asset in assets:
-        asset_dict = asset_to_response(asset)
-        lon, lat = get_asset_coordinates(db, asset.id)
-        asset_dict['longitude'] = lon
-        asset_dict['latitude'] = lat
-        result.append(asset_dict)
-
-    return result
+    stmt = filter_assets(
+        asset_select(_response_fields(fields, lang)),
+        asset_type=asset_type,
+        historical_period=historical_period,
+        neighborhood=neighborhood,
+        protection_status=protection_status,
+        zone_id=zone_id,
+        search=search
+    )
+    rows = fetch_rows(db, stmt.order_by(ha.c.id).offset(offset).limit(limit))
+    return json_response(rows_to_json(rows))
 
 
 @router.get("/geojson", response_model=AssetFeatureCollection)
-async def get_assets_geojson(
+def get_assets_geojson(
     asset_type: Optional[str] = None,
     historical_period: Optional[str] = None,
     bbox: Optional[str] = None,
+    zone_id: Optional[int] = None,
+    lang: Optional[Language] = None,
     db: Session = Depends(get_db)
 ):
     """
     Get assets as GeoJSON FeatureCollection.
 
     - **bbox**: Bounding box filter (west,south,east,north)
+    - **zone_id**: Filter by protection zone membership
+    - **lang**: `tr` (default) or `en` - which name the features carry
     """
     # Build query with coordinates
-    sql = """
-        SELECT
-            ha.id, ha.identifier, ha.name_tr, ha.asset_type,
-            ha.historical_period, ha.construction_year,
-            ha.protection_status, ha.model_type,
-            ST_X(ha.location) as lon, ST_Y(ha.location) as lat,
-            COUNT(s.id) as segment_count
-        FROM heritage_assets ha
-        LEFT JOIN asset_segments s ON s.asset_id = ha.id
-        WHERE 1=1
-    """
+    name_field = GEOJSON_NAME_FIELDS[lang] if lang else "name_tr"
+    sql = GEOJSON_SELECT_TEMPLATE.format(name_field=name_field)
     params = {}
 
     if asset_type:
@@ -166,30 +212,56 @@ async def get_assets_geojson(
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid bbox format. Use: west,south,east,north")
 
+    if zone_id:
+        sql += ZONE_FILTER_SQL
+        params["zone_id"] = zone_id
+
     sql += " GROUP BY ha.id"
 
-    result = db.execute(text(sql), params)
-    rows = result.fetchall()
-
-    features = []
-    for row in rows:
-        feature = AssetGeoJSONFeature(
-            id=row.identifier,
-            geometry=GeoJSONGeometry(coordinates=[row.lon, row.lat]),
-            properties=AssetGeoJSONProperties(
-                identifier=row.identifier,
-                name_tr=row.name_tr,
-                asset_type=row.asset_type,
-                historical_period=row.historical_period,
-                construction_year=row.construction_year,
-                protection_status=row.protection_status,
-                model_type=row.model_type,
-                segment_count=row.segment_count
-            )
-        )
-        features.append(feature)
-
-    return AssetFeatureCollection(features=features)
+    rows = db.execute(text(sql), params).fetchall()
+    return feature_collection_response(rows, name_field)
+
+
+@router.post("/select", response_model=Union[AssetFeatureCollection, AssetSelectIds])
+def select_assets(selection: AssetSelectRequest, db: Session = Depends(get_db)):
+    """
+    Select assets inside a drawn polygon or along a buffered street line.
+
+    - **geometry**: GeoJSON Polygon, MultiPolygon, LineString or MultiLineString
+    - **buffer_m**: Buffer distance in meters (required for lines)
+    - **output**: `features` (GeoJSON FeatureCollection) or `ids`
+    - **asset_type**: Optional type filter
+    """
+    try:
+        prepared = prepare_selection_geometry(selection.geometry, selection.buffer_m)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    selection_sql, params = build_selection_sql(prepared)
+
+    if selection.output == SelectionOutput.IDS:
+        sql = "SELECT ha.id, ha.identifier FROM heritage_assets ha WHERE 1=1" + selection_sql
+    else:
+        sql = GEOJSON_SELECT_SQL + selection_sql
+
+    if selection.asset_type:
+        sql += " AND LOWER(ha.asset_type) = :asset_type"
+        params["asset_type"] = selection.asset_type.lower()
+
+    if selection.output == SelectionOutput.FEATURES:
+        sql += " GROUP BY ha.id"
+    sql += " ORDER BY ha.id LIMIT :limit"
+    params["limit"] = selection.limit
+
+    rows = db.execute(text(sql), params).fetchall()
+
+    if selection.output == SelectionOutput.IDS:
+        return json_response(dumps({
+            "ids": [row.id for row in rows],
+            "identifiers": [row.identifier for row in rows],
+            "count": len(rows)
+        }))
+    return feature_collection_response(rows)
 
 
 # ==================================================
@@ -197,35 +269,35 @@ async def get_assets_geojson(
 # ==================================================
 
 @router.get("/{asset_id}", response_model=AssetWithLocation)
-async def get_asset(asset_id: int, db: Session = Depends(get_db)):
-    """Get a single heritage asset by ID"""
-    asset = db.query(HeritageAsset).filter(HeritageAsset.id == asset_id).first()
-    if not asset:
+def get_asset(
+    asset_id: int,
+    fields: Optional[str] = Query(None, description="Comma-separated response fields"),
+    lang: Optional[Language] = None,
+    db: Session = Depends(get_db)
+):
+    """Get a single heritage asset by ID (`fields` / `lang` as in the list)"""
+    row = db.execute(asset_select(_response_fields(fields, lang)).where(ha.c.id == asset_id)).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Asset not found")
-
-    response = asset_to_response(asset)
-    lon, lat = get_asset_coordinates(db, asset_id)
-    response["longitude"] = lon
-    response["latitude"] = lat
-    return response
+    return json_response(row_to_json(row))
 
 
 @router.get("/identifier/{identifier}", response_model=AssetWithLocation)
-async def get_asset_by_identifier(identifier: str, db: Session = Depends(get_db)):
+def get_asset_by_identifier(
+    identifier: str,
+    fields: Optional[str] = Query(None, description="Comma-separated response fields"),
+    lang: Optional[Language] = None,
+    db: Session = Depends(get_db)
+):
     """Get a heritage asset by its identifier (e.g., HA-0001)"""
-    asset = db.query(HeritageAsset).filter(HeritageAsset.identifier == identifier).first()
-    if not asset:
+    row = db.execute(asset_select(_response_fields(fields, lang)).where(ha.c.identifier == identifier)).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Asset not found")
-
-    response = asset_to_response(asset)
-    lon, lat = get_asset_coordinates(db, asset.id)
-    response["longitude"] = lon
-    response["latitude"] = lat
-    return response
+    return json_response(row_to_json(row))
 
 
 @router.post("", response_model=AssetResponse, status_code=201)
-async def create_asset(asset_data: AssetCreate, db: Session = Depends(get_db)):
+def create_asset(asset_data: AssetCreate, db: Session = Depends(get_db)):
     """Create a new heritage asset"""
     # Check if identifier already exists
     existing = db.query(HeritageAsset).filter(
@@ -262,13 +334,79 @@ async def create_asset(asset_data: AssetCreate, db: Session = Depends(get_db)):
     )
 
     db.add(asset)
+    db.flush()
+    refresh_asset_zones(db, [asset.id])
+    invalidate_on_commit(db, "assets")
     db.commit()
     db.refresh(asset)
     return asset_to_response(asset)
 
 
+# Content-Type -> import format when ?format= is not given
+IMPORT_CONTENT_TYPES = {
+    "text/csv": ImportFormat.CSV,
+    "application/geo+json": ImportFormat.GEOJSON,
+    "application/json": ImportFormat.GEOJSON,
+}
+
+
+@router.post("/import", response_model=AssetImportResult)
+async def import_assets_bulk(
+    request: Request,
+    format: Optional[ImportFormat] = Query(None, description="geojson or csv (default: from Content-Type)"),
+    dry_run: bool = Query(False, description="Validate only, write nothing"),
+    db: Session = Depends(get_db)
+):
+    """
+    Bulk import assets from a GeoJSON FeatureCollection or CSV request body.
+
+    Rows are validated in batches, loaded with COPY into a staging table
+    and upserted by `identifier` in one statement; zone membership is
+    refreshed for all written assets. Invalid rows are skipped and listed
+    in `errors` (first 1000). CSV columns are asset fields plus
+    `longitude` and `latitude`.
+
+    curl --data-binary @assets.csv -H "Content-Type: text/csv" /api/v1/assets/import
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    fmt = format or IMPORT_CONTENT_TYPES.get(content_type)
+    if fmt is None:
+        raise HTTPException(status_code=415, detail="Send text/csv or application/geo+json, or set ?format=")
+
+    # Spool the body to disk (the parser reads it as a file, memory stays flat)
+    max_bytes = get_settings().IMPORT_MAX_MB * 1024 * 1024
+    spool = await to_thread.run_sync(tempfile.TemporaryFile)
+    try:
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > max_bytes:
+                raise HTTPException(status_code=413, detail=f"Import exceeds {max_bytes // (1024 * 1024)} MB")
+            await to_thread.run_sync(spool.write, chunk)
+        await to_thread.run_sync(spool.seek, 0)
+        report = await run_in_threadpool(_run_import, db, spool, fmt.value, dry_run)
+    finally:
+        await to_thread.run_sync(spool.close)
+
+    return AssetImportResult(**asdict(report), errors_truncated=report.errors_truncated)
+
+
+def _run_import(db: Session, stream, fmt: str, dry_run: bool) -> ImportReport:
+    try:
+        report = import_assets(db, stream, fmt, dry_run=dry_run)
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    if dry_run or not (report.inserted or report.updated):
+        db.rollback()
+        return report
+    invalidate_on_commit(db, "assets")
+    db.commit()
+    return report
+
+
 @router.patch("/{asset_id}", response_model=AssetResponse)
-async def update_asset(asset_id: int, asset_data: AssetUpdate, db: Session = Depends(get_db)):
+def update_asset(asset_id: int, asset_data: AssetUpdate, db: Session = Depends(get_db)):
     """Update a heritage asset"""
     asset = db.query(HeritageAsset).filter(HeritageAsset.id == asset_id).first()
     if not asset:
@@ -278,19 +416,21 @@ async def update_asset(asset_id: int, asset_data: AssetUpdate, db: Session = Dep
     for field, value in update_data.items():
         setattr(asset, field, value)
 
+    invalidate_on_commit(db, "assets")
     db.commit()
     db.refresh(asset)
     return asset_to_response(asset)
 
 
 @router.delete("/{asset_id}", status_code=204)
-async def delete_asset(asset_id: int, db: Session = Depends(get_db)):
+def delete_asset(asset_id: int, db: Session = Depends(get_db)):
     """Delete a heritage asset"""
     asset = db.query(HeritageAsset).filter(HeritageAsset.id == asset_id).first()
     if not asset:
         raise HTTPException(status_code=404, detail="Asset not found")
 
     db.delete(asset)
+    invalidate_on_commit(db, "assets")
     db.commit()
     return None
 
@@ -300,7 +440,7 @@ async def delete_asset(asset_id: int, db: Session = Depends(get_db)):
 # ==================================================
 
 @router.get("/{asset_id}/actors", response_model=List[ActorResponse])
-async def get_asset_actors(asset_id: int, db: Session = Depends(get_db)):
+def get_asset_actors(asset_id: int, db: Session = Depends(get_db)):
     """Get actors (architects, patrons) associated with an asset"""
     asset = db.query(HeritageAsset).filter(HeritageAsset.id == asset_id).first()
     if not asset:
@@ -328,7 +468,7 @@ async def get_asset_actors(asset_id: int, db: Session = Depends(get_db)):
 # ==================================================
 
 @router.get("/{asset_id}/media", response_model=List[MediaResponse])
-async def get_asset_media(asset_id: int, db: Session = Depends(get_db)):
+def get_asset_media(asset_id: int, db: Session = Depends(get_db)):
     """Get media associated with an asset"""
     asset = db.query(HeritageAsset).filter(HeritageAsset.id == asset_id).first()
     if not asset:
@@ -338,9 +478,10 @@ async def get_asset_media(asset_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/{asset_id}/media", response_model=MediaResponse, status_code=201)
-async def add_asset_media(
+def add_asset_media(
     asset_id: int,
     url: str,
+    background_tasks: BackgroundTasks,
     caption: Optional[str] = None,
     media_type: str = "image",
     is_primary: bool = False,
@@ -353,11 +494,76 @@ async def add_asset_media(
     - **caption**: Optional caption for the image
     - **media_type**: Type of media (image, historical, video, 360)
     - **is_primary**: Whether this is the primary/cover image
+
+    Resized variants of local images are generated after the response.
     """
     asset = db.query(HeritageAsset).filter(HeritageAsset.id == asset_id).first()
     if not asset:
         raise HTTPException(status_code=404, detail="Asset not found")
 
+    media = _insert_media(db, asset_id, url, caption, media_type, is_primary)
+    background_tasks.add_task(get_image_pipeline().generate, url)
+    return media
+
+
+@router.post("/{asset_id}/media/upload", response_model=MediaResponse, status_code=201)
+async def upload_asset_media(
+    asset_id: int,
+    request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    caption: Optional[str] = None,
+    media_type: str = "image",
+    is_primary: bool = False,
+    db: Session = Depends(get_db)
+):
+    """
+    Upload an image for an asset (multipart/form-data, field **file**).
+
+    The body is streamed to disk while being hashed; the file is stored
+    as /images/uploads/<sha256>.<ext>, so identical uploads are stored
+    once. Re-uploading a file the asset already has returns its existing
+    media (200). JPEG, PNG, WebP and TIFF up to UPLOAD_MAX_MB; resized
+    variants are generated after the response.
+
+    - **caption**, **media_type**, **is_primary**: as for POST /media
+    """
+    try:
+        get_upload_store().check_headers(request.headers)
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    if not await run_in_threadpool(_asset_exists, db, asset_id):
+        raise HTTPException(status_code=404, detail="Asset not found")
+
+    try:
+        stored = await get_upload_store().receive(request.headers, request.stream())
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    existing = await run_in_threadpool(_find_media, db, asset_id, stored.url)
+    if existing is not None:
+        response.status_code = 200
+        return existing
+    media = await run_in_threadpool(
+        _insert_media, db, asset_id, stored.url, caption, media_type, is_primary
+    )
+    background_tasks.add_task(get_image_pipeline().generate, stored.url)
+    return media
+
+
+def _asset_exists(db: Session, asset_id: int) -> bool:
+    exists = db.query(HeritageAsset.id).filter(HeritageAsset.id == asset_id).first() is not None
+    # Return the connection to the pool while the upload streams
+    db.rollback()
+    return exists
+
+
+def _find_media(db: Session, asset_id: int, url: str) -> Optional[Media]:
+    return db.query(Media).filter(Media.asset_id == asset_id, Media.url == url).first()
+
+
+def _insert_media(db: Session, asset_id: int, url: str, caption: Optional[str],
+                  media_type: str, is_primary: bool) -> Media:
     # If this is set as primary, unset other primaries
     if is_primary:
         db.query(Media).filter(
@@ -373,13 +579,15 @@ async def add_asset_media(
         is_primary=is_primary
     )
     db.add(media)
+    # Sprite atlas rebuild (services/sprites.py)
+    invalidate_on_commit(db, "media")
     db.commit()
     db.refresh(media)
     return media
 
 
 @router.delete("/{asset_id}/media/{media_id}", status_code=204)
-async def delete_asset_media(asset_id: int, media_id: int, db: Session = Depends(get_db)):
+def delete_asset_media(asset_id: int, media_id: int, db: Session = Depends(get_db)):
     """Delete a media item from an asset"""
     media = db.query(Media).filter(
         Media.id == media_id,
@@ -389,6 +597,7 @@ async def delete_asset_media(asset_id: int, media_id: int, db: Session = Depends
         raise HTTPException(status_code=404, detail="Media not found")
 
     db.delete(media)
+    invalidate_on_commit(db, "media")
     db.commit()
     return None
 
@@ -398,7 +607,7 @@ async def delete_asset_media(asset_id: int, media_id: int, db: Session = Depends
 # ==================================================
 
 @router.get("/stats/summary")
-async def get_assets_statistics(db: Session = Depends(get_db)):
+def get_assets_statistics(db: Session = Depends(get_db)):
     """Get statistics about heritage assets"""
     total = db.query(HeritageAsset).count()
 
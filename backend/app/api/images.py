@@ -0,0 +1,37 @@
+"""
+Tarihi Yarimada CBS - Image Derivatives API
+Resized WebP / AVIF / JPEG variants of images/ (see services/images.py)
+"""
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+
+from ..services.images import get_image_pipeline, FORMAT_BY_SUFFIX, MEDIA_TYPES
+
+router = APIRouter(prefix="/images/derived", tags=["images"])
+
+# Derivative URLs change only when the original is replaced under a new name
+DERIVED_CACHE_CONTROL = "public, max-age=604800"
+
+
+@router.get("/{width}/{name:path}", response_class=FileResponse)
+async def get_derivative(width: int, name: str):
+    """
+    Image resized to width, rendered on first request and then served from
+    the disk cache.
+
+    - **width**: 320, 640, 1024 or 1600
+    - **name**: Path under images/ with the target extension
+      (assets/ayasofya-1.webp for images/assets/ayasofya-1.jpg)
+    """
+    try:
+        path = await get_image_pipeline().get(width, name)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Rendering failed: {e}")
+    if path is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    fmt = FORMAT_BY_SUFFIX[path.suffix.lower()]
+    return FileResponse(path, media_type=MEDIA_TYPES[fmt], headers={"Cache-Control": DERIVED_CACHE_CONTROL})
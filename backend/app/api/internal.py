@@ -0,0 +1,176 @@
+"""
+Tarihi Yarimada CBS - Internal API
+/api/v1/internal endpoints for operational diagnostics
+
+Counters are public. Endpoints that flush caches, force rebuilds or expose
+SQL need the INTERNAL_SECRET in an X-Internal-Secret header (compared in
+constant time); without a configured secret they are disabled. The prefix
+is exempt from admission control, so these must stay cheap to refuse.
+"""
+
+import hmac
+from typing import Optional
+
+from anyio import to_thread
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from sqlalchemy.orm import Session
+
+from ..config import get_settings
+from ..db.database import get_db, pool_snapshot
+from ..core.cache import get_response_cache, invalidate_on_commit, ALL_TAGS
+from ..core.compression import get_compression
+from ..core.singleflight import single_flight
+from ..core.snapshot import get_read_model_snapshot
+from ..core.limits import get_admission_control
+from ..core.profiling import get_request_profiler
+from ..core.slow_queries import get_slow_query_log
+from ..services.images import get_image_pipeline
+from ..services.sprites import get_sprite_atlas
+
+router = APIRouter(prefix="/api/v1/internal", tags=["internal"])
+
+
+def require_internal_secret(x_internal_secret: Optional[str] = Header(None)) -> None:
+    """Dependency for operations that change or expose server state"""
+    secret = get_settings().INTERNAL_SECRET
+    if not secret:
+        raise HTTPException(status_code=403, detail="Internal operations are disabled (INTERNAL_SECRET not set)")
+    if not x_internal_secret or not hmac.compare_digest(x_internal_secret.encode("utf-8"), secret.encode("utf-8")):
+        raise HTTPException(status_code=403, detail="Invalid or missing X-Internal-Secret")
+
+
+# ==================================================
+# Response Cache
+# ==================================================
+
+@router.get("/cache")
+async def get_cache_stats():
+    """Response cache hit/miss counters for this worker"""
+    return get_response_cache().snapshot()
+
+
+@router.delete("/cache", status_code=204, dependencies=[Depends(require_internal_secret)])
+def clear_cache(db: Session = Depends(get_db)):
+    """Clear the response cache on every worker and node"""
+    invalidate_on_commit(db, ALL_TAGS)
+    db.commit()
+    return None
+
+
+# ==================================================
+# Compression
+# ==================================================
+
+@router.get("/compression")
+async def get_compression_stats():
+    """Available codecs, threshold and per-request compression ratio for this worker"""
+    return get_compression().snapshot()
+
+
+# ==================================================
+# Request Coalescing
+# ==================================================
+
+@router.get("/singleflight")
+async def get_single_flight_stats():
+    """Single-flight leader/coalesced counters for this worker"""
+    return single_flight.snapshot()
+
+
+# ==================================================
+# Read-Model Snapshot
+# ==================================================
+
+@router.get("/snapshot")
+async def get_snapshot_info():
+    """Current snapshot version, age and build counters"""
+    return get_read_model_snapshot().snapshot_info()
+
+
+@router.post("/snapshot", dependencies=[Depends(require_internal_secret)])
+async def rebuild_snapshot(request: Request):
+    """Rebuild the read-model snapshot now"""
+    version = await get_read_model_snapshot().build(request.app)
+    return {"version": version, "built": version is not None}
+
+
+# ==================================================
+# Admission Control
+# ==================================================
+
+@router.get("/admission")
+async def get_admission_stats():
+    """Per-group concurrency limits, queue depth and rejections for this worker"""
+    return get_admission_control().snapshot()
+
+
+# ==================================================
+# Connection Pool
+# ==================================================
+
+@router.get("/pool")
+async def get_pool_stats():
+    """Connection pool, sync thread pool and admission queue occupancy for this worker"""
+    limiter = to_thread.current_default_thread_limiter()
+    return {
+        **pool_snapshot(),
+        "threads": {"total": limiter.total_tokens, "busy": limiter.borrowed_tokens},
+        "admission": {
+            name: {"active": group["active"], "waiting": group["waiting"]}
+            for name, group in get_admission_control().snapshot()["groups"].items()
+        }
+    }
+
+
+# ==================================================
+# Request Profiling
+# ==================================================
+
+@router.get("/profiling")
+async def get_profiling_stats():
+    """Whether request profiling is enabled, its rate limit and counters for this worker"""
+    return get_request_profiler().snapshot()
+
+
+# ==================================================
+# Slow Queries
+# ==================================================
+
+@router.get("/slow-queries", dependencies=[Depends(require_internal_secret)])
+async def get_slow_queries(
+    limit: int = Query(50, ge=1, le=500),
+    fingerprint: Optional[str] = Query(None, description="Only entries of this statement fingerprint")
+):
+    """Slow statements of this worker: counters, top fingerprints and the newest entries with plans"""
+    slow_query_log = get_slow_query_log()
+    return {**slow_query_log.snapshot(), "entries": slow_query_log.recent(limit, fingerprint)}
+
+
+@router.delete("/slow-queries", status_code=204, dependencies=[Depends(require_internal_secret)])
+async def clear_slow_queries():
+    """Empty this worker's slow query buffer"""
+    get_slow_query_log().clear()
+    return None
+
+
+# ==================================================
+# Image Derivatives
+# ==================================================
+
+@router.get("/images")
+async def get_image_stats():
+    """Derivative cache size, hit/render/eviction counters for this worker"""
+    return get_image_pipeline().snapshot()
+
+
+@router.get("/sprites")
+async def get_sprite_stats():
+    """Sprite atlas fingerprint, sheets and rebuild counters for this worker"""
+    return get_sprite_atlas().snapshot()
+
+
+@router.post("/sprites", dependencies=[Depends(require_internal_secret)])
+def rebuild_sprites(db: Session = Depends(get_db)):
+    """Rebuild the sprite atlas now, even if its sources look unchanged"""
+    index = get_sprite_atlas().build(db, force=True)
+    return {"built": index is not None, "assets": len(index["assets"]) if index else None}
@@ -11,6 +11,7 @@ from typing import Optional, List
 from ..db.database import get_db
 from ..db.models import UserNote, HeritageAsset
 from ..schemas.segment import NoteCreate, NoteResponse
+from ..core.cache import invalidate_on_commit
 
 router = APIRouter(prefix="/api/v1/notes", tags=["notes"])
 
@@ -20,7 +21,7 @@ router = APIRouter(prefix="/api/v1/notes", tags=["notes"])
 # ==================================================
 
 @router.get("", response_model=List[NoteResponse])
-async def get_notes(
+def get_notes(
     asset_id: Optional[int] = None,
     user_identifier: Optional[str] = None,
     limit: int = Query(default=100, le=1000),
@@ -45,7 +46,7 @@ async def get_notes(
 
 
 @router.get("/by-asset/{asset_id}", response_model=List[NoteResponse])
-async def get_notes_by_asset(
+def get_notes_by_asset(
     asset_id: int,
     db: Session = Depends(get_db)
 ):
@@ -66,7 +67,7 @@ async def get_notes_by_asset(
 # ==================================================
 
 @router.get("/{note_id}", response_model=NoteResponse)
-async def get_note(note_id: int, db: Session = Depends(get_db)):
+def get_note(note_id: int, db: Session = Depends(get_db)):
     """Get a single note by ID"""
     note = db.query(UserNote).filter(UserNote.id == note_id).first()
     if not note:
@@ -75,7 +76,7 @@ async def get_note(note_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("", response_model=NoteResponse, status_code=201)
-async def create_note(note_data: NoteCreate, db: Session = Depends(get_db)):
+def create_note(note_data: NoteCreate, db: Session = Depends(get_db)):
     """Create a new note for an asset"""
     # Check if asset exists
     asset = db.query(HeritageAsset).filter(HeritageAsset.id == note_data.asset_id).first()
@@ -89,19 +90,21 @@ async def create_note(note_data: NoteCreate, db: Session = Depends(get_db)):
     )
 
     db.add(note)
+    invalidate_on_commit(db, "notes")
     db.commit()
     db.refresh(note)
     return note
 
 
 @router.delete("/{note_id}", status_code=204)
-async def delete_note(note_id: int, db: Session = Depends(get_db)):
+def delete_note(note_id: int, db: Session = Depends(get_db)):
     """Delete a note"""
     note = db.query(UserNote).filter(UserNote.id == note_id).first()
     if not note:
         raise HTTPException(status_code=404, detail="Note not found")
 
     db.delete(note)
+    invalidate_on_commit(db, "notes")
     db.commit()
     return None
 
@@ -111,7 +114,7 @@ async def delete_note(note_id: int, db: Session = Depends(get_db)):
 # ==================================================
 
 @router.get("/stats/summary")
-async def get_notes_statistics(db: Session = Depends(get_db)):
+def get_notes_statistics(db: Session = Depends(get_db)):
     """Get statistics about user notes"""
     total = db.query(UserNote).count()
 
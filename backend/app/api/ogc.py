@@ -11,6 +11,10 @@ from typing import Optional
 
 from ..db.database import get_db
 from ..db.models import HeritageAsset, AssetSegment
+from ..schemas.asset import Language
+from ..services.read_models import LANGUAGE_EXCLUDED_FIELDS
+from ..services.zones import ZONE_FILTER_SQL
+from ..core.responses import dumps, json_response
 
 router = APIRouter(prefix="/api/v1/ogc", tags=["ogc"])
 
@@ -68,7 +72,7 @@ async def get_capabilities():
 # ==================================================
 
 @router.get("/wfs")
-async def wfs_get_feature(
+def wfs_get_feature(
     service: str = Query("WFS"),
     request: str = Query("GetFeature"),
     typeName: str = Query("heritage_assets"),
@@ -76,6 +80,8 @@ async def wfs_get_feature(
     srsName: str = Query("EPSG:4326"),
     bbox: Optional[str] = Query(None, description="Bounding box: west,south,east,north"),
     propertyName: Optional[str] = Query(None, description="Comma-separated property names"),
+    lang: Optional[Language] = Query(None, description="tr or en: omit the other language's name"),
+    zone_id: Optional[int] = Query(None, description="Protection zone ID filter"),
     maxFeatures: int = Query(100, le=1000),
     startIndex: int = Query(0, ge=0),
     db: Session = Depends(get_db)
@@ -92,16 +98,21 @@ async def wfs_get_feature(
     - **outputFormat**: Output format (application/json)
     - **srsName**: Coordinate reference system
     - **bbox**: Bounding box filter (west,south,east,north)
+    - **propertyName**: Comma-separated properties to return (heritage_assets only)
+    - **lang**: `tr` or `en` - omit the other language's name (heritage_assets only)
+    - **zone_id**: Protection zone filter (heritage_assets only)
     - **maxFeatures**: Maximum number of features to return
     - **startIndex**: Starting index for pagination
     """
 
+    # Feature collections are plain dicts, serialized directly (no jsonable_encoder pass)
     if typeName == "heritage_assets":
-        return await _get_heritage_assets_wfs(
-            db, bbox, maxFeatures, startIndex, srsName
-        )
+        return json_response(dumps(_get_heritage_assets_wfs(
+            db, bbox, maxFeatures, startIndex, srsName, zone_id, propertyName,
+            lang.value if lang else None
+        )))
     elif typeName == "asset_segments":
-        return await _get_segments_wfs(db, maxFeatures, startIndex)
+        return json_response(dumps(_get_segments_wfs(db, maxFeatures, startIndex)))
     else:
         raise HTTPException(
             status_code=400,
@@ -109,35 +120,61 @@ async def wfs_get_feature(
         )
 
 
-async def _get_heritage_assets_wfs(
+# WFS property -> SQL expression (feature type heritage_assets)
+WFS_ASSET_PROPERTIES = {
+    "identifier": "ha.identifier",
+    "name_tr": "ha.name_tr",
+    "name_en": "ha.name_en",
+    "asset_type": "ha.asset_type",
+    "historical_period": "ha.historical_period",
+    "construction_year": "ha.construction_year",
+    "construction_period": "ha.construction_period",
+    "neighborhood": "ha.neighborhood",
+    "protection_status": "ha.protection_status",
+    "model_type": "ha.model_type",
+    "model_url": "ha.model_url",
+    "is_visitable": "ha.is_visitable",
+    "segment_count": "(SELECT COUNT(*) FROM asset_segments s WHERE s.asset_id = ha.id)",
+}
+
+
+def _wfs_properties(property_name: Optional[str], lang: Optional[str] = None) -> list:
+    """Requested WFS properties in schema order (all when propertyName is empty), minus ?lang= drops"""
+    excluded = LANGUAGE_EXCLUDED_FIELDS[lang] if lang else frozenset()
+    if not property_name:
+        return [name for name in WFS_ASSET_PROPERTIES if name not in excluded]
+    # Accept qualified names (heritage_assets:name_tr)
+    requested = {name.strip().split(":")[-1] for name in property_name.split(",") if name.strip()}
+    unknown = requested.difference(WFS_ASSET_PROPERTIES)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown propertyName: {', '.join(sorted(unknown))}. "
+                   f"Available: {', '.join(WFS_ASSET_PROPERTIES)}"
+        )
+    return [name for name in WFS_ASSET_PROPERTIES if name in requested and name not in excluded]
+
+
+def _get_heritage_assets_wfs(
     db: Session,
     bbox: Optional[str],
     max_features: int,
     start_index: int,
-    srs_name: str
+    srs_name: str,
+    zone_id: Optional[int] = None,
+    property_name: Optional[str] = None,
+    lang: Optional[str] = None
 ) -> dict:
-    """Get heritage assets as WFS GeoJSON"""
-
-    sql = """
-        SELECT
-            ha.id,
-            ha.identifier,
-            ha.name_tr,
-            ha.name_en,
-            ha.asset_type,
-            ha.historical_period,
-            ha.construction_year,
-            ha.construction_period,
-            ha.neighborhood,
-            ha.protection_status,
-            ha.model_type,
-            ha.model_url,
-            ha.is_visitable,
-            ST_X(ha.location) as longitude,
-            ST_Y(ha.location) as latitude,
-            COUNT(s.id) as segment_count
+    """Get heritage assets as WFS GeoJSON (only propertyName columns are selected)"""
+    properties = _wfs_properties(property_name, lang)
+    select_list = ["ha.identifier", "ST_X(ha.location) as longitude", "ST_Y(ha.location) as latitude"]
+    select_list += [
+        f"{WFS_ASSET_PROPERTIES[name]} as {name}" for name in properties if name != "identifier"
+    ]
+
+    sql = f"""
+        SELECT {", ".join(select_list)}
         FROM heritage_assets ha
-        LEFT JOIN asset_segments s ON s.asset_id = ha.id
         WHERE 1=1
     """
     params = {}
@@ -159,8 +196,11 @@ async def _get_heritage_assets_wfs(
                 detail="Invalid bbox format. Expected: west,south,east,north"
             )
 
-    sql += " GROUP BY ha.id"
-    sql += f" ORDER BY ha.id LIMIT :limit OFFSET :offset"
+    if zone_id:
+        sql += ZONE_FILTER_SQL
+        params["zone_id"] = zone_id
+
+    sql += " ORDER BY ha.id LIMIT :limit OFFSET :offset"
     params["limit"] = max_features
     params["offset"] = start_index
 
@@ -177,28 +217,16 @@ async def _get_heritage_assets_wfs(
                 "type": "Point",
                 "coordinates": [row.longitude, row.latitude]
             },
-            "properties": {
-                "identifier": row.identifier,
-                "name_tr": row.name_tr,
-                "name_en": row.name_en,
-                "asset_type": row.asset_type,
-                "historical_period": row.historical_period,
-                "construction_year": row.construction_year,
-                "construction_period": row.construction_period,
-                "neighborhood": row.neighborhood,
-                "protection_status": row.protection_status,
-                "model_type": row.model_type,
-                "model_url": row.model_url,
-                "is_visitable": row.is_visitable,
-                "segment_count": row.segment_count
-            }
+            "properties": {name: getattr(row, name) for name in properties}
         }
         features.append(feature)
 
     # Get total count
-    count_sql = "SELECT COUNT(*) FROM heritage_assets"
+    count_sql = "SELECT COUNT(*) FROM heritage_assets ha WHERE 1=1"
     if bbox:
-        count_sql += " WHERE ST_Within(location, ST_MakeEnvelope(:west, :south, :east, :north, 4326))"
+        count_sql += " AND ST_Within(ha.location, ST_MakeEnvelope(:west, :south, :east, :north, 4326))"
+    if zone_id:
+        count_sql += ZONE_FILTER_SQL
     total_count = db.execute(text(count_sql), params).scalar()
 
     return {
@@ -213,7 +241,7 @@ async def _get_heritage_assets_wfs(
     }
 
 
-async def _get_segments_wfs(
+def _get_segments_wfs(
     db: Session,
     max_features: int,
     start_index: int
@@ -3,7 +3,10 @@ Tarihi Yarimada CBS - Segments API
 /api/v1/segments endpoints for SAM3D integration
 """
 
+from dataclasses import asdict
+
 from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import Optional, List
@@ -11,30 +14,18 @@ from typing import Optional, List
 from ..db.database import get_db
 from ..db.models import AssetSegment, HeritageAsset
 from ..schemas.segment import (
-    SegmentCreate, SegmentUpdate, SegmentResponse,
-    SegmentWithAsset, SegmentStatistics, SegmentTypeCount
+    SEGMENT_TYPES, SegmentCreate, SegmentUpdate, SegmentResponse,
+    SegmentWithAsset, SegmentStatistics, SegmentTypeCount,
+    SegmentIngest, SegmentIngestResult
 )
+from ..core.cache import invalidate_on_commit
+from ..core.responses import adapter_response
+from ..services.segment_ingest import ingest_segments, AssetNotFound
 
 router = APIRouter(prefix="/api/v1/segments", tags=["segments"])
 
-
-# ==================================================
-# Segment Types Reference
-# ==================================================
-
-SEGMENT_TYPES = {
-    "dome": "Kubbe",
-    "minaret": "Minare",
-    "portal": "Tackapi/Giris",
-    "wall": "Duvar",
-    "window": "Pencere",
-    "courtyard": "Avlu",
-    "fountain": "Sadirvan",
-    "column": "Sutun",
-    "arch": "Kemer",
-    "roof": "Cati",
-    "other": "Diger"
-}
+# Segment lists are validated once from the ORM rows and dumped by pydantic-core
+SEGMENT_LIST_ADAPTER = TypeAdapter(List[SegmentResponse])
 
 
 # ==================================================
@@ -42,7 +33,7 @@ SEGMENT_TYPES = {
 # ==================================================
 
 @router.get("", response_model=List[SegmentResponse])
-async def get_segments(
+def get_segments(
     asset_id: Optional[int] = None,
     segment_type: Optional[str] = None,
     condition: Optional[str] = None,
@@ -67,7 +58,9 @@ async def get_segments(
         query = query.filter(func.lower(AssetSegment.condition) == condition.lower())
 
     segments = query.offset(offset).limit(limit).all()
-    return segments
+    return adapter_response(
+        SEGMENT_LIST_ADAPTER, SEGMENT_LIST_ADAPTER.validate_python(segments, from_attributes=True)
+    )
 
 
 @router.get("/types")
@@ -82,7 +75,7 @@ async def get_segment_types():
 
 
 @router.get("/by-asset/{asset_id}", response_model=List[SegmentResponse])
-async def get_segments_by_asset(
+def get_segments_by_asset(
     asset_id: int,
     segment_type: Optional[str] = None,
     db: Session = Depends(get_db)
@@ -98,7 +91,36 @@ async def get_segments_by_asset(
     if segment_type:
         query = query.filter(func.lower(AssetSegment.segment_type) == segment_type.lower())
 
-    return query.all()
+    return adapter_response(
+        SEGMENT_LIST_ADAPTER, SEGMENT_LIST_ADAPTER.validate_python(query.all(), from_attributes=True)
+    )
+
+
+@router.put("/by-asset/{asset_id}", response_model=SegmentIngestResult)
+def ingest_asset_segments(asset_id: int, export: SegmentIngest, db: Session = Depends(get_db)):
+    """
+    Apply a whole SAM3D export to an asset in one transaction.
+
+    Segments are matched to existing ones by **object_id**: new objects are
+    inserted, changed ones updated and, with **prune** (default), objects
+    missing from the export deleted. Re-sending the same export changes
+    nothing. **dry_run** reports the diff without writing.
+    """
+    try:
+        report = ingest_segments(db, asset_id, export.segments, prune=export.prune, dry_run=export.dry_run)
+    except AssetNotFound:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="Asset not found")
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if report.dry_run or not report.changed:
+        db.rollback()
+    else:
+        invalidate_on_commit(db, "segments")
+        db.commit()
+    return SegmentIngestResult(**asdict(report))
 
 
 # ==================================================
@@ -106,7 +128,7 @@ async def get_segments_by_asset(
 # ==================================================
 
 @router.get("/{segment_id}", response_model=SegmentWithAsset)
-async def get_segment(segment_id: int, db: Session = Depends(get_db)):
+def get_segment(segment_id: int, db: Session = Depends(get_db)):
     """Get a single segment by ID"""
     segment = db.query(AssetSegment).filter(AssetSegment.id == segment_id).first()
     if not segment:
@@ -123,7 +145,7 @@ async def get_segment(segment_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("", response_model=SegmentResponse, status_code=201)
-async def create_segment(segment_data: SegmentCreate, db: Session = Depends(get_db)):
+def create_segment(segment_data: SegmentCreate, db: Session = Depends(get_db)):
     """Create a new segment for an asset"""
     # Check if asset exists
     asset = db.query(HeritageAsset).filter(HeritageAsset.id == segment_data.asset_id).first()
@@ -153,13 +175,14 @@ async def create_segment(segment_data: SegmentCreate, db: Session = Depends(get_
     )
 
     db.add(segment)
+    invalidate_on_commit(db, "segments")
     db.commit()
     db.refresh(segment)
     return segment
 
 
 @router.patch("/{segment_id}", response_model=SegmentResponse)
-async def update_segment(
+def update_segment(
     segment_id: int,
     segment_data: SegmentUpdate,
     db: Session = Depends(get_db)
@@ -183,19 +206,21 @@ async def update_segment(
     for field, value in update_data.items():
         setattr(segment, field, value)
 
+    invalidate_on_commit(db, "segments")
     db.commit()
     db.refresh(segment)
     return segment
 
 
 @router.delete("/{segment_id}", status_code=204)
-async def delete_segment(segment_id: int, db: Session = Depends(get_db)):
+def delete_segment(segment_id: int, db: Session = Depends(get_db)):
     """Delete a segment"""
     segment = db.query(AssetSegment).filter(AssetSegment.id == segment_id).first()
     if not segment:
         raise HTTPException(status_code=404, detail="Segment not found")
 
     db.delete(segment)
+    invalidate_on_commit(db, "segments")
     db.commit()
     return None
 
@@ -205,7 +230,7 @@ async def delete_segment(segment_id: int, db: Session = Depends(get_db)):
 # ==================================================
 
 @router.get("/stats/summary", response_model=SegmentStatistics)
-async def get_segment_statistics(db: Session = Depends(get_db)):
+def get_segment_statistics(db: Session = Depends(get_db)):
     """Get statistics about segments"""
     total = db.query(AssetSegment).count()
 
@@ -233,7 +258,7 @@ async def get_segment_statistics(db: Session = Depends(get_db)):
 
 
 @router.get("/stats/by-asset/{asset_id}")
-async def get_asset_segment_stats(asset_id: int, db: Session = Depends(get_db)):
+def get_asset_segment_stats(asset_id: int, db: Session = Depends(get_db)):
     """Get segment statistics for a specific asset"""
     asset = db.query(HeritageAsset).filter(HeritageAsset.id == asset_id).first()
     if not asset:
@@ -0,0 +1,42 @@
+"""
+Tarihi Yarimada CBS - Sprite Atlas API
+Thumbnail sprite sheets and their index (see services/sprites.py)
+"""
+
+import re
+
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import FileResponse
+
+from ..core.cache import make_etag, etag_matches
+from ..core.static import IMMUTABLE
+from ..services.sprites import get_sprite_atlas
+
+router = APIRouter(prefix="/api/v1/sprites", tags=["sprites"])
+
+SHEET_NAME_PATTERN = re.compile(r"^atlas-\d+\.[0-9a-f]{10}\.webp$")
+EMPTY_INDEX = b'{"assets": {}, "cell": 0, "sheets": [], "version": 1}'
+
+
+@router.get("")
+async def get_sprite_index(request: Request):
+    """
+    Sprite sheet URLs and the cell offset of each asset's primary image,
+    keyed by asset identifier. Revalidated on every load (ETag).
+    """
+    raw, _ = get_sprite_atlas().index()
+    body = raw or EMPTY_INDEX
+    etag = make_etag(body).decode("latin-1")
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match", "").encode("latin-1"), etag.encode("latin-1")):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+@router.get("/{name}", response_class=FileResponse)
+async def get_sprite_sheet(name: str):
+    """Sprite sheet by content-hashed name (immutable)"""
+    path = get_sprite_atlas().sheet_path(name) if SHEET_NAME_PATTERN.match(name) else None
+    if path is None or not path.exists():
+        raise HTTPException(status_code=404, detail="Sprite sheet not found")
+    return FileResponse(path, media_type="image/webp", headers={"Cache-Control": IMMUTABLE})
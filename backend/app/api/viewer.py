@@ -0,0 +1,53 @@
+"""
+Tarihi Yarimada CBS - Viewer API
+/api/v1/viewer endpoints for the Cesium viewer
+"""
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from ..db.database import get_db
+from ..schemas.viewer import ViewerVisibleRequest, ViewerVisibleResponse
+from ..services.visibility import position_index, compute_visible
+
+router = APIRouter(prefix="/api/v1/viewer", tags=["viewer"])
+
+
+# ==================================================
+# Frustum Visibility
+# ==================================================
+
+@router.post("/visible", response_model=ViewerVisibleResponse)
+def get_visible_assets(query: ViewerVisibleRequest, db: Session = Depends(get_db)):
+    """
+    Return the assets inside the camera view frustum.
+
+    Assets are sorted by projected screen size (largest first) and each
+    carries a recommended `model_lod` from its distance to the camera, so
+    the viewer only streams the few splat / 3D Tiles models that matter.
+
+    - **camera**: longitude, latitude, height (ellipsoid), heading, pitch, roll in degrees
+    - **fov**: Field of view of the larger screen dimension (degrees)
+    - **aspect_ratio**, **near**, **far**: Frustum parameters
+    - **screen_height**: Canvas height in pixels (for screen-space size)
+    - **max_results**: Maximum number of assets to return
+    """
+    positions = position_index.get(db)
+    visible, in_frustum = compute_visible(
+        positions,
+        query.camera,
+        fov=query.fov,
+        aspect_ratio=query.aspect_ratio,
+        near=query.near,
+        far=query.far,
+        screen_height=query.screen_height,
+        min_pixel_size=query.min_pixel_size,
+        max_results=query.max_results
+    )
+
+    return {
+        "assets": visible,
+        "count": len(visible),
+        "in_frustum": in_frustum,
+        "total_assets": len(positions)
+    }
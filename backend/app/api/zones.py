@@ -0,0 +1,138 @@
+"""
+Tarihi Yarimada CBS - Protection Zones API
+/api/v1/zones endpoints (TUCBS Koruma Alanlari)
+"""
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from typing import List
+
+from ..db.database import get_db
+from ..db.models import ProtectionZone
+from ..schemas.zone import (
+    ZoneCreate, ZoneResponse, ZoneFeatureCollection, ZoneImportResult
+)
+from ..services.zones import upsert_zones
+from ..core.cache import invalidate_on_commit
+from ..core.responses import dumps, json_response
+
+router = APIRouter(prefix="/api/v1/zones", tags=["zones"])
+
+
+ZONE_LIST_SQL = """
+    SELECT
+        z.id, z.identifier, z.name_tr, z.name_en, z.zone_type,
+        z.protection_status, z.legal_foundation, z.inspire_id, z.data_source,
+        z.created_at, z.updated_at,
+        (SELECT COUNT(*) FROM asset_protection_zones apz WHERE apz.zone_id = z.id) as asset_count
+    FROM protection_zones z
+"""
+
+
+# ==================================================
+# List Zones
+# ==================================================
+
+@router.get("", response_model=List[ZoneResponse])
+def get_zones(db: Session = Depends(get_db)):
+    """Get list of protection zones with member asset counts"""
+    rows = db.execute(text(ZONE_LIST_SQL + " ORDER BY z.identifier")).fetchall()
+    return [dict(row._mapping) for row in rows]
+
+
+@router.get("/geojson")
+def get_zones_geojson(db: Session = Depends(get_db)):
+    """Get protection zones as GeoJSON FeatureCollection"""
+    rows = db.execute(text("""
+        SELECT
+            z.identifier, z.name_tr, z.zone_type, z.protection_status,
+            ST_AsGeoJSON(z.geometry)::json as geometry
+        FROM protection_zones z
+        ORDER BY z.identifier
+    """)).fetchall()
+
+    features = [
+        {
+            "type": "Feature",
+            "id": row.identifier,
+            "geometry": row.geometry,
+            "properties": {
+                "identifier": row.identifier,
+                "name_tr": row.name_tr,
+                "zone_type": row.zone_type,
+                "protection_status": row.protection_status
+            }
+        }
+        for row in rows
+    ]
+
+    return json_response(dumps({
+        "type": "FeatureCollection",
+        "crs": {"type": "name", "properties": {"name": "EPSG:4326"}},
+        "features": features
+    }))
+
+
+@router.get("/{zone_id}", response_model=ZoneResponse)
+def get_zone(zone_id: int, db: Session = Depends(get_db)):
+    """Get a single protection zone by ID"""
+    row = db.execute(text(ZONE_LIST_SQL + " WHERE z.id = :id"), {"id": zone_id}).fetchone()
+    if not row:
+        raise HTTPException(status_code=404, detail="Zone not found")
+    return dict(row._mapping)
+
+
+# ==================================================
+# Zone Writes
+# ==================================================
+
+@router.post("", response_model=ZoneResponse, status_code=201)
+def create_zone(zone_data: ZoneCreate, db: Session = Depends(get_db)):
+    """Create or replace a protection zone (by identifier)"""
+    properties = zone_data.model_dump(exclude={"geometry"})
+    try:
+        zone_ids, _ = upsert_zones(db, [(properties, zone_data.geometry)])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    invalidate_on_commit(db, "zones")
+    db.commit()
+
+    row = db.execute(text(ZONE_LIST_SQL + " WHERE z.id = :id"), {"id": zone_ids[0]}).fetchone()
+    return dict(row._mapping)
+
+
+@router.post("/import", response_model=ZoneImportResult)
+def import_zones(collection: ZoneFeatureCollection, db: Session = Depends(get_db)):
+    """
+    Bulk import protection zones from a GeoJSON FeatureCollection.
+
+    Features are upserted by `properties.identifier` in one statement (a
+    repeated identifier keeps its last feature) and asset membership is
+    recomputed for all imported zones.
+    """
+    zones = [
+        (feature.properties.model_dump(), feature.geometry)
+        for feature in collection.features
+    ]
+    try:
+        zone_ids, memberships = upsert_zones(db, zones)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    invalidate_on_commit(db, "zones")
+    db.commit()
+
+    return ZoneImportResult(imported=len(zone_ids), zone_ids=zone_ids, memberships=memberships)
+
+
+@router.delete("/{zone_id}", status_code=204)
+def delete_zone(zone_id: int, db: Session = Depends(get_db)):
+    """Delete a protection zone (memberships are removed by cascade)"""
+    zone = db.query(ProtectionZone).filter(ProtectionZone.id == zone_id).first()
+    if not zone:
+        raise HTTPException(status_code=404, detail="Zone not found")
+
+    db.delete(zone)
+    invalidate_on_commit(db, "zones")
+    db.commit()
+    return None
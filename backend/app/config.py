@@ -1,14 +1,33 @@
 """
 Tarihi Yarimada CBS - Configuration
 Environment variables and application settings
+
+All configuration lives in Settings, built once on first use by
+get_settings(). The database URL is only required when the engine is
+first created, so importing the application never connects or fails.
 """
 
-import os
 from pathlib import Path
 from functools import lru_cache
+from pydantic import AliasChoices, Field
 from pydantic_settings import BaseSettings
+from dotenv import load_dotenv
 from typing import Optional, List
 
+# Project root directory (one level up from backend)
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+# .env files in priority order: project root, backend, current directory
+ENV_FILES = (
+    BASE_DIR / ".env",
+    BASE_DIR / "backend" / ".env",
+    Path(".env"),
+)
+
+# Pooled connections a worker's background jobs may hold besides requests
+# (snapshot builder, sprite rebuilder); not counted for admission control
+BACKGROUND_DB_CONNECTIONS = 2
+
 
 class Settings(BaseSettings):
     """Application settings loaded from environment variables"""
@@ -19,9 +38,28 @@ class Settings(BaseSettings):
     DEBUG: bool = False
 
     # Database
-    DATABASE_URL: str
+    # Önce local_database_url (küçük harf), sonra LOCAL_DATABASE_URL, sonra DATABASE_URL
+    DATABASE_URL: Optional[str] = Field(
+        default=None,
+        validation_alias=AliasChoices("local_database_url", "DATABASE_URL", "AZURE_DATABASE_URL")
+    )
     DB_POOL_SIZE: int = 5
     DB_MAX_OVERFLOW: int = 10
+    DB_INIT_MODE: str = "auto"                                    # auto | always | skip
+
+    # Server (see gunicorn.conf.py for how these are derived)
+    DB_MAX_CONNECTIONS: int = 40                                  # Postgres connections for this instance
+    WEB_CONCURRENCY: Optional[int] = None                         # Worker processes
+    THREADPOOL_SIZE: Optional[int] = None                         # Threads for sync routes per worker
+
+    # Route limits (see app/core/limits.py)
+    DB_STATEMENT_TIMEOUT_MS: int = 10_000                         # Default per-route statement_timeout
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_HEAVY_LIMIT: Optional[int] = None                   # Concurrent heavy requests per worker
+    ADMISSION_LIMIT: Optional[int] = None                         # Concurrent other API requests per worker
+    ADMISSION_MAX_QUEUE: int = 8                                  # Waiting requests before 503
+    ADMISSION_QUEUE_TIMEOUT: float = 5.0                          # Max seconds in the queue
+    ADMISSION_RETRY_AFTER: int = 2                                # Retry-After on 503 (seconds)
 
     # Cesium
     CESIUM_TOKEN: Optional[str] = None
@@ -29,8 +67,62 @@ class Settings(BaseSettings):
     # CORS
     ALLOWED_ORIGINS: str = "*"
 
+    # Internal operations (cache flush, rebuilds, slow query log; see app/api/internal.py)
+    INTERNAL_SECRET: Optional[str] = None                         # X-Internal-Secret value; unset disables them
+
+    # Response cache
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_TTL: float = 300
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1024
+    RESPONSE_CACHE_MAX_MB: int = 64
+    RESPONSE_CACHE_L2_PATH: Optional[str] = None
+    RESPONSE_CACHE_L2_MAX_MB: int = 512
+    RESPONSE_CACHE_VARIANT_MB: int = 32                           # Compressed variants kept in memory
+
+    # Compression
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_BYTES: int = 1024                             # Smaller bodies are sent as-is
+    COMPRESSION_CODECS: str = "br,zstd,gzip"                      # Server preference order
+
+    # Read-model snapshot
+    SNAPSHOT_ENABLED: bool = True
+    SNAPSHOT_PATH: Optional[str] = None
+    SNAPSHOT_REFRESH_SECONDS: float = 300
+    SNAPSHOT_MIN_INTERVAL_SECONDS: float = 15
+    SNAPSHOT_PRIME_TTL: float = 30
+    SNAPSHOT_MAX_ASSETS: int = 5000
+
+    # Request profiling (see app/core/profiling.py; off without a secret)
+    PROFILING_SECRET: Optional[str] = None                        # X-Profile header value (never a query parameter)
+    PROFILING_MAX_PER_MINUTE: int = 6                             # Profiled requests per worker and minute
+    PROFILING_INTERVAL_MS: float = 2.0                            # Stack sampling interval
+    PROFILING_DIR: Optional[str] = None                           # Also write profiles here
+
+    # Slow query log (see app/core/slow_queries.py)
+    SLOW_QUERY_MS: float = 500                                    # Record statements at least this slow (0: off)
+    SLOW_QUERY_EXPLAIN_RATE: float = 0.1                          # Fraction of slow reads re-run with EXPLAIN ANALYZE
+    SLOW_QUERY_BUFFER: int = 200                                  # Entries kept per worker
+
     # Paths
-    BASE_DIR: Path = Path(__file__).resolve().parent.parent.parent
+    BASE_DIR: Path = BASE_DIR
+    STATIC_DIST_DIR: Optional[str] = None                         # Hashed static build (default dist/static)
+
+    # Image derivatives
+    IMAGE_CACHE_DIR: Optional[str] = None                         # Derivative disk cache (default var/images)
+    IMAGE_CACHE_MAX_MB: int = 512                                 # LRU-evicted above this size
+    IMAGE_WORKERS: Optional[int] = None                           # Encoder processes per worker (default min(2, CPUs))
+    SPRITE_DIR: Optional[str] = None                              # Thumbnail sprite atlas (default var/sprites)
+    SPRITE_CELL_PX: int = 96                                      # Thumbnail cell size (2x the 48px list icon)
+
+    # Media uploads and bulk import
+    UPLOAD_MAX_MB: int = 40                                       # Largest accepted image
+    UPLOAD_CONCURRENCY: int = 4                                   # Concurrent uploads per worker (admission group)
+    IMPORT_MAX_MB: int = 500                                      # Largest bulk import body
+
+    @property
+    def threadpool_size(self) -> int:
+        """Sync route threads: one per pooled connection plus headroom for file/L2 I/O"""
+        return self.THREADPOOL_SIZE or self.DB_POOL_SIZE + self.DB_MAX_OVERFLOW + 4
 
     @property
     def cors_origins(self) -> List[str]:
@@ -40,16 +132,28 @@ class Settings(BaseSettings):
         return [origin.strip() for origin in self.ALLOWED_ORIGINS.split(",")]
 
     class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
         extra = "ignore"
 
 
+# Environment keys Settings.DATABASE_URL is read from (earlier keys win)
+DATABASE_URL_KEYS = ("local_database_url", "LOCAL_DATABASE_URL", "DATABASE_URL", "AZURE_DATABASE_URL")
+
+
+def database_url_env(url: str) -> dict:
+    """Environment that points Settings at url, whatever the .env files set"""
+    return {key: url for key in DATABASE_URL_KEYS}
+
+
+@lru_cache()
+def load_environment() -> None:
+    """Load .env files into os.environ once (earlier files take priority)"""
+    for env_path in ENV_FILES:
+        if env_path.exists():
+            load_dotenv(env_path, override=False)
+
+
 @lru_cache()
 def get_settings() -> Settings:
     """Get cached settings instance"""
+    load_environment()
     return Settings()
-
-
-# Convenience access
-settings = get_settings()
@@ -0,0 +1,35 @@
+"""
+Core module - cross-cutting infrastructure (caching, compression, route limits, diagnostics, ASGI middleware)
+"""
+
+from .cache import (
+    get_response_cache,
+    invalidate_on_commit,
+    listen_for_invalidations,
+    ResponseCacheMiddleware
+)
+from .compression import get_compression, CompressionMiddleware
+from .singleflight import single_flight, SingleFlightMiddleware
+from .snapshot import get_read_model_snapshot, SnapshotFallbackMiddleware
+from .limits import get_admission_control, request_guard, RouteLimitsMiddleware
+from .profiling import get_request_profiler, ProfilingMiddleware
+from .slow_queries import get_slow_query_log
+
+__all__ = [
+    "get_response_cache",
+    "invalidate_on_commit",
+    "listen_for_invalidations",
+    "ResponseCacheMiddleware",
+    "get_compression",
+    "CompressionMiddleware",
+    "single_flight",
+    "SingleFlightMiddleware",
+    "get_read_model_snapshot",
+    "SnapshotFallbackMiddleware",
+    "get_admission_control",
+    "request_guard",
+    "RouteLimitsMiddleware",
+    "get_request_profiler",
+    "ProfilingMiddleware",
+    "get_slow_query_log"
+]
@@ -0,0 +1,83 @@
+"""
+Tarihi Yarimada CBS - ASGI Helpers
+Buffered response capture shared by the caching middlewares
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Tuple
+
+Headers = List[Tuple[bytes, bytes]]
+
+
+@dataclass
+class BufferedResponse:
+    """A complete HTTP response held in memory"""
+    status: int
+    headers: Headers = field(default_factory=list)
+    body: bytes = b""
+
+    def header(self, name: bytes) -> Optional[bytes]:
+        name = name.lower()
+        for key, value in self.headers:
+            if key.lower() == name:
+                return value
+        return None
+
+
+async def run_buffered(app, scope, receive) -> BufferedResponse:
+    """Run an ASGI app and collect its response instead of sending it"""
+    response = BufferedResponse(status=500)
+    chunks = []
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response.status = message["status"]
+            response.headers = list(message.get("headers", []))
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    response.body = b"".join(chunks)
+    return response
+
+
+async def send_buffered(send, response: BufferedResponse, extra_headers: Iterable = (),
+                        head_only: bool = False) -> None:
+    """Send a BufferedResponse, replacing content-length and adding headers"""
+    extra = list(extra_headers)
+    replaced = {key.lower() for key, _ in extra} | {b"content-length"}
+    headers = [(key, value) for key, value in response.headers if key.lower() not in replaced]
+    headers.extend(extra)
+    headers.append((b"content-length", str(len(response.body)).encode("latin-1")))
+
+    await send({"type": "http.response.start", "status": response.status, "headers": headers})
+    await send({"type": "http.response.body", "body": b"" if head_only else response.body})
+
+
+def detached_receive():
+    """
+    A receive callable that delivers an empty request body and never
+    reports a disconnect, for work shared by several clients. It is marked
+    `detached` so RouteLimitsMiddleware does not watch it.
+    """
+    delivered = False
+
+    async def receive():
+        nonlocal delivered
+        if not delivered:
+            delivered = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()
+
+    receive.detached = True
+    return receive
+
+
+def get_header(scope, name: bytes) -> Optional[bytes]:
+    """Read a request header from an ASGI scope"""
+    name = name.lower()
+    for key, value in scope.get("headers", []):
+        if key == name:
+            return value
+    return None
@@ -0,0 +1,648 @@
+"""
+Tarihi Yarimada CBS - Response Cache
+Per-worker LRU/TTL response cache with an optional shared on-disk L2
+
+Read endpoints listed in CACHE_RULES are cached by ResponseCacheMiddleware
+under tags describing the tables they read. Write paths call
+invalidate_on_commit(db, *tags): the local worker purges its cache after
+the commit succeeds, and a Postgres NOTIFY (delivered on commit) lets
+the listener task in every other worker and node purge theirs.
+
+A miss records the generation of its tags before the route runs and is
+not stored if an invalidation bumped it meanwhile: the body may have been
+read before the write committed, and the purge already happened.
+
+Every entry carries a strong ETag (content hash). Compressed variants are
+cached under that ETag, so each version is compressed once per coding,
+and If-None-Match revalidation is answered with 304 without a body.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from anyio import to_thread
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from ..config import Settings, get_settings
+from .asgi import BufferedResponse, run_buffered, send_buffered, get_header
+from .compression import Compression, add_vary, get_compression
+
+logger = logging.getLogger(__name__)
+
+CACHE_CHANNEL = "cache_invalidation"
+ALL_TAGS = "*"
+
+# Cacheable GET routes and the tables (tags) their responses depend on
+CACHE_RULES: List[Tuple[re.Pattern, FrozenSet[str]]] = [
+    (re.compile(r"^/api/v1/assets$"), frozenset({"assets", "segments", "zones"})),
+    (re.compile(r"^/api/v1/assets/geojson$"), frozenset({"assets", "segments", "zones"})),
+    (re.compile(r"^/api/v1/assets/stats/summary$"), frozenset({"assets"})),
+    (re.compile(r"^/api/v1/ogc/wfs$"), frozenset({"assets", "segments", "zones"})),
+    (re.compile(r"^/api/v1/ogc/wfs/(capabilities|describe)$"), frozenset({"static"})),
+    (re.compile(r"^/api/v1/segments/by-asset/\d+$"), frozenset({"segments", "assets"})),
+    (re.compile(r"^/api/v1/segments/stats/summary$"), frozenset({"segments"})),
+    (re.compile(r"^/api/v1/notes/by-asset/\d+$"), frozenset({"notes", "assets"})),
+]
+
+
+def match_cache_rule(path: str) -> Optional[FrozenSet[str]]:
+    """Return the tags for a cacheable path, or None"""
+    for pattern, tags in CACHE_RULES:
+        if pattern.match(path):
+            return tags
+    return None
+
+
+def cache_key(scope) -> str:
+    """Normalized key: path plus sorted query parameters"""
+    query = scope.get("query_string", b"").decode("latin-1")
+    if query:
+        query = urlencode(sorted(parse_qsl(query, keep_blank_values=True)))
+    return f"{scope['path']}?{query}"
+
+
+def make_etag(body: bytes) -> bytes:
+    """Strong ETag from the body content"""
+    return b'"' + hashlib.blake2b(body, digest_size=16).hexdigest().encode("latin-1") + b'"'
+
+
+def variant_etag(etag: bytes, coding: str) -> bytes:
+    """ETag of a compressed variant ("<hash>-br")"""
+    return etag[:-1] + b"-" + coding.encode("latin-1") + b'"'
+
+
+def _etag_version(tag: bytes) -> bytes:
+    tag = tag.strip()
+    if tag.startswith(b"W/"):
+        tag = tag[2:]
+    return tag.strip(b'"').split(b"-")[0]
+
+
+def etag_matches(if_none_match: Optional[bytes], etag: bytes) -> bool:
+    """Weak If-None-Match comparison; any coding of the same version matches"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == b"*":
+        return True
+    version = _etag_version(etag)
+    return any(_etag_version(tag) == version for tag in if_none_match.split(b","))
+
+
+# ==================================================
+# Cache Tiers
+# ==================================================
+
+@dataclass
+class CacheEntry:
+    """Cached response body with its tags and expiry"""
+    status: int
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+    tags: FrozenSet[str]
+    expires_at: float
+
+    def __post_init__(self):
+        if not any(key.lower() == b"etag" for key, _ in self.headers):
+            self.headers = [*self.headers, (b"etag", make_etag(self.body))]
+
+    @property
+    def etag(self) -> bytes:
+        return next(value for key, value in self.headers if key.lower() == b"etag")
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(k) + len(v) for k, v in self.headers)
+
+    def to_response(self) -> BufferedResponse:
+        return BufferedResponse(status=self.status, headers=self.headers, body=self.body)
+
+
+class LRUCache:
+    """Size-bounded in-process LRU with TTL (L1)"""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.time():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        if entry.size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self.bytes += entry.size
+            while self._entries and (len(self._entries) > self.max_entries or self.bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, tags: Iterable[str]) -> int:
+        tags = set(tags)
+        with self._lock:
+            if ALL_TAGS in tags:
+                removed = len(self._entries)
+                self._entries.clear()
+                self.bytes = 0
+                return removed
+            keys = [key for key, entry in self._entries.items() if entry.tags & tags]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self.bytes -= entry.size
+
+
+class DiskCache:
+    """
+    SQLite-backed L2 shared by all workers on a node.
+
+    Entries outlive worker restarts; expiry uses wall-clock time so every
+    process agrees on it.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._writes = 0
+        # SQLite connections must not be shared with forked workers
+        os.register_at_fork(after_in_child=self._reset_connections)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    tags TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    status INTEGER NOT NULL,
+                    headers TEXT NOT NULL,
+                    body BLOB NOT NULL,
+                    size INTEGER NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_expires ON entries (expires_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _reset_connections(self) -> None:
+        self._local = threading.local()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        row = self._connect().execute(
+            "SELECT tags, expires_at, status, headers, body FROM entries WHERE key = ? AND expires_at > ?",
+            (key, time.time())
+        ).fetchone()
+        if row is None:
+            return None
+        tags, expires_at, status, headers, body = row
+        return CacheEntry(
+            status=status,
+            headers=[(k.encode("latin-1"), v.encode("latin-1")) for k, v in json.loads(headers)],
+            body=body,
+            tags=frozenset(tags.strip("|").split("|")),
+            expires_at=expires_at
+        )
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO entries (key, tags, expires_at, status, headers, body, size)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                key,
+                "|" + "|".join(sorted(entry.tags)) + "|",
+                entry.expires_at,
+                entry.status,
+                json.dumps([(k.decode("latin-1"), v.decode("latin-1")) for k, v in entry.headers]),
+                entry.body,
+                entry.size
+            )
+        )
+        self._writes += 1
+        if self._writes % 64 == 0:
+            self._evict(conn)
+
+    def invalidate(self, tags: Iterable[str]) -> int:
+        tags = set(tags)
+        conn = self._connect()
+        if ALL_TAGS in tags:
+            return conn.execute("DELETE FROM entries").rowcount
+        removed = 0
+        for tag in tags:
+            removed += conn.execute("DELETE FROM entries WHERE tags LIKE ?", (f"%|{tag}|%",)).rowcount
+        return removed
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        conn.execute("DELETE FROM entries WHERE expires_at <= ?", (time.time(),))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total > self.max_bytes:
+            # Drop the soonest-expiring entries until under budget
+            conn.execute("""
+                DELETE FROM entries WHERE key IN (
+                    SELECT key FROM (
+                        SELECT key, SUM(size) OVER (ORDER BY expires_at DESC) as running
+                        FROM entries
+                    ) WHERE running > ?
+                )
+            """, (self.max_bytes,))
+
+
+# ==================================================
+# Response Cache
+# ==================================================
+
+class ResponseCache:
+    """Two-tier response cache with hit/miss counters"""
+
+    def __init__(self, enabled: bool = True, ttl_seconds: float = 300,
+                 max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024,
+                 l2_path: Optional[str] = None, l2_max_bytes: int = 512 * 1024 * 1024,
+                 variant_max_bytes: int = 32 * 1024 * 1024,
+                 compression: Optional[Compression] = None):
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self.l1 = LRUCache(max_entries, max_bytes)
+        # L2 file is opened on first use, so importing this module touches no disk
+        self.l2_path = l2_path if enabled else None
+        self.l2_max_bytes = l2_max_bytes
+        self._l2: Optional[DiskCache] = None
+        self._l2_lock = threading.Lock()
+        # Compressed variants, keyed by ETag + coding (untagged: a new version has a new ETag)
+        self.variants = LRUCache(max_entries * 2, variant_max_bytes)
+        self._compression = compression
+        self.stats: Dict[str, int] = {
+            "hits_l1": 0, "hits_l2": 0, "misses": 0, "stores": 0, "stale_skips": 0,
+            "invalidations": 0, "notifications_received": 0,
+            "variant_hits": 0, "variant_compressions": 0
+        }
+        self._hooks: List[Callable[[FrozenSet[str]], None]] = []
+        # Invalidation counters per tag (ALL_TAGS counts full purges)
+        self._generations: Dict[str, int] = {}
+        self._compressing: Dict[str, asyncio.Task] = {}
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "ResponseCache":
+        mb = 1024 * 1024
+        return cls(
+            enabled=settings.RESPONSE_CACHE_ENABLED,
+            ttl_seconds=settings.RESPONSE_CACHE_TTL,
+            max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+            max_bytes=settings.RESPONSE_CACHE_MAX_MB * mb,
+            l2_path=settings.RESPONSE_CACHE_L2_PATH,
+            l2_max_bytes=settings.RESPONSE_CACHE_L2_MAX_MB * mb,
+            variant_max_bytes=settings.RESPONSE_CACHE_VARIANT_MB * mb
+        )
+
+    @property
+    def l2(self) -> Optional[DiskCache]:
+        if self._l2 is None and self.l2_path:
+            with self._l2_lock:
+                if self._l2 is None:
+                    self._l2 = DiskCache(self.l2_path, self.l2_max_bytes)
+        return self._l2
+
+    @property
+    def compression(self) -> Compression:
+        return self._compression or get_compression()
+
+    def on_invalidate(self, hook: Callable[[FrozenSet[str]], None]) -> None:
+        """Register a callback for tag invalidations (e.g. in-memory indexes)"""
+        self._hooks.append(hook)
+
+    def generation(self, tags: Iterable[str]) -> int:
+        """Changes whenever any of the tags is invalidated"""
+        return self._generations.get(ALL_TAGS, 0) + sum(self._generations.get(tag, 0) for tag in tags)
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self.l1.get(key)
+        if entry is not None:
+            self.stats["hits_l1"] += 1
+            return entry
+        if self.l2 is not None:
+            entry = await to_thread.run_sync(self.l2.get, key)
+            if entry is not None:
+                self.stats["hits_l2"] += 1
+                self.l1.set(key, entry)
+                return entry
+        self.stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        self.stats["stores"] += 1
+        self.l1.set(key, entry)
+        if self.l2 is not None:
+            await to_thread.run_sync(self.l2.set, key, entry)
+
+    async def variant(self, entry: CacheEntry, coding: str) -> bytes:
+        """
+        The entry body compressed with coding, compressed at most once per
+        version: from memory, then L2 (other workers), else compressed now.
+        """
+        key = f"variant:{variant_etag(entry.etag, coding).decode('latin-1')}"
+        cached = self.variants.get(key)
+        if cached is not None:
+            self.stats["variant_hits"] += 1
+            return cached.body
+
+        task = self._compressing.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._build_variant(key, entry, coding))
+            self._compressing[key] = task
+            task.add_done_callback(lambda t: self._variant_done(key, t))
+        return await asyncio.shield(task)
+
+    async def _build_variant(self, key: str, entry: CacheEntry, coding: str) -> bytes:
+        variant = None
+        if self.l2 is not None:
+            variant = await to_thread.run_sync(self.l2.get, key)
+        if variant is not None:
+            self.stats["variant_hits"] += 1
+        else:
+            body = await to_thread.run_sync(self.compression.compress, entry.body, coding, True)
+            self.stats["variant_compressions"] += 1
+            variant = CacheEntry(
+                status=entry.status,
+                headers=[(b"etag", variant_etag(entry.etag, coding))],
+                body=body,
+                tags=frozenset(),
+                expires_at=entry.expires_at
+            )
+            if self.l2 is not None:
+                await to_thread.run_sync(self.l2.set, key, variant)
+        self.variants.set(key, variant)
+        return variant.body
+
+    def _variant_done(self, key: str, task: asyncio.Task) -> None:
+        if self._compressing.get(key) is task:
+            del self._compressing[key]
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Compressing %s failed: %s", key, task.exception())
+
+    def invalidate(self, tags: Iterable[str]) -> int:
+        """Purge entries with any of the tags from L1 and L2 (this node)"""
+        tags = frozenset(tags)
+        self.stats["invalidations"] += 1
+        for tag in tags:
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+        removed = self.l1.invalidate(tags)
+        if self.l2 is not None:
+            try:
+                removed += self.l2.invalidate(tags)
+            except sqlite3.Error as e:
+                logger.warning("L2 cache invalidation failed: %s", e)
+        for hook in self._hooks:
+            hook(tags)
+        return removed
+
+    def snapshot(self) -> dict:
+        lookups = self.stats["hits_l1"] + self.stats["hits_l2"] + self.stats["misses"]
+        hits = self.stats["hits_l1"] + self.stats["hits_l2"]
+        return {
+            "enabled": self.enabled,
+            "pid": os.getpid(),
+            "ttl_seconds": self.ttl_seconds,
+            "l1_entries": len(self.l1),
+            "l1_bytes": self.l1.bytes,
+            "variant_entries": len(self.variants),
+            "variant_bytes": self.variants.bytes,
+            "l2_path": self.l2_path,
+            "hit_ratio": round(hits / lookups, 4) if lookups else None,
+            **self.stats
+        }
+
+
+# Hooks of the shared cache; may be registered before it is built
+_shared_hooks: List[Callable[[FrozenSet[str]], None]] = []
+
+
+def on_invalidate(hook: Callable[[FrozenSet[str]], None]) -> None:
+    """Register a callback for invalidations of the shared response cache"""
+    _shared_hooks.append(hook)
+
+
+def _run_shared_hooks(tags: FrozenSet[str]) -> None:
+    for hook in _shared_hooks:
+        hook(tags)
+
+
+@lru_cache()
+def get_response_cache() -> ResponseCache:
+    """Shared response cache from settings, built on first use"""
+    cache = ResponseCache.from_settings(get_settings())
+    cache.on_invalidate(_run_shared_hooks)
+    return cache
+
+
+def __getattr__(name: str):
+    # `from app.core.cache import response_cache` keeps working (PEP 562)
+    if name == "response_cache":
+        return get_response_cache()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# ==================================================
+# Invalidation (write paths)
+# ==================================================
+
+def invalidate_on_commit(db: Session, *tags: str) -> None:
+    """
+    Schedule cache invalidation for the current transaction.
+
+    NOTIFY is transactional, so other workers only hear about the change
+    once it is committed; the local purge runs in the after_commit hook.
+    """
+    db.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": CACHE_CHANNEL, "payload": json.dumps({"tags": list(tags), "pid": os.getpid()})}
+    )
+    db.info.setdefault("cache_invalidate_tags", set()).update(tags)
+
+
+@event.listens_for(Session, "after_commit")
+def _purge_after_commit(session: Session) -> None:
+    tags = session.info.pop("cache_invalidate_tags", None)
+    if tags:
+        get_response_cache().invalidate(tags)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop("cache_invalidate_tags", None)
+
+
+async def listen_for_invalidations(dsn: str, reconnect_delay: float = 5.0) -> None:
+    """
+    LISTEN for invalidation messages from other workers/nodes.
+
+    Runs for the lifetime of the worker; after a reconnect the whole cache
+    is dropped because notifications may have been missed meanwhile.
+    """
+    import psycopg2
+    import psycopg2.extensions
+
+    cache = get_response_cache()
+    loop = asyncio.get_running_loop()
+    first_connect = True
+
+    while True:
+        conn = None
+        try:
+            conn = await loop.run_in_executor(None, psycopg2.connect, dsn)
+            conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {CACHE_CHANNEL};")
+            if not first_connect:
+                cache.invalidate({ALL_TAGS})
+            first_connect = False
+
+            lost = loop.create_future()
+
+            def on_readable():
+                try:
+                    conn.poll()
+                except Exception as e:
+                    if not lost.done():
+                        lost.set_exception(e)
+                    return
+                while conn.notifies:
+                    notify = conn.notifies.pop(0)
+                    cache.stats["notifications_received"] += 1
+                    try:
+                        tags = json.loads(notify.payload).get("tags") or [ALL_TAGS]
+                    except ValueError:
+                        tags = [ALL_TAGS]
+                    cache.invalidate(tags)
+
+            loop.add_reader(conn.fileno(), on_readable)
+            try:
+                await lost
+            finally:
+                loop.remove_reader(conn.fileno())
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Cache invalidation listener disconnected: %s", e)
+        finally:
+            if conn is not None:
+                conn.close()
+        await asyncio.sleep(reconnect_delay)
+
+
+# ==================================================
+# Middleware
+# ==================================================
+
+class ResponseCacheMiddleware:
+    """Serve cacheable GET routes from ResponseCache (pure ASGI)"""
+
+    def __init__(self, app, cache: Optional[ResponseCache] = None):
+        self.app = app
+        self.cache = cache or get_response_cache()
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in ("GET", "HEAD")
+            or not self.cache.enabled
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        tags = match_cache_rule(scope["path"])
+        if tags is None:
+            await self.app(scope, receive, send)
+            return
+
+        key = cache_key(scope)
+        head_only = scope["method"] == "HEAD"
+        no_cache = b"no-cache" in (get_header(scope, b"cache-control") or b"")
+
+        entry = None if no_cache else await self.cache.get(key)
+        if entry is not None:
+            await self._send_entry(scope, send, entry, b"HIT", head_only)
+            return
+
+        generation = self.cache.generation(tags)
+        response = await run_buffered(self.app, scope, receive)
+        if (
+            response.status != 200
+            or response.header(b"set-cookie") is not None
+            or response.header(b"warning") is not None
+        ):
+            await send_buffered(send, response, [(b"x-cache", b"MISS")], head_only)
+            return
+
+        entry = CacheEntry(
+            status=response.status,
+            headers=response.headers,
+            body=response.body,
+            tags=tags,
+            expires_at=time.time() + self.cache.ttl_seconds
+        )
+        if self.cache.generation(tags) != generation:
+            # Invalidated while the route ran: the body may predate the write
+            self.cache.stats["stale_skips"] += 1
+        else:
+            await self.cache.set(key, entry)
+        await self._send_entry(scope, send, entry, b"MISS", head_only)
+
+    async def _send_entry(self, scope, send, entry: CacheEntry, cache_status: bytes,
+                          head_only: bool) -> None:
+        """Send an entry as 304, its compressed variant, or as-is"""
+        response = entry.to_response()
+        extra = [(b"x-cache", cache_status)]
+
+        coding = None
+        if self.cache.compression.should_compress(response.header(b"content-type"), len(response.body)):
+            response.headers = add_vary(response.headers)
+            coding = self.cache.compression.negotiate(get_header(scope, b"accept-encoding"))
+        etag = variant_etag(entry.etag, coding) if coding else entry.etag
+
+        if etag_matches(get_header(scope, b"if-none-match"), entry.etag):
+            headers = [(key, value) for key, value in response.headers if key.lower() == b"vary"]
+            headers += [(b"etag", etag), (b"x-cache", cache_status)]
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        if coding is not None:
+            response.body = await self.cache.variant(entry, coding)
+            extra += [(b"content-encoding", coding.encode("latin-1")), (b"etag", etag)]
+        await send_buffered(send, response, extra, head_only)
@@ -0,0 +1,339 @@
+"""
+Tarihi Yarimada CBS - Response Compression
+Content negotiation for br / zstd / gzip with size thresholds
+
+Cacheable responses are compressed by ResponseCacheMiddleware once per
+version (ETag) at a high level and the variants are kept next to the
+cache entry. Everything else passes through CompressionMiddleware, which
+compresses buffered bodies in one shot and streaming bodies
+incrementally, flushing each chunk so it reaches the client right away.
+Bodies and chunks of THREAD_MIN_BYTES or more are compressed in a worker
+thread, so a large export does not stall the event loop.
+
+brotli and zstandard are optional; without them only gzip is offered.
+"""
+
+import zlib
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from anyio import to_thread
+
+from ..config import Settings, get_settings
+from .asgi import Headers, get_header
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Content types worth compressing (prefix match)
+COMPRESSIBLE_TYPES: Tuple[bytes, ...] = (
+    b"application/json",
+    b"application/geo+json",
+    b"application/javascript",
+    b"application/x-ndjson",
+    b"application/xml",
+    b"image/svg+xml",
+    b"text/",
+)
+
+# Levels for per-request compression and for cached variants (compressed once)
+DYNAMIC_LEVELS = {"br": 4, "zstd": 3, "gzip": 6}
+CACHED_LEVELS = {"br": 9, "zstd": 12, "gzip": 9}
+
+# Bodies at least this large are compressed off the event loop
+THREAD_MIN_BYTES = 64 * 1024
+
+
+# ==================================================
+# Codecs
+# ==================================================
+
+class GzipStream:
+    """Incremental gzip compressor"""
+
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliStream:
+    """Incremental brotli compressor"""
+
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compressor.process(chunk) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdStream:
+    """Incremental zstd compressor"""
+
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, chunk: bytes) -> bytes:
+        return (
+            self._compressor.compress(chunk)
+            + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        )
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+def _compress_gzip(data: bytes, level: int) -> bytes:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _compress_br(data: bytes, level: int) -> bytes:
+    return brotli.compress(data, quality=level)
+
+
+def _compress_zstd(data: bytes, level: int) -> bytes:
+    return zstandard.ZstdCompressor(level=level).compress(data)
+
+
+# Server preference order; codecs whose module is missing are left out
+CODECS: Dict[str, Tuple] = {}
+if brotli is not None:
+    CODECS["br"] = (_compress_br, BrotliStream)
+if zstandard is not None:
+    CODECS["zstd"] = (_compress_zstd, ZstdStream)
+CODECS["gzip"] = (_compress_gzip, GzipStream)
+
+
+def parse_accept_encoding(value: Optional[bytes]) -> Dict[str, float]:
+    """Accept-Encoding -> {coding: q}"""
+    weights: Dict[str, float] = {}
+    if not value:
+        return weights
+    for part in value.decode("latin-1").lower().split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip()
+        if not coding:
+            continue
+        weight = 1.0
+        for param in params.split(";"):
+            name, _, number = param.strip().partition("=")
+            if name == "q":
+                try:
+                    weight = float(number)
+                except ValueError:
+                    weight = 0.0
+        weights[coding] = weight
+    return weights
+
+
+def is_compressible(content_type: Optional[bytes]) -> bool:
+    if not content_type:
+        return False
+    content_type = content_type.lower()
+    return any(content_type.startswith(prefix) for prefix in COMPRESSIBLE_TYPES)
+
+
+def add_vary(headers: Headers, value: bytes = b"Accept-Encoding") -> Headers:
+    """Append to (or add) the Vary header"""
+    result = []
+    found = False
+    for key, existing in headers:
+        if key.lower() == b"vary":
+            found = True
+            if value.lower() not in existing.lower():
+                existing = existing + b", " + value
+        result.append((key, existing))
+    if not found:
+        result.append((b"vary", value))
+    return result
+
+
+# ==================================================
+# Compression Policy
+# ==================================================
+
+class Compression:
+    """Negotiation, thresholds and levels shared by both middlewares"""
+
+    def __init__(self, enabled: bool = True, min_bytes: int = 1024,
+                 codecs: Optional[List[str]] = None):
+        self.enabled = enabled
+        self.min_bytes = min_bytes
+        self.codecs = [name for name in (codecs or CODECS) if name in CODECS]
+        self.stats = {"compressed": 0, "streamed": 0, "bytes_in": 0, "bytes_out": 0}
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "Compression":
+        codecs = [name.strip() for name in settings.COMPRESSION_CODECS.split(",") if name.strip()]
+        return cls(
+            enabled=settings.COMPRESSION_ENABLED,
+            min_bytes=settings.COMPRESSION_MIN_BYTES,
+            codecs=codecs
+        )
+
+    def negotiate(self, accept_encoding: Optional[bytes]) -> Optional[str]:
+        """Best coding the client accepts (client q first, then server order)"""
+        if not self.enabled:
+            return None
+        weights = parse_accept_encoding(accept_encoding)
+        best, best_weight = None, 0.0
+        for name in self.codecs:
+            weight = weights.get(name, weights.get("*", 0.0))
+            if weight > best_weight:
+                best, best_weight = name, weight
+        return best
+
+    def should_compress(self, content_type: Optional[bytes], size: Optional[int]) -> bool:
+        return is_compressible(content_type) and (size is None or size >= self.min_bytes)
+
+    def compress(self, data: bytes, coding: str, cached: bool = False) -> bytes:
+        """One-shot compression (cached variants use the higher level)"""
+        levels = CACHED_LEVELS if cached else DYNAMIC_LEVELS
+        compressed = CODECS[coding][0](data, levels[coding])
+        self.stats["compressed"] += 1
+        self.stats["bytes_in"] += len(data)
+        self.stats["bytes_out"] += len(compressed)
+        return compressed
+
+    def stream(self, coding: str):
+        self.stats["streamed"] += 1
+        return CODECS[coding][1](DYNAMIC_LEVELS[coding])
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "codecs": self.codecs,
+            "min_bytes": self.min_bytes,
+            "ratio": round(self.stats["bytes_out"] / self.stats["bytes_in"], 4)
+            if self.stats["bytes_in"] else None,
+            **self.stats
+        }
+
+
+@lru_cache()
+def get_compression() -> Compression:
+    """Compression policy from settings, built on first use"""
+    return Compression.from_settings(get_settings())
+
+
+def __getattr__(name: str):
+    # `from app.core.compression import compression` keeps working (PEP 562)
+    if name == "compression":
+        return get_compression()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# ==================================================
+# Middleware
+# ==================================================
+
+class CompressionMiddleware:
+    """
+    Compress responses that are not already encoded (pure ASGI).
+
+    Cached routes arrive here with Content-Encoding set by the response
+    cache and pass through untouched.
+    """
+
+    def __init__(self, app, policy: Optional[Compression] = None):
+        self.app = app
+        self.policy = policy or get_compression()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        coding = self.policy.negotiate(get_header(scope, b"accept-encoding"))
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        await self.app(scope, receive, CompressingSend(send, self.policy, coding))
+
+
+class CompressingSend:
+    """send() wrapper deciding on the first body message whether to compress"""
+
+    def __init__(self, send, policy: Compression, coding: str):
+        self.send = send
+        self.policy = policy
+        self.coding = coding
+        self.start = None
+        self.stream = None
+        self.passthrough = False
+
+    async def __call__(self, message):
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.stream is not None:
+            chunk = await self._run(self.stream.compress, body)
+            if not more_body:
+                chunk += self.stream.finish()
+            await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+            return
+
+        headers = list(self.start.get("headers", []))
+        header = dict((key.lower(), value) for key, value in headers)
+        size = len(body) if not more_body else None
+        if (
+            self.start["status"] in (204, 206, 304)
+            or b"content-encoding" in header
+            or b"content-range" in header
+            or not self.policy.should_compress(header.get(b"content-type"), size)
+        ):
+            self.passthrough = True
+            await self.send(self.start)
+            await self.send(message)
+            return
+
+        headers = [
+            (key, value) for key, value in add_vary(headers)
+            if key.lower() not in (b"content-length", b"etag")
+        ]
+        headers.append((b"content-encoding", self.coding.encode("latin-1")))
+        if b"etag" in header:
+            # A different representation: never strong-match the identity ETag
+            etag = header[b"etag"]
+            headers.append((b"etag", etag if etag.startswith(b"W/") else b"W/" + etag))
+
+        if not more_body:
+            body = await self._run(self.policy.compress, body, self.coding)
+            headers.append((b"content-length", str(len(body)).encode("latin-1")))
+            await self.send({**self.start, "headers": headers})
+            await self.send({"type": "http.response.body", "body": body})
+            return
+
+        self.stream = self.policy.stream(self.coding)
+        await self.send({**self.start, "headers": headers})
+        chunk = await self._run(self.stream.compress, body)
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": True})
+
+    @staticmethod
+    async def _run(func, body: bytes, *args):
+        if len(body) >= THREAD_MIN_BYTES:
+            return await to_thread.run_sync(func, body, *args)
+        return func(body, *args)
@@ -0,0 +1,314 @@
+"""
+Tarihi Yarimada CBS - Route Limits
+Per-route statement timeouts, query cancellation and admission control
+
+Every /api request gets a RoutePolicy:
+- timeout_ms is applied to each database transaction the request opens
+  (set_config('statement_timeout', ..., true) in after_begin), so a heavy
+  WFS or GeoJSON query cannot hold a pooled connection indefinitely.
+- GET requests watch for the client disconnecting and cancel their
+  running queries (psycopg2 connection.cancel()). Work shared by several
+  clients (a single-flight leader's computation) runs with a detached
+  receive and is never cancelled: one client leaving must not fail the
+  others. scripts/check_disconnect_cancel.py checks both cases.
+- group selects a concurrency limiter. When a group is saturated, requests
+  wait in a short queue; beyond the queue threshold or the queue timeout
+  they get an immediate 503 with Retry-After instead of piling up on the
+  connection pool. Exempt routes (health, segment types, WFS capabilities)
+  bypass admission, and the group limits leave a connection free for them.
+  Media uploads have their own group, so slow request bodies do not take
+  database slots and only UPLOAD_CONCURRENCY of them stream per worker.
+"""
+
+import asyncio
+import json
+import re
+import threading
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from anyio import to_thread
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from sqlalchemy import event, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from ..config import BACKGROUND_DB_CONNECTIONS, Settings, get_settings
+
+EXEMPT = "exempt"
+HEAVY = "heavy"
+UPLOAD = "upload"
+DEFAULT = "default"
+
+# (method or None for any, path pattern, admission group, statement timeout ms or None for default)
+ROUTE_POLICIES: List[Tuple[Optional[str], re.Pattern, str, Optional[int]]] = [
+    (None, re.compile(r"^/api/v1/health$"), EXEMPT, 2_000),
+    (None, re.compile(r"^/api/v1/segments/types$"), EXEMPT, None),
+    (None, re.compile(r"^/api/cesium-config$"), EXEMPT, None),
+    (None, re.compile(r"^/api/v1/ogc/wfs/(capabilities|describe)$"), EXEMPT, None),
+    (None, re.compile(r"^/api/v1/internal/"), EXEMPT, None),
+    ("POST", re.compile(r"^/api/v1/(assets|zones)/import$"), HEAVY, 120_000),
+    ("POST", re.compile(r"^/api/v1/assets/\d+/media/upload$"), UPLOAD, None),
+    ("PUT", re.compile(r"^/api/v1/segments/by-asset/\d+$"), HEAVY, 30_000),
+    (None, re.compile(r"^/api/v1/assets/geojson$"), HEAVY, 15_000),
+    (None, re.compile(r"^/api/v1/ogc/wfs$"), HEAVY, 15_000),
+    (None, re.compile(r"^/api/v1/assets/select$"), HEAVY, 8_000),
+    (None, re.compile(r"^/api/v1/viewer/visible$"), HEAVY, 8_000),
+    (None, re.compile(r"^/api/v1/(assets|segments|notes)/stats/summary$"), DEFAULT, 5_000),
+]
+
+
+@dataclass(frozen=True)
+class RoutePolicy:
+    group: str
+    timeout_ms: int
+
+
+def route_policy(method: str, path: str, default_timeout_ms: int) -> RoutePolicy:
+    """Admission group and statement timeout for a request"""
+    for rule_method, pattern, group, timeout_ms in ROUTE_POLICIES:
+        if (rule_method is None or rule_method == method) and pattern.match(path):
+            return RoutePolicy(group, timeout_ms or default_timeout_ms)
+    return RoutePolicy(DEFAULT, default_timeout_ms)
+
+
+# ==================================================
+# Per-Request Database Guard
+# ==================================================
+
+@dataclass
+class RequestGuard:
+    """Database state of one request, shared with its worker threads"""
+    timeout_ms: int
+    route: Optional[str] = None
+    connections: Dict[int, object] = field(default_factory=dict)
+    cancelled: bool = False
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def attach(self, session: Session, dbapi_connection) -> None:
+        with self._lock:
+            self.connections[id(session)] = dbapi_connection
+
+    def detach(self, session: Session) -> None:
+        with self._lock:
+            self.connections.pop(id(session), None)
+
+    def cancel(self) -> int:
+        """Cancel queries running on this request's connections"""
+        with self._lock:
+            self.cancelled = True
+            for dbapi_connection in self.connections.values():
+                dbapi_connection.cancel()
+            return len(self.connections)
+
+
+request_guard: ContextVar[Optional[RequestGuard]] = ContextVar("request_guard", default=None)
+
+
+@event.listens_for(Session, "after_begin")
+def _apply_statement_timeout(session: Session, transaction, connection) -> None:
+    guard = request_guard.get()
+    if guard is None:
+        return
+    connection.execute(
+        text("SELECT set_config('statement_timeout', :timeout, true)"),
+        {"timeout": f"{guard.timeout_ms}ms"}
+    )
+    guard.attach(session, connection.connection.dbapi_connection)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _release_connection(session: Session, transaction) -> None:
+    guard = request_guard.get()
+    if guard is not None and transaction.parent is None:
+        guard.detach(session)
+
+
+async def database_error_handler(request: Request, exc: OperationalError):
+    """Turn statement timeouts and cancellations into 504 instead of 500"""
+    if getattr(exc.orig, "pgcode", None) == "57014":              # query_canceled
+        return JSONResponse(
+            status_code=504,
+            content={"detail": "Query exceeded the time budget for this route"}
+        )
+    raise exc
+
+
+# ==================================================
+# Admission Control
+# ==================================================
+
+class RouteLimiter:
+    """Concurrency limit with a bounded, time-limited wait queue"""
+
+    def __init__(self, name: str, limit: int, max_queue: int, queue_timeout: float):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(limit)
+        self.stats = {"admitted": 0, "queued": 0, "rejected": 0, "timed_out": 0}
+
+    async def acquire(self) -> bool:
+        if self._semaphore.locked():
+            if self.waiting >= self.max_queue:
+                self.stats["rejected"] += 1
+                return False
+            self.stats["queued"] += 1
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.stats["timed_out"] += 1
+                return False
+            finally:
+                self.waiting -= 1
+        else:
+            await self._semaphore.acquire()
+        self.active += 1
+        self.stats["admitted"] += 1
+        return True
+
+    def release(self) -> None:
+        self.active -= 1
+        self._semaphore.release()
+
+    def snapshot(self) -> dict:
+        return {
+            "limit": self.limit,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "waiting": self.waiting,
+            **self.stats
+        }
+
+
+class AdmissionControl:
+    """Per-group limiters sized from the worker's connection pool"""
+
+    def __init__(self, limiters: Dict[str, RouteLimiter], default_timeout_ms: int,
+                 retry_after: int, enabled: bool = True):
+        self.limiters = limiters
+        self.default_timeout_ms = default_timeout_ms
+        self.retry_after = retry_after
+        self.enabled = enabled
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "AdmissionControl":
+        connections = max(1, settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW - BACKGROUND_DB_CONNECTIONS)
+        # Heavy routes get a third of the pool; one connection stays free for exempt routes
+        heavy = settings.ADMISSION_HEAVY_LIMIT or max(1, connections // 3)
+        default = settings.ADMISSION_LIMIT or max(1, connections - heavy - 1)
+        queue = settings.ADMISSION_MAX_QUEUE
+        timeout = settings.ADMISSION_QUEUE_TIMEOUT
+        return cls(
+            limiters={
+                HEAVY: RouteLimiter(HEAVY, heavy, queue, timeout),
+                # Uploads spend their time streaming, not in the database
+                UPLOAD: RouteLimiter(UPLOAD, settings.UPLOAD_CONCURRENCY, queue, timeout),
+                DEFAULT: RouteLimiter(DEFAULT, default, queue * 2, timeout),
+            },
+            default_timeout_ms=settings.DB_STATEMENT_TIMEOUT_MS,
+            retry_after=settings.ADMISSION_RETRY_AFTER,
+            enabled=settings.ADMISSION_ENABLED
+        )
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "default_timeout_ms": self.default_timeout_ms,
+            "groups": {name: limiter.snapshot() for name, limiter in self.limiters.items()}
+        }
+
+
+@lru_cache()
+def get_admission_control() -> AdmissionControl:
+    """Admission control from settings, built on first use"""
+    return AdmissionControl.from_settings(get_settings())
+
+
+def __getattr__(name: str):
+    # `from app.core.limits import admission_control` keeps working (PEP 562)
+    if name == "admission_control":
+        return get_admission_control()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# ==================================================
+# Middleware
+# ==================================================
+
+class RouteLimitsMiddleware:
+    """Apply admission control, statement timeouts and disconnect cancellation"""
+
+    def __init__(self, app, admission: Optional[AdmissionControl] = None):
+        self.app = app
+        self.admission = admission or get_admission_control()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith("/api/"):
+            await self.app(scope, receive, send)
+            return
+
+        policy = route_policy(scope["method"], scope["path"], self.admission.default_timeout_ms)
+        limiter = self.admission.limiters.get(policy.group) if self.admission.enabled else None
+        if limiter is not None and not await limiter.acquire():
+            await self._reject(send, limiter)
+            return
+
+        guard = RequestGuard(timeout_ms=policy.timeout_ms, route=f"{scope['method']} {scope['path']}")
+        token = request_guard.set(guard)
+        try:
+            if scope["method"] == "GET" and not getattr(receive, "detached", False):
+                await self._run_watched(scope, receive, send, guard)
+            else:
+                await self.app(scope, receive, send)
+        finally:
+            request_guard.reset(token)
+            if limiter is not None:
+                limiter.release()
+
+    async def _run_watched(self, scope, receive, send, guard: RequestGuard) -> None:
+        """Run a GET request, cancelling its queries if the client goes away"""
+        disconnected = asyncio.Event()
+        request_sent = False
+
+        async def app_receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def watch():
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    disconnected.set()
+                    await to_thread.run_sync(guard.cancel)
+                    return
+
+        watcher = asyncio.ensure_future(watch())
+        try:
+            await self.app(scope, app_receive, send)
+        finally:
+            watcher.cancel()
+
+    async def _reject(self, send, limiter: RouteLimiter) -> None:
+        body = json.dumps({"detail": "Server is busy, retry later", "group": limiter.name}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"retry-after", str(self.admission.retry_after).encode("latin-1")),
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
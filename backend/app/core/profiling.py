@@ -0,0 +1,326 @@
+"""
+Tarihi Yarimada CBS - Request Profiling
+Opt-in sampling profiler for single requests, guarded by a secret
+
+With PROFILING_SECRET set, a request carrying the secret in an
+X-Profile header runs under a sampling
+profiler: a background thread records the Python stack of the event loop
+thread and of every thread that runs SQL for the request, every
+PROFILING_INTERVAL_MS. The response is replaced by the profile:
+
+- format=json (default): route, status, duration, the SQL statements with
+  their timings, and the stacks in collapsed form
+- format=collapsed: plain "frame;frame;frame count" lines, the input
+  format of flamegraph.pl and speedscope; samples taken while a statement
+  was executing end in a "[sql] ..." frame
+
+(X-Profile-Format or ?profile_format= selects the format. The secret is
+only accepted as a header: query strings end up in access logs.) Profiled
+requests bypass the response cache so the route really runs, and are
+rate limited per worker (PROFILING_MAX_PER_MINUTE, 429 beyond). Profiles
+are also written to PROFILING_DIR when it is set.
+
+Without a secret the middleware and SQL hooks are not installed at all,
+so there is no per-request cost. Note that the event loop thread is shared
+with concurrent requests: under load its samples include their work too.
+"""
+
+import hmac
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode
+
+from anyio import to_thread
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from ..config import Settings, get_settings
+from .asgi import BufferedResponse, get_header, run_buffered, send_buffered
+
+PROFILE_HEADER = b"x-profile"
+FORMAT_HEADER = b"x-profile-format"
+FORMAT_PARAM = "profile_format"
+FORMATS = ("json", "collapsed")
+MAX_SQL_TEXT = 500
+MAX_STACK_DEPTH = 128
+
+# Directory prefixes trimmed from frame labels
+_PATH_PREFIXES = sorted({os.path.dirname(os.path.dirname(os.path.abspath(__file__)))} | {
+    path for path in sys.path if path and os.path.isdir(path)
+}, key=len, reverse=True)
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    for prefix in _PATH_PREFIXES:
+        if filename.startswith(prefix):
+            filename = filename[len(prefix):].lstrip(os.sep)
+            break
+    # co_firstlineno, not the current line, so samples of one function merge
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class ProfileSession:
+    """Samples and SQL timings of one profiled request"""
+
+    def __init__(self, interval: float, loop_thread: int):
+        self.interval = interval
+        self.threads = {loop_thread}
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self.sql: List[dict] = []
+        self.running_sql: Dict[int, str] = {}
+        self.started = time.perf_counter()
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._sampler.start()
+
+    def stop(self) -> float:
+        self._stop.set()
+        self._sampler.join()
+        return (time.perf_counter() - self.started) * 1000
+
+    def _run(self) -> None:
+        sampler = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for ident in list(self.threads):
+                frame = frames.get(ident)
+                if frame is None or ident == sampler:
+                    continue
+                if frame.f_code.co_name == "select" and frame.f_code.co_filename.endswith("selectors.py"):
+                    # Event loop waiting for I/O: one frame instead of the loop's own stack
+                    self.samples["[loop idle]"] += 1
+                    continue
+                stack = []
+                while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.reverse()
+                statement = self.running_sql.get(ident)
+                if statement is not None:
+                    stack.append(f"[sql] {statement}")
+                self.samples[";".join(stack)] += 1
+            self.sample_count += 1
+
+    # SQL hooks (called on the thread executing the statement)
+
+    def sql_started(self, statement: str) -> None:
+        ident = threading.get_ident()
+        self.threads.add(ident)
+        self.running_sql[ident] = " ".join(statement.split())[:120]
+
+    def sql_finished(self, statement: str, started: float, rowcount: Optional[int],
+                     error: Optional[BaseException] = None) -> None:
+        self.running_sql.pop(threading.get_ident(), None)
+        entry = {
+            "start_ms": round((started - self.started) * 1000, 2),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            "rows": rowcount,
+            "statement": " ".join(statement.split())[:MAX_SQL_TEXT],
+        }
+        if error is not None:
+            entry["error"] = type(error).__name__
+        self.sql.append(entry)
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+_current_session: ContextVar[Optional[ProfileSession]] = ContextVar("profile_session", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    session = _current_session.get()
+    if session is not None:
+        conn.info.setdefault("profile_started", []).append(time.perf_counter())
+        session.sql_started(statement)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    session = _current_session.get()
+    if session is not None:
+        started = conn.info["profile_started"].pop()
+        session.sql_finished(statement, started, cursor.rowcount)
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    session = _current_session.get()
+    conn = exception_context.connection
+    if session is not None and conn is not None and conn.info.get("profile_started"):
+        started = conn.info["profile_started"].pop()
+        session.sql_finished(exception_context.statement or "", started, None,
+                             error=exception_context.original_exception)
+
+
+class RequestProfiler:
+    """Secret check, per-worker rate limit and profile output"""
+
+    def __init__(self, secret: Optional[str], max_per_minute: int = 6, interval_ms: float = 2.0,
+                 output_dir: Optional[Path] = None):
+        self.secret = secret.encode("utf-8") if secret else None
+        self.max_per_minute = max_per_minute
+        self.interval = interval_ms / 1000
+        self.output_dir = output_dir
+        self.stats = {"profiled": 0, "rate_limited": 0}
+        self._recent: List[float] = []
+        self._installed = False
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "RequestProfiler":
+        return cls(
+            settings.PROFILING_SECRET,
+            max_per_minute=settings.PROFILING_MAX_PER_MINUTE,
+            interval_ms=settings.PROFILING_INTERVAL_MS,
+            output_dir=Path(settings.PROFILING_DIR) if settings.PROFILING_DIR else None
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.secret is not None
+
+    def install(self) -> None:
+        """Register the SQL timing hooks (only when profiling is enabled)"""
+        if self.enabled and not self._installed:
+            event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+            event.listen(Engine, "handle_error", _handle_error)
+            self._installed = True
+
+    def requested_format(self, scope) -> Optional[str]:
+        """Output format when the request carries the right secret, else None"""
+        supplied = get_header(scope, PROFILE_HEADER)
+        if not supplied or not hmac.compare_digest(supplied, self.secret):
+            return None
+        params = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+        fmt = (get_header(scope, FORMAT_HEADER) or b"").decode("latin-1") or params.get(FORMAT_PARAM, "json")
+        return fmt if fmt in FORMATS else "json"
+
+    def allow(self) -> bool:
+        now = time.monotonic()
+        self._recent = [at for at in self._recent if now - at < 60]
+        if len(self._recent) >= self.max_per_minute:
+            self.stats["rate_limited"] += 1
+            return False
+        self._recent.append(now)
+        self.stats["profiled"] += 1
+        return True
+
+    def store(self, profile_id: str, report: dict, collapsed: str) -> None:
+        if self.output_dir is None:
+            return
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        (self.output_dir / f"{profile_id}.json").write_text(json.dumps(report, indent=1), encoding="utf-8")
+        (self.output_dir / f"{profile_id}.collapsed").write_text(collapsed, encoding="utf-8")
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "max_per_minute": self.max_per_minute,
+            "interval_ms": self.interval * 1000,
+            "output_dir": str(self.output_dir) if self.output_dir else None,
+            **self.stats
+        }
+
+
+@lru_cache()
+def get_request_profiler() -> RequestProfiler:
+    """Profiler from settings, built on first use"""
+    return RequestProfiler.from_settings(get_settings())
+
+
+def __getattr__(name: str):
+    # `from app.core.profiling import request_profiler` keeps working (PEP 562)
+    if name == "request_profiler":
+        return get_request_profiler()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _strip_profile_params(scope) -> dict:
+    """Copy of scope without the profiling header and parameter, with caching bypassed"""
+    params = [
+        (key, value) for key, value in parse_qsl(scope.get("query_string", b"").decode("latin-1"),
+                                                  keep_blank_values=True)
+        if key != FORMAT_PARAM
+    ]
+    headers = [
+        (key, value) for key, value in scope.get("headers", [])
+        if key not in (PROFILE_HEADER, FORMAT_HEADER, b"cache-control")
+    ]
+    headers.append((b"cache-control", b"no-cache"))
+    return {**scope, "query_string": urlencode(params).encode("latin-1"), "headers": headers}
+
+
+class ProfilingMiddleware:
+    """Profile requests that carry the profiling secret (added only when enabled)"""
+
+    def __init__(self, app, profiler: Optional[RequestProfiler] = None):
+        self.app = app
+        self.profiler = profiler or get_request_profiler()
+        self.profiler.install()
+
+    async def __call__(self, scope, receive, send):
+        fmt = self.profiler.requested_format(scope) if scope["type"] == "http" else None
+        if fmt is None:
+            await self.app(scope, receive, send)
+            return
+        if not self.profiler.allow():
+            body = json.dumps({"detail": "Profiling rate limit reached, retry later"}).encode()
+            await send({"type": "http.response.start", "status": 429, "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"retry-after", b"60"),
+            ]})
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        inner_scope = _strip_profile_params(scope)
+        session = ProfileSession(self.profiler.interval, threading.get_ident())
+        token = _current_session.set(session)
+        session.start()
+        try:
+            response = await run_buffered(self.app, inner_scope, receive)
+        finally:
+            duration_ms = session.stop()
+            _current_session.reset(token)
+
+        profile_id = uuid.uuid4().hex[:12]
+        collapsed = session.collapsed()
+        report = {
+            "id": profile_id,
+            "method": scope["method"],
+            "path": scope["path"],
+            "query": inner_scope["query_string"].decode("latin-1"),
+            "status": response.status,
+            "response_bytes": len(response.body),
+            "duration_ms": round(duration_ms, 2),
+            "interval_ms": self.profiler.interval * 1000,
+            "samples": session.sample_count,
+            "sql_count": len(session.sql),
+            "sql_ms": round(sum(statement["duration_ms"] for statement in session.sql), 2),
+            "sql": session.sql,
+            "collapsed": collapsed,
+        }
+        await to_thread.run_sync(self.profiler.store, profile_id, report, collapsed)
+
+        if fmt == "collapsed":
+            body, content_type = collapsed.encode("utf-8"), b"text/plain; charset=utf-8"
+        else:
+            body, content_type = json.dumps(report).encode("utf-8"), b"application/json"
+        await send_buffered(send, BufferedResponse(status=200, headers=[
+            (b"content-type", content_type),
+            (b"cache-control", b"no-store"),
+            (b"x-profile-id", profile_id.encode("latin-1")),
+        ], body=body))
@@ -0,0 +1,58 @@
+"""
+Tarihi Yarimada CBS - JSON Responses
+orjson-backed default response class and validated-once fast paths
+
+Every route's JSON is rendered by orjson (datetime/date/UUID/Enum natively,
+Decimal the same way FastAPI's encoder does). Hot routes go further and
+return a ready Response: rows are validated once (or constructed with
+model_construct when the database already guarantees the types) and
+serialized by pydantic-core through a TypeAdapter, so FastAPI does not
+dump, re-validate and re-encode the result against response_model.
+"""
+
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi import Response
+from fastapi.encoders import decimal_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def json_default(value: Any) -> Any:
+    """Types orjson does not serialize natively"""
+    if isinstance(value, Decimal):
+        return decimal_encoder(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes"""
+    return orjson.dumps(content, default=json_default, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """Default response class: JSONResponse rendered with orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def json_response(body: bytes, status_code: int = 200) -> Response:
+    """Already-serialized JSON (skips response_model validation)"""
+    return Response(content=body, status_code=status_code, media_type="application/json")
+
+
+def adapter_response(adapter: TypeAdapter, value: Any, status_code: int = 200) -> Response:
+    """
+    Serialize an already validated (or model_construct-ed) value with
+    pydantic-core, without validating it again.
+    """
+    return json_response(adapter.dump_json(value), status_code)
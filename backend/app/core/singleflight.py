@@ -0,0 +1,98 @@
+"""
+Tarihi Yarimada CBS - Request Coalescing (single-flight)
+Concurrent identical reads within a worker share one computation
+
+When many clients request the same expensive resource at the same time,
+the first request (leader) runs the route and every identical request
+that arrives while it is in flight awaits the same result bytes. Nothing
+is kept after the leader finishes, so this adds no staleness; it sits
+inside ResponseCacheMiddleware and only sees cache misses.
+"""
+
+import asyncio
+import os
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from .asgi import BufferedResponse, detached_receive, run_buffered, send_buffered
+from .cache import cache_key
+
+# Expensive aggregate reads worth coalescing
+COALESCE_RULES: List[re.Pattern] = [
+    re.compile(r"^/api/v1/assets/geojson$"),
+    re.compile(r"^/api/v1/ogc/wfs$"),
+    re.compile(r"^/api/v1/(assets|segments|notes)/stats/summary$"),
+]
+
+
+class SingleFlight:
+    """Deduplicate concurrent calls by key"""
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.stats = {"leaders": 0, "coalesced": 0, "errors": 0}
+
+    @property
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable]) -> Tuple[Any, bool]:
+        """
+        Run fn() once per key at a time and share its result.
+
+        Returns (result, shared) where shared is True for followers. The
+        computation runs in its own task, so a leader whose client
+        disconnects does not cancel the result its followers are awaiting.
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(task), True
+
+        self.stats["leaders"] += 1
+        task = asyncio.ensure_future(fn())
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._done(key, t))
+        return await asyncio.shield(task), False
+
+    def _done(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled() and task.exception() is not None:
+            self.stats["errors"] += 1
+
+    def snapshot(self) -> dict:
+        total = self.stats["leaders"] + self.stats["coalesced"]
+        return {
+            "pid": os.getpid(),
+            "inflight": self.inflight,
+            "coalesce_ratio": round(self.stats["coalesced"] / total, 4) if total else None,
+            **self.stats
+        }
+
+
+single_flight = SingleFlight()
+
+
+class SingleFlightMiddleware:
+    """Coalesce identical in-flight GET requests on COALESCE_RULES routes"""
+
+    def __init__(self, app, flight: SingleFlight = single_flight):
+        self.app = app
+        self.flight = flight
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "GET"
+            or not any(pattern.match(scope["path"]) for pattern in COALESCE_RULES)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        async def compute() -> BufferedResponse:
+            # Followers share this result, so the leader's disconnect must not cancel it
+            return await run_buffered(self.app, scope, detached_receive())
+
+        response, shared = await self.flight.do(cache_key(scope), compute)
+        await send_buffered(send, response, [(b"x-coalesced", b"1")] if shared else [])
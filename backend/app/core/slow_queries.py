@@ -0,0 +1,257 @@
+"""
+Tarihi Yarimada CBS - Slow Query Log
+Statements above a duration threshold, with sampled EXPLAIN ANALYZE plans
+
+The engine hooks in app/db/database.py time every statement, including
+failed ones (statement_timeout), and hand those that take SLOW_QUERY_MS or
+longer to SlowQueryLog.observe. Each one is recorded in a bounded ring
+buffer (/api/v1/internal/slow-queries, behind INTERNAL_SECRET) and logged
+as one JSON line with:
+
+- the normalized statement (literals, including values inlined into
+  hand-built SQL, replaced by ?) and its fingerprint, so repeats group
+- the parameters redacted to their types and sizes
+- the route (from the request guard) and the duration
+
+For a SLOW_QUERY_EXPLAIN_RATE fraction of slow reads, the statement is run
+again with EXPLAIN (ANALYZE, BUFFERS) on a separate, unpooled connection
+in a background thread, inside a read-only transaction that is rolled back.
+At most one capture runs at a time per worker and each fingerprint is
+explained at most once per EXPLAIN_COOLDOWN_SECONDS, so a burst of slow
+requests does not double the load that caused it.
+"""
+
+import hashlib
+import itertools
+import json
+import logging
+import random
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import NullPool
+
+from ..config import Settings, get_settings
+from .limits import request_guard
+
+logger = logging.getLogger(__name__)
+
+MAX_STATEMENT_CHARS = 4000
+EXPLAIN_COOLDOWN_SECONDS = 300
+EXPLAIN_TIMEOUT_MS = 30_000
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.%])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b")
+_VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_REPEATED_ROWS = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+_READ_ONLY = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+_WRITES = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE|FOR\s+(NO\s+KEY\s+)?UPDATE|FOR\s+(KEY\s+)?SHARE)\b",
+                     re.IGNORECASE)
+
+
+def normalize_sql(statement: str) -> str:
+    """Statement with literals replaced by ? and whitespace collapsed"""
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _VALUE_LIST.sub("(...)", normalized)
+    normalized = _REPEATED_ROWS.sub("(...)", normalized)
+    return " ".join(normalized.split())[:MAX_STATEMENT_CHARS]
+
+
+def fingerprint(normalized: str) -> str:
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:12]
+
+
+def _describe(value) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, (str, bytes, bytearray, list, tuple, dict)):
+        return f"{type(value).__name__}({len(value)})"
+    return type(value).__name__
+
+
+def redact_params(parameters, executemany: bool = False):
+    """Parameter types and sizes, never values"""
+    if executemany:
+        return f"{len(parameters)} rows"
+    if isinstance(parameters, dict):
+        return {key: _describe(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_describe(value) for value in parameters]
+    return _describe(parameters)
+
+
+def is_explainable(statement: str) -> bool:
+    """Only plain reads are re-executed by EXPLAIN ANALYZE"""
+    return bool(_READ_ONLY.match(statement)) and not _WRITES.search(statement)
+
+
+class SlowQueryLog:
+    """Ring buffer of slow statements of this worker, with sampled plan capture"""
+
+    def __init__(self, threshold_ms: float = 500, explain_rate: float = 0.1, max_entries: int = 200):
+        self.threshold = threshold_ms / 1000
+        self.explain_rate = explain_rate
+        self.entries: deque = deque(maxlen=max_entries)
+        self.stats = {"recorded": 0, "failed": 0, "explained": 0, "explain_failed": 0, "explain_skipped": 0}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._explained_at: Dict[str, float] = {}
+        self._explain_busy = False
+        self._explain_engine: Optional[Engine] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "SlowQueryLog":
+        return cls(
+            threshold_ms=settings.SLOW_QUERY_MS,
+            explain_rate=settings.SLOW_QUERY_EXPLAIN_RATE,
+            max_entries=settings.SLOW_QUERY_BUFFER
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    def observe(self, engine: Engine, statement: str, parameters, executemany: bool, seconds: float,
+                rows: int = -1, error: Optional[BaseException] = None) -> None:
+        """Record a statement if it was slow (called from the engine hooks)"""
+        if seconds < self.threshold:
+            return
+        guard = request_guard.get()
+        normalized = normalize_sql(statement)
+        entry = {
+            "id": next(self._ids),
+            "at": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "duration_ms": round(seconds * 1000, 1),
+            "route": guard.route if guard is not None else None,
+            "fingerprint": fingerprint(normalized),
+            "statement": normalized,
+            "params": redact_params(parameters, executemany),
+            "rows": rows,
+            "error": type(error).__name__ if error is not None else None,
+            "plan": None,
+        }
+        with self._lock:
+            self.entries.append(entry)
+            self.stats["failed" if error is not None else "recorded"] += 1
+        logger.warning("slow_query %s", json.dumps(entry, default=str))
+
+        if error is None and not executemany and self._claim_explain(entry["fingerprint"], statement):
+            entry["plan"] = "pending"
+            self._submit_explain(engine, entry, statement, parameters)
+
+    # ==================================================
+    # Plan Capture
+    # ==================================================
+
+    def _claim_explain(self, key: str, statement: str) -> bool:
+        if self.explain_rate <= 0 or random.random() >= self.explain_rate or not is_explainable(statement):
+            return False
+        now = time.monotonic()
+        with self._lock:
+            if self._explain_busy or now - self._explained_at.get(key, -EXPLAIN_COOLDOWN_SECONDS) \
+                    < EXPLAIN_COOLDOWN_SECONDS:
+                self.stats["explain_skipped"] += 1
+                return False
+            self._explain_busy = True
+            self._explained_at[key] = now
+            return True
+
+    def _submit_explain(self, engine: Engine, entry: dict, statement: str, parameters) -> None:
+        if self._executor is None:
+            # Unpooled, and without the request engine's hooks: a capture
+            # neither takes a request connection nor records itself
+            self._explain_engine = create_engine(engine.url, poolclass=NullPool)
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+        self._executor.submit(self._explain, entry, statement, parameters)
+
+    def _explain(self, entry: dict, statement: str, parameters) -> None:
+        try:
+            with self._explain_engine.connect() as conn:
+                conn.exec_driver_sql("SET LOCAL transaction_read_only = on")
+                conn.exec_driver_sql(f"SET LOCAL statement_timeout = {EXPLAIN_TIMEOUT_MS}")
+                rows = conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters).all()
+                conn.rollback()
+            with self._lock:
+                entry["plan"] = "\n".join(row[0] for row in rows)
+                self.stats["explained"] += 1
+            logger.warning("slow_query_plan %s", json.dumps({
+                "id": entry["id"], "fingerprint": entry["fingerprint"], "plan": entry["plan"]
+            }))
+        except Exception as e:
+            with self._lock:
+                entry["plan"] = f"EXPLAIN failed: {e}"
+                self.stats["explain_failed"] += 1
+            logger.warning("Slow query plan capture failed for %s: %s", entry["fingerprint"], e)
+        finally:
+            with self._lock:
+                self._explain_busy = False
+
+    # ==================================================
+    # Diagnostics
+    # ==================================================
+
+    def recent(self, limit: int = 50, fingerprint: Optional[str] = None) -> List[dict]:
+        """Newest entries first, optionally for one fingerprint"""
+        with self._lock:
+            entries = [dict(entry) for entry in self.entries]
+        if fingerprint is not None:
+            entries = [entry for entry in entries if entry["fingerprint"] == fingerprint]
+        return entries[::-1][:limit]
+
+    def clear(self) -> None:
+        with self._lock:
+            self.entries.clear()
+            self._explained_at.clear()
+
+    def snapshot(self) -> dict:
+        """Settings, counters and the buffered entries grouped by fingerprint"""
+        with self._lock:
+            entries = list(self.entries)
+            stats = dict(self.stats)
+        groups: Dict[str, dict] = {}
+        for entry in entries:
+            group = groups.setdefault(entry["fingerprint"], {
+                "fingerprint": entry["fingerprint"], "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+                "routes": set(), "statement": entry["statement"]
+            })
+            group["count"] += 1
+            group["total_ms"] += entry["duration_ms"]
+            group["max_ms"] = max(group["max_ms"], entry["duration_ms"])
+            if entry["route"]:
+                group["routes"].add(entry["route"])
+        top = sorted(groups.values(), key=lambda group: group["total_ms"], reverse=True)
+        for group in top:
+            group["total_ms"] = round(group["total_ms"], 1)
+            group["routes"] = sorted(group["routes"])
+        return {
+            "enabled": self.enabled,
+            "threshold_ms": self.threshold * 1000,
+            "explain_rate": self.explain_rate,
+            "buffered": len(entries),
+            "max_entries": self.entries.maxlen,
+            **stats,
+            "top": top[:20],
+        }
+
+
+@lru_cache()
+def get_slow_query_log() -> SlowQueryLog:
+    """Slow query log from settings, built on first use (by get_engine)"""
+    return SlowQueryLog.from_settings(get_settings())
+
+
+def __getattr__(name: str):
+    # `from app.core.slow_queries import slow_query_log` keeps working (PEP 562)
+    if name == "slow_query_log":
+        return get_slow_query_log()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,422 @@
+"""
+Tarihi Yarimada CBS - Read-Model Snapshot
+Disk-persisted warm snapshot of the read endpoints
+
+The responses clients need for a first page load (asset list, GeoJSON,
+stats, WFS, segment lists) are periodically written to a versioned SQLite
+file. Workers open it read-only and memory-mapped at startup to prime
+their response cache, so they serve immediately after a restart, and fall
+back to it when Postgres is unreachable, marking those responses with a
+Warning header instead of returning 500s.
+
+Every worker hears about writes, but one rebuild per node is enough: a
+worker skips its rebuild when the snapshot file was captured after the
+write it was told about.
+"""
+
+import asyncio
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+
+from ..config import Settings, get_settings
+from .asgi import BufferedResponse, run_buffered, send_buffered
+from .cache import CacheEntry, ResponseCache, cache_key, match_cache_rule, on_invalidate
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+# Requests captured in every snapshot (path, query string)
+WARM_REQUESTS: List[Tuple[str, str]] = [
+    ("/api/v1/assets", ""),
+    ("/api/v1/assets/geojson", ""),
+    ("/api/v1/assets/stats/summary", ""),
+    ("/api/v1/segments/stats/summary", ""),
+    ("/api/v1/ogc/wfs", ""),
+    ("/api/v1/ogc/wfs/capabilities", ""),
+    ("/api/v1/ogc/wfs/describe", ""),
+]
+SEGMENTS_BY_ASSET_PATH = "/api/v1/segments/by-asset/{asset_id}"
+
+def _scope_key(path: str, query: str) -> str:
+    return cache_key({"path": path, "query_string": query.encode("latin-1")})
+
+
+# ==================================================
+# Snapshot File
+# ==================================================
+
+class SnapshotStore:
+    """Read-only, memory-mapped view of the current snapshot file"""
+
+    def __init__(self, path: Path, mmap_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self.mmap_bytes = mmap_bytes
+        self._conn: Optional[sqlite3.Connection] = None
+        self._inode: Optional[int] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.version: Optional[str] = None
+        self.created_at: Optional[float] = None
+
+    def connection(self) -> Optional[sqlite3.Connection]:
+        """(Re)open the file when it has been atomically replaced"""
+        now = time.monotonic()
+        if self._conn is not None and now - self._checked_at < 1.0:
+            return self._conn
+        self._checked_at = now
+        try:
+            inode = self.path.stat().st_ino
+        except FileNotFoundError:
+            return self._conn
+        if inode == self._inode and self._conn is not None:
+            return self._conn
+
+        try:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            conn.execute(f"PRAGMA mmap_size={self.mmap_bytes}")
+            meta = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+        except sqlite3.Error as e:
+            logger.warning("Snapshot %s could not be opened: %s", self.path, e)
+            return self._conn
+        if int(meta.get("format", 0)) != SNAPSHOT_FORMAT_VERSION:
+            conn.close()
+            return self._conn
+
+        if self._conn is not None:
+            self._conn.close()
+        self._conn, self._inode = conn, inode
+        self.version = meta.get("version")
+        self.created_at = float(meta.get("created_at", 0))
+        return conn
+
+    def captured_at(self) -> Optional[float]:
+        """Capture time of the current file (picks up a replaced file)"""
+        with self._lock:
+            self.connection()
+        return self.created_at
+
+    @property
+    def age_seconds(self) -> Optional[float]:
+        return time.time() - self.created_at if self.created_at else None
+
+    def get(self, key: str) -> Optional[BufferedResponse]:
+        with self._lock:
+            conn = self.connection()
+            if conn is None:
+                return None
+            row = conn.execute(
+                "SELECT status, headers, body FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        status, headers, body = row
+        return BufferedResponse(
+            status=status,
+            headers=[(k.encode("latin-1"), v.encode("latin-1")) for k, v in json.loads(headers)],
+            body=body
+        )
+
+    def entries(self) -> List[Tuple[str, BufferedResponse]]:
+        with self._lock:
+            conn = self.connection()
+            if conn is None:
+                return []
+            rows = conn.execute("SELECT key, status, headers, body FROM entries").fetchall()
+        return [
+            (key, BufferedResponse(
+                status=status,
+                headers=[(k.encode("latin-1"), v.encode("latin-1")) for k, v in json.loads(headers)],
+                body=body
+            ))
+            for key, status, headers, body in rows
+        ]
+
+
+def write_snapshot(path: Path, entries: List[Tuple[str, BufferedResponse]],
+                   captured_at: Optional[float] = None) -> str:
+    """Write entries to a new file and atomically replace the snapshot"""
+    digest = hashlib.sha256()
+    for key, response in sorted(entries, key=lambda item: item[0]):
+        digest.update(key.encode("utf-8"))
+        digest.update(response.body)
+    version = f"{SNAPSHOT_FORMAT_VERSION}-{digest.hexdigest()[:16]}"
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.tmp-{os.getpid()}")
+    if tmp_path.exists():
+        tmp_path.unlink()
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.execute("CREATE TABLE entries (key TEXT PRIMARY KEY, status INTEGER, headers TEXT, body BLOB)")
+        conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+            ("format", str(SNAPSHOT_FORMAT_VERSION)),
+            ("version", version),
+            ("created_at", str(captured_at or time.time())),
+        ])
+        conn.executemany("INSERT INTO entries VALUES (?, ?, ?, ?)", [
+            (
+                key,
+                response.status,
+                json.dumps([(k.decode("latin-1"), v.decode("latin-1")) for k, v in response.headers]),
+                response.body
+            )
+            for key, response in entries
+        ])
+        conn.commit()
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, path)
+    return version
+
+
+# ==================================================
+# Snapshot Manager
+# ==================================================
+
+class ReadModelSnapshot:
+    """Builds, refreshes and serves the read-model snapshot"""
+
+    def __init__(self, path: Path, refresh_seconds: float = 300, min_interval: float = 15,
+                 prime_ttl: float = 30, max_assets: int = 5000, enabled: bool = True):
+        self.enabled = enabled
+        self.path = path
+        self.refresh_seconds = refresh_seconds
+        self.min_interval = min_interval
+        self.prime_ttl = prime_ttl
+        self.max_assets = max_assets
+        self.store = SnapshotStore(path)
+        self.stats = {"builds": 0, "build_errors": 0, "stale_served": 0, "primed": 0}
+        # Wall-clock time of the oldest write not yet in the snapshot file
+        self._dirty_since: Optional[float] = None
+        self._last_build = 0.0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "ReadModelSnapshot":
+        default_path = settings.BASE_DIR / "var" / "snapshot" / "read-model.sqlite"
+        return cls(
+            enabled=settings.SNAPSHOT_ENABLED,
+            path=Path(settings.SNAPSHOT_PATH or default_path),
+            refresh_seconds=settings.SNAPSHOT_REFRESH_SECONDS,
+            min_interval=settings.SNAPSHOT_MIN_INTERVAL_SECONDS,
+            prime_ttl=settings.SNAPSHOT_PRIME_TTL,
+            max_assets=settings.SNAPSHOT_MAX_ASSETS
+        )
+
+    def mark_dirty(self, tags=None) -> None:
+        if self._dirty_since is None:
+            self._dirty_since = time.time()
+
+    def stale_headers(self) -> List[Tuple[bytes, bytes]]:
+        """Headers marking a response served from the snapshot"""
+        age = int(self.store.age_seconds or 0)
+        return [
+            (b"warning", b'110 - "Response is Stale"'),
+            (b"x-snapshot-version", (self.store.version or "").encode("latin-1")),
+            (b"x-snapshot-age", str(age).encode("latin-1")),
+        ]
+
+    def prime(self, cache: ResponseCache) -> int:
+        """Load snapshot entries into the L1 cache with a short TTL"""
+        if not (self.enabled and cache.enabled):
+            return 0
+        primed = 0
+        expires_at = time.time() + self.prime_ttl
+        entries = self.store.entries()
+        stale_headers = self.stale_headers()
+        for key, response in entries:
+            tags = match_cache_rule(key.split("?", 1)[0])
+            if tags is None or response.status != 200:
+                continue
+            cache.l1.set(key, CacheEntry(
+                status=response.status,
+                headers=response.headers + stale_headers,
+                body=response.body,
+                tags=tags,
+                expires_at=expires_at
+            ))
+            primed += 1
+        self.stats["primed"] += primed
+        return primed
+
+    async def build(self, app) -> Optional[str]:
+        """
+        Capture all warm requests through the router and write a snapshot.
+
+        Only one worker per node builds at a time (file lock); the others
+        pick up the new file on their next read. Returns the new version.
+        """
+        lock_path = self.path.with_name(self.path.name + ".lock")
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(lock_path, "w") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return None
+
+            captured_at = time.time()
+            from ..db.database import SessionLocal, get_engine
+            db = SessionLocal(bind=get_engine())
+            try:
+                asset_ids = [
+                    row.id for row in db.execute(
+                        text("SELECT id FROM heritage_assets ORDER BY id LIMIT :limit"),
+                        {"limit": self.max_assets}
+                    )
+                ]
+            finally:
+                db.close()
+
+            requests = WARM_REQUESTS + [
+                (SEGMENTS_BY_ASSET_PATH.format(asset_id=asset_id), "") for asset_id in asset_ids
+            ]
+            entries = []
+            for path, query in requests:
+                response = await run_buffered(app.router, _internal_scope(app, path, query), _empty_receive)
+                if response.status != 200:
+                    raise RuntimeError(f"Snapshot request {path} returned {response.status}")
+                entries.append((_scope_key(path, query), response))
+
+            version = await asyncio.get_running_loop().run_in_executor(
+                None, write_snapshot, self.path, entries, captured_at
+            )
+            self.stats["builds"] += 1
+            return version
+
+    async def run_refresher(self, app) -> None:
+        """
+        Rebuild periodically and shortly after writes (debounced).
+
+        The file on disk is shared by the node's workers: a rebuild is
+        skipped when it was captured after the write (or within the
+        refresh period), and a worker that finds another one building
+        keeps its mark and checks that worker's file next time.
+        """
+        while True:
+            await asyncio.sleep(self.min_interval)
+            captured_at = self.store.captured_at() or 0.0
+            if self._dirty_since is not None and captured_at >= self._dirty_since:
+                self._dirty_since = None
+            due = (time.time() - captured_at >= self.refresh_seconds
+                   and time.monotonic() - self._last_build >= self.refresh_seconds)
+            if self._dirty_since is None and not due:
+                continue
+            dirty_since, self._dirty_since = self._dirty_since, None
+            self._last_build = time.monotonic()
+            try:
+                version = await self.build(app)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["build_errors"] += 1
+                logger.warning("Snapshot build failed: %s", e)
+                continue
+            if version is None and dirty_since is not None:
+                self._dirty_since = dirty_since
+
+    def snapshot_info(self) -> dict:
+        self.store.connection()
+        return {
+            "enabled": self.enabled,
+            "path": str(self.path),
+            "version": self.store.version,
+            "age_seconds": round(self.store.age_seconds, 1) if self.store.age_seconds else None,
+            **self.stats
+        }
+
+
+async def _empty_receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+def _internal_scope(app, path: str, query: str) -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode("latin-1"),
+        "root_path": "",
+        "query_string": query.encode("latin-1"),
+        "headers": [(b"host", b"snapshot.internal")],
+        "client": None,
+        "server": None,
+        "app": app,
+    }
+
+
+@lru_cache()
+def get_read_model_snapshot() -> ReadModelSnapshot:
+    """Read-model snapshot from settings, built on first use"""
+    snapshot = ReadModelSnapshot.from_settings(get_settings())
+    # Rebuild soon after any write on any worker
+    on_invalidate(snapshot.mark_dirty)
+    return snapshot
+
+
+def __getattr__(name: str):
+    # `from app.core.snapshot import read_model_snapshot` keeps working (PEP 562)
+    if name == "read_model_snapshot":
+        return get_read_model_snapshot()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# ==================================================
+# Middleware
+# ==================================================
+
+class SnapshotFallbackMiddleware:
+    """Serve the last snapshot for cacheable reads when the database fails"""
+
+    def __init__(self, app, snapshot: Optional[ReadModelSnapshot] = None):
+        self.app = app
+        self.snapshot = snapshot or get_read_model_snapshot()
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "GET"
+            or not self.snapshot.enabled
+            or match_cache_rule(scope["path"]) is None
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            response = await run_buffered(self.app, scope, receive)
+            error = None if response.status < 500 else f"status {response.status}"
+        except Exception as e:
+            response, error = None, e
+
+        if error is None:
+            await send_buffered(send, response)
+            return
+
+        stale = await asyncio.get_running_loop().run_in_executor(
+            None, self.snapshot.store.get, cache_key(scope)
+        )
+        if stale is None:
+            if response is None:
+                raise error
+            await send_buffered(send, response)
+            return
+
+        self.snapshot.stats["stale_served"] += 1
+        logger.warning("Serving snapshot for %s: %s", scope["path"], error)
+        await send_buffered(send, stale, self.snapshot.stale_headers())
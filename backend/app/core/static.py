@@ -0,0 +1,169 @@
+"""
+Tarihi Yarimada CBS - Static Assets
+Content-hashed, precompressed frontend files (see scripts/build_static.py)
+
+The build step copies css/, js/ and images/ to dist/static/ under
+content-hashed names (js/main.js -> js/main.3f9a1c2b7d.js), writes .br/.gz
+siblings for text files and a manifest.json mapping source paths to hashed
+paths. The hashed files are served from /static with a one-year immutable
+Cache-Control, so returning visitors load them without revalidation, and
+index.html is rewritten to reference them and served with no-cache.
+
+Without a build the unversioned /css, /js and /images mounts keep working.
+"""
+
+import json
+import mimetypes
+import re
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+from ..config import Settings, get_settings
+from .asgi import get_header
+from .compression import add_vary, parse_accept_encoding
+
+STATIC_URL_PREFIX = "/static/"
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# Precompressed siblings written by the build, in server preference order
+PRECOMPRESSED: Tuple[Tuple[str, str], ...] = (("br", ".br"), ("gzip", ".gz"))
+
+# src="js/main.js", href="/css/styles.css" (relative to the site root)
+REFERENCE_PATTERN = re.compile(
+    r"""(?P<attr>\b(?:src|href))=(?P<quote>["'])/?(?P<path>(?:css|js|images)/[^"'?#]+)(?P=quote)"""
+)
+
+
+class StaticManifest:
+    """Source path -> hashed path mapping produced by the static build"""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.path = root / "manifest.json"
+        self._files: Dict[str, str] = {}
+        self._mtime: Optional[float] = None
+        self._index: Optional[Tuple[Tuple[float, Optional[float]], str]] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "StaticManifest":
+        if settings.STATIC_DIST_DIR:
+            return cls(Path(settings.STATIC_DIST_DIR))
+        return cls(settings.BASE_DIR / "dist" / "static")
+
+    @property
+    def available(self) -> bool:
+        return self.path.exists()
+
+    def files(self) -> Dict[str, str]:
+        """Current mapping (reloaded when the manifest file changes)"""
+        try:
+            mtime = self.path.stat().st_mtime
+        except FileNotFoundError:
+            return {}
+        with self._lock:
+            if mtime != self._mtime:
+                self._files = json.loads(self.path.read_text(encoding="utf-8"))["files"]
+                self._mtime = mtime
+            return self._files
+
+    def url(self, path: str) -> str:
+        """Hashed URL for a source path such as "js/main.js" (unversioned if not built)"""
+        path = path.lstrip("/")
+        hashed = self.files().get(path)
+        return STATIC_URL_PREFIX + hashed if hashed else "/" + path
+
+    def rewrite_html(self, html: str) -> str:
+        files = self.files()
+
+        def replace(match: re.Match) -> str:
+            hashed = files.get(match.group("path"))
+            if hashed is None:
+                return match.group(0)
+            quote = match.group("quote")
+            return f"{match.group('attr')}={quote}{STATIC_URL_PREFIX}{hashed}{quote}"
+
+        return REFERENCE_PATTERN.sub(replace, html)
+
+    def index_html(self, index_path: Path) -> str:
+        """index.html with hashed references, cached until either file changes"""
+        files = self.files()
+        version = (index_path.stat().st_mtime, self._mtime if files else None)
+        cached = self._index
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        html = self.rewrite_html(index_path.read_text(encoding="utf-8"))
+        self._index = (version, html)
+        return html
+
+
+@lru_cache()
+def get_static_manifest() -> StaticManifest:
+    """Hashed static manifest from settings, built on first use"""
+    return StaticManifest.from_settings(get_settings())
+
+
+def __getattr__(name: str):
+    # `from app.core.static import static_manifest` keeps working (PEP 562)
+    if name == "static_manifest":
+        return get_static_manifest()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class HashedStaticFiles(StaticFiles):
+    """
+    StaticFiles for content-hashed files: immutable caching, and the
+    precompressed .br/.gz sibling chosen by Accept-Encoding.
+
+    Without a directory it serves the static manifest root, resolved from
+    settings on the first request.
+    """
+
+    def __init__(self, *, manifest: Optional[StaticManifest] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.manifest = manifest
+
+    async def check_config(self) -> None:
+        if self.directory is None and not self.packages:
+            root = (self.manifest or get_static_manifest()).root
+            self.all_directories = [root]
+            # No build yet: answer 404 like an unmounted path instead of failing
+            if not root.exists():
+                return
+            self.directory = root
+        await super().check_config()
+
+    async def get_response(self, path: str, scope) -> Response:
+        if scope["method"] in ("GET", "HEAD"):
+            weights = parse_accept_encoding(get_header(scope, b"accept-encoding"))
+            accepted = {coding: weights.get(coding, weights.get("*", 0.0)) for coding, _ in PRECOMPRESSED}
+            for coding, suffix in sorted(PRECOMPRESSED, key=lambda item: -accepted[item[0]]):
+                if accepted[coding] <= 0:
+                    continue
+                full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + suffix)
+                if stat_result is not None:
+                    response = FileResponse(
+                        full_path,
+                        stat_result=stat_result,
+                        media_type=mimetypes.guess_type(path)[0] or "application/octet-stream",
+                        headers={"content-encoding": coding}
+                    )
+                    if self.is_not_modified(response.headers, Headers(scope=scope)):
+                        response = NotModifiedResponse(response.headers)
+                    return self._cacheable(response)
+
+        response = await super().get_response(path, scope)
+        return self._cacheable(response) if response.status_code in (200, 304) else response
+
+    @staticmethod
+    def _cacheable(response: Response) -> Response:
+        response.headers["cache-control"] = IMMUTABLE
+        response.raw_headers = add_vary(response.raw_headers)
+        return response
@@ -2,7 +2,7 @@
 Database module - SQLAlchemy models and database connection
 """
 
-from .database import engine, SessionLocal, get_db, init_db, Base
+from .database import get_engine, SessionLocal, get_db, init_db, Base
 from .models import (
     HeritageAsset,
     AssetSegment,
@@ -10,11 +10,13 @@ from .models import (
     Actor,
     AssetActor,
     Media,
-    UserNote
+    UserNote,
+    ProtectionZone,
+    AssetProtectionZone
 )
 
 __all__ = [
-    "engine",
+    "get_engine",
     "SessionLocal",
     "get_db",
     "init_db",
@@ -25,5 +27,7 @@ __all__ = [
     "Actor",
     "AssetActor",
     "Media",
-    "UserNote"
+    "UserNote",
+    "ProtectionZone",
+    "AssetProtectionZone"
 ]
@@ -6,60 +6,126 @@ Standards:
 - Dublin Core (metadata)
 - TUCBS Koruma Alanlari (heritage protection)
 - ISO 19115 (geographic metadata)
+
+The engine is created on first use (get_engine), so importing this module
+has no side effects. init_db() records a hash of the declared schema and
+skips all DDL on later starts while the hash matches.
 """
 
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker, declarative_base
-from typing import Generator
+import hashlib
+import logging
 import os
-from pathlib import Path
-from dotenv import load_dotenv
-
-# Load environment variables
-# Önce proje kök dizinindeki .env'i dene, sonra backend klasöründekini
-env_path = Path(__file__).parent.parent.parent.parent / ".env"
-if env_path.exists():
-    load_dotenv(env_path)
-else:
-    # Backend klasöründeki .env'i dene
-    env_path = Path(__file__).parent.parent.parent / ".env"
-    if env_path.exists():
-        load_dotenv(env_path)
-    else:
-        load_dotenv()  # Mevcut dizinde .env ara
-
-# Database URL from environment
-# Önce local_database_url (küçük harf), sonra LOCAL_DATABASE_URL, sonra DATABASE_URL
-DATABASE_URL = (
-    os.getenv("local_database_url") or 
-    os.getenv("LOCAL_DATABASE_URL") or 
-    os.getenv("DATABASE_URL") or
-    os.getenv("AZURE_DATABASE_URL")
-)
-
-if not DATABASE_URL:
-    raise ValueError(
-        "Veritabanı URL'i bulunamadı! "
-        ".env dosyasında 'local_database_url', 'LOCAL_DATABASE_URL' veya 'DATABASE_URL' tanımlı olmalı."
-    )
+import time
+from functools import lru_cache
+from typing import Generator, Optional
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.schema import CreateIndex, CreateTable
 
-# SQLAlchemy Engine
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
-    max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10"))
-)
+from ..config import get_settings
 
-# Session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+logger = logging.getLogger(__name__)
+
+# Session factory (bound to the engine by get_engine)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
 
 # Base class for models
 Base = declarative_base()
 
+SCHEMA_VERSION_TABLE = "schema_version"
+
+# pg_advisory_xact_lock key serializing schema setup across workers
+SCHEMA_LOCK_KEY = 7_120_301
+
+# Connection pool counters of this worker (see pool_snapshot)
+_pool_stats = {"checkouts": 0, "connects": 0, "peak_checked_out": 0}
+
+
+@lru_cache()
+def get_engine() -> Engine:
+    """Create the SQLAlchemy engine on first use"""
+    settings = get_settings()
+    if not settings.DATABASE_URL:
+        raise ValueError(
+            "Veritabanı URL'i bulunamadı! "
+            ".env dosyasında 'local_database_url', 'LOCAL_DATABASE_URL' veya 'DATABASE_URL' tanımlı olmalı."
+        )
+
+    engine = create_engine(
+        settings.DATABASE_URL,
+        pool_pre_ping=True,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW
+    )
+    SessionLocal.configure(bind=engine)
+
+    @event.listens_for(engine.pool, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        _pool_stats["connects"] += 1
+
+    @event.listens_for(engine.pool, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        _pool_stats["checkouts"] += 1
+        _pool_stats["peak_checked_out"] = max(_pool_stats["peak_checked_out"], engine.pool.checkedout())
+
+    # Slow query log: time every statement, including those that fail
+    from ..core.slow_queries import get_slow_query_log
+    slow_query_log = get_slow_query_log()
+    if slow_query_log.enabled:
+        @event.listens_for(engine, "before_cursor_execute")
+        def _start_timer(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def _record_slow_query(conn, cursor, statement, parameters, context, executemany):
+            seconds = time.perf_counter() - conn.info["query_started"].pop()
+            slow_query_log.observe(engine, statement, parameters, executemany, seconds, cursor.rowcount)
+
+        @event.listens_for(engine, "handle_error")
+        def _record_failed_query(exception_context):
+            conn, context = exception_context.connection, exception_context.execution_context
+            started = conn.info.get("query_started") if conn is not None else None
+            if started and exception_context.statement is not None:
+                slow_query_log.observe(
+                    engine, exception_context.statement, exception_context.parameters,
+                    context.executemany if context is not None else False,
+                    time.perf_counter() - started.pop(), error=exception_context.original_exception
+                )
+
+    return engine
+
+
+def pool_snapshot() -> dict:
+    """Connection pool occupancy of this worker (capacity = pool size + overflow)"""
+    pool = get_engine().pool
+    capacity = pool.size() + get_settings().DB_MAX_OVERFLOW
+    checked_out = pool.checkedout()
+    return {
+        "pid": os.getpid(),
+        "size": pool.size(),
+        "capacity": capacity,
+        "checked_out": checked_out,
+        "checked_in": pool.checkedin(),
+        "overflow": max(0, pool.overflow()),
+        "utilization": round(checked_out / capacity, 3) if capacity else None,
+        **_pool_stats
+    }
+
+
+def __getattr__(name: str):
+    # `from app.db.database import engine` keeps working (PEP 562)
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 def get_db() -> Generator:
     """Dependency injection for database session"""
+    get_engine()
     db = SessionLocal()
     try:
         yield db
@@ -67,24 +133,97 @@ def get_db() -> Generator:
         db.close()
 
 
-def init_db() -> None:
-    """Initialize database with PostGIS extension and create tables"""
-    # Enable PostGIS extension
-    with engine.connect() as conn:
-        conn.execute(text("CREATE EXTENSION IF NOT EXISTS postgis;"))
-        conn.commit()
+# ==================================================
+# Schema Setup
+# ==================================================
 
+@lru_cache()
+def schema_hash() -> str:
+    """Hash of the DDL for all declared tables and indexes"""
     # Import models to ensure they're registered with Base
     from . import models  # noqa: F401
 
-    # Create all tables
-    Base.metadata.create_all(bind=engine)
+    dialect = postgresql.dialect()
+    digest = hashlib.sha256()
+    for table in Base.metadata.sorted_tables:
+        digest.update(str(CreateTable(table).compile(dialect=dialect)).encode("utf-8"))
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            digest.update(str(CreateIndex(index).compile(dialect=dialect)).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _applied_schema_hash(conn: Connection) -> Optional[str]:
+    if conn.execute(text("SELECT to_regclass(:table)"), {"table": SCHEMA_VERSION_TABLE}).scalar() is None:
+        return None
+    return conn.execute(text(f"SELECT hash FROM {SCHEMA_VERSION_TABLE} WHERE id = 1")).scalar()
+
+
+def init_db(mode: Optional[str] = None) -> bool:
+    """
+    Initialize database with PostGIS extension and create tables.
+
+    mode (default: DB_INIT_MODE setting):
+    - auto: skip DDL when the recorded schema hash matches the models
+    - always: always run CREATE EXTENSION / create_all
+    - skip: do not touch the database
+
+    Returns True when DDL was executed.
+    """
+    mode = mode or get_settings().DB_INIT_MODE
+    if mode == "skip":
+        return False
+
+    engine = get_engine()
+    target = schema_hash()
+    if mode == "auto":
+        with engine.connect() as conn:
+            if _applied_schema_hash(conn) == target:
+                return False
+
+    with engine.begin() as conn:
+        conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+        # Another worker may have applied it while we waited for the lock
+        if mode == "auto" and _applied_schema_hash(conn) == target:
+            return False
+
+        # Enable PostGIS
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS postgis;"))
+
+        # pg_trgm (name search indexes) is optional: in a savepoint, so a
+        # server that does not allow it still gets the rest of the schema
+        try:
+            with conn.begin_nested():
+                conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm;"))
+        except DBAPIError as e:
+            logger.warning("pg_trgm unavailable, trigram search indexes skipped: %s", e.orig)
+
+        # Create all tables
+        Base.metadata.create_all(bind=conn)
+
+        # create_all only indexes tables it creates: add indexes declared
+        # since an existing table was created
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
+
+        conn.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS {SCHEMA_VERSION_TABLE} (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                hash VARCHAR(64) NOT NULL,
+                applied_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+            )
+        """))
+        conn.execute(text(f"""
+            INSERT INTO {SCHEMA_VERSION_TABLE} (id, hash) VALUES (1, :hash)
+            ON CONFLICT (id) DO UPDATE SET hash = EXCLUDED.hash, applied_at = now()
+        """), {"hash": target})
+    return True
 
 
 def check_db_connection() -> bool:
     """Check if database connection is working"""
     try:
-        with engine.connect() as conn:
+        with get_engine().connect() as conn:
             conn.execute(text("SELECT 1"))
         return True
     except Exception:
@@ -1,6 +1,6 @@
 """
 Tarihi Yarimada CBS - Database Models
-7 tables following Dublin Core + TUCBS + ISO 19115 standards
+9 tables following Dublin Core + TUCBS + ISO 19115 standards
 
 Tables:
 1. heritage_assets - Main heritage asset table
@@ -10,13 +10,15 @@ Tables:
 5. asset_actors - Asset-Actor relationship (many-to-many)
 6. media - Asset media/images
 7. user_notes - User notes on assets
+8. protection_zones - TUCBS protection zone polygons
+9. asset_protection_zones - Precomputed asset-zone membership
 """
 
 from sqlalchemy import (
     Column, Integer, String, Float, Boolean, DateTime, Text,
-    ForeignKey, Date, Index, UniqueConstraint
+    ForeignKey, Date, Index, UniqueConstraint, text
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from geoalchemy2 import Geometry
 
@@ -31,6 +33,9 @@ class HeritageAsset(Base):
     """
     Main heritage asset table
     Standards: Dublin Core + TUCBS Koruma Alanlari
+
+    Long text columns are deferred (group "long_text"); list and detail
+    reads go through services/read_models.py instead of ORM instances.
     """
     __tablename__ = "heritage_assets"
 
@@ -41,8 +46,8 @@ class HeritageAsset(Base):
     name_tr = Column(String(255), nullable=False)                 # title
     name_en = Column(String(255))
     asset_type = Column(String(50), nullable=False)               # type: cami, hamam...
-    description_tr = Column(Text)                                 # description
-    description_en = Column(Text)
+    description_tr = deferred(Column(Text), group="long_text")    # description
+    description_en = deferred(Column(Text), group="long_text")
 
     # === Chronology ===
     construction_year = Column(Integer)
@@ -53,14 +58,14 @@ class HeritageAsset(Base):
     location = Column(Geometry('POINT', srid=4326), nullable=False)
     footprint = Column(Geometry('POLYGON', srid=4326))
     neighborhood = Column(String(100))
-    address = Column(Text)
+    address = deferred(Column(Text), group="long_text")
 
     # === TUCBS Koruma Alanlari ===
     inspire_id = Column(String(100))
     protection_status = Column(String(50))                        # '1. derece', 'UNESCO'
     registration_no = Column(String(50))
     registration_date = Column(Date)
-    legal_foundation = Column(Text)
+    legal_foundation = deferred(Column(Text), group="long_text")
 
     # === 3D Model ===
     model_url = Column(String(500))                               # 3D Tiles or Splat URL
@@ -81,6 +86,7 @@ class HeritageAsset(Base):
     media = relationship("Media", back_populates="asset", cascade="all, delete-orphan")
     notes = relationship("UserNote", back_populates="asset", cascade="all, delete-orphan")
     segments = relationship("AssetSegment", back_populates="asset", cascade="all, delete-orphan")
+    zones = relationship("AssetProtectionZone", back_populates="asset", cascade="all, delete-orphan")
 
 
 # ==================================================
@@ -255,6 +261,56 @@ class UserNote(Base):
     asset = relationship("HeritageAsset", back_populates="notes")
 
 
+# ==================================================
+# Table 8: protection_zones (TUCBS Koruma Alanlari)
+# ==================================================
+
+class ProtectionZone(Base):
+    """
+    Protection zone polygons (sit alanlari, UNESCO buffer zones)
+    Standards: TUCBS Koruma Alanlari
+    """
+    __tablename__ = "protection_zones"
+
+    id = Column(Integer, primary_key=True)
+    identifier = Column(String(20), unique=True, nullable=False)  # "PZ-0001"
+    name_tr = Column(String(255), nullable=False)
+    name_en = Column(String(255))
+    zone_type = Column(String(50))                                # 'kentsel_sit', 'arkeolojik_sit', 'unesco'
+    protection_status = Column(String(50))                        # '1. derece', 'UNESCO'
+    legal_foundation = Column(Text)
+    inspire_id = Column(String(100))
+
+    # === Spatial (EPSG:4326) ===
+    geometry = Column(Geometry('MULTIPOLYGON', srid=4326), nullable=False)
+
+    # === Metadata ===
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    data_source = Column(String(255))
+
+    assets = relationship("AssetProtectionZone", back_populates="zone", cascade="all, delete-orphan")
+
+
+# ==================================================
+# Table 9: asset_protection_zones
+# ==================================================
+
+class AssetProtectionZone(Base):
+    """
+    Asset-Zone membership (many-to-many)
+    Precomputed with ST_Intersects on asset and zone writes, so zone
+    filters are plain index joins instead of polygon tests per request.
+    """
+    __tablename__ = "asset_protection_zones"
+
+    asset_id = Column(Integer, ForeignKey("heritage_assets.id", ondelete="CASCADE"), primary_key=True)
+    zone_id = Column(Integer, ForeignKey("protection_zones.id", ondelete="CASCADE"), primary_key=True)
+
+    asset = relationship("HeritageAsset", back_populates="zones")
+    zone = relationship("ProtectionZone", back_populates="assets")
+
+
 # ==================================================
 # Indexes
 # ==================================================
@@ -262,6 +318,7 @@ class UserNote(Base):
 # Spatial indexes (GIST)
 Index('idx_assets_location', HeritageAsset.location, postgresql_using='gist')
 Index('idx_assets_footprint', HeritageAsset.footprint, postgresql_using='gist')
+Index('idx_zones_geometry', ProtectionZone.geometry, postgresql_using='gist')
 
 # B-tree indexes
 Index('idx_assets_type', HeritageAsset.asset_type)
@@ -269,3 +326,22 @@ Index('idx_assets_period', HeritageAsset.historical_period)
 Index('idx_assets_identifier', HeritageAsset.identifier)
 Index('idx_segments_asset', AssetSegment.asset_id)
 Index('idx_segments_type', AssetSegment.segment_type)
+Index('idx_asset_zones_zone', AssetProtectionZone.zone_id, AssetProtectionZone.asset_id)
+Index('idx_notes_asset_created', UserNote.asset_id, UserNote.created_at)
+
+# Expression indexes for the case-insensitive list/GeoJSON filters (LOWER(col) = :value)
+Index('idx_assets_type_lower', func.lower(HeritageAsset.asset_type))
+Index('idx_assets_period_lower', func.lower(HeritageAsset.historical_period))
+
+# Trigram indexes (pg_trgm) for name search (ILIKE '%q%'); skipped where
+# init_db could not install the extension, search then scans
+def _has_pg_trgm(ddl, target, bind, **kw) -> bool:
+    if bind is None:
+        return True
+    return bind.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first() is not None
+
+
+Index('idx_assets_name_tr_trgm', HeritageAsset.name_tr, postgresql_using='gin',
+      postgresql_ops={'name_tr': 'gin_trgm_ops'}).ddl_if(callable_=_has_pg_trgm)
+Index('idx_assets_name_en_trgm', HeritageAsset.name_en, postgresql_using='gin',
+      postgresql_ops={'name_en': 'gin_trgm_ops'}).ddl_if(callable_=_has_pg_trgm)
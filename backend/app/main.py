@@ -11,36 +11,81 @@ Standards:
 
 from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, HTMLResponse
 from fastapi.staticfiles import StaticFiles
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 from sqlalchemy.orm import Session
 from sqlalchemy import text
-from pathlib import Path
-import os
+from sqlalchemy.exc import OperationalError
+import asyncio
+from anyio import to_thread
 
-from dotenv import load_dotenv
-load_dotenv()
-
-from .db.database import init_db, get_db, check_db_connection
+from .config import BASE_DIR, get_settings
+from .db.database import init_db, get_db, get_engine
 from .db.models import DatasetMetadata
-from .api import assets_router, segments_router, notes_router, ogc_router
-
-# Project root directory (one level up from backend)
-BASE_DIR = Path(__file__).resolve().parent.parent.parent
+from .services.read_models import asset_select, filter_assets, fetch_rows, SEARCH_FIELDS
+from .services.images import get_image_pipeline
+from .services.sprites import get_sprite_atlas
+from .api import (
+    assets_router, segments_router, notes_router, ogc_router,
+    zones_router, viewer_router, internal_router, images_router,
+    sprites_router
+)
+from .core.cache import get_response_cache, listen_for_invalidations, ResponseCacheMiddleware
+from .core.compression import CompressionMiddleware
+from .core.static import HashedStaticFiles, get_static_manifest
+from .core.singleflight import SingleFlightMiddleware
+from .core.snapshot import get_read_model_snapshot, SnapshotFallbackMiddleware
+from .core.limits import RouteLimitsMiddleware, database_error_handler
+from .core.profiling import get_request_profiler, ProfilingMiddleware
+from .core.responses import FastJSONResponse
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifecycle - initialize database on startup"""
+    response_cache = get_response_cache()
+    read_model_snapshot = get_read_model_snapshot()
+
+    # Serve the last read-model snapshot while the database warms up
+    if read_model_snapshot.enabled:
+        primed = read_model_snapshot.prime(response_cache)
+        print(f"Primed {primed} responses from snapshot {read_model_snapshot.store.version}")
+
     print("Initializing database...")
     try:
-        init_db()
-        print("Database tables created successfully!")
+        if init_db():
+            print("Database tables created successfully!")
+        else:
+            print("Database schema is up to date, skipped DDL")
     except Exception as e:
         print(f"Database initialization error: {e}")
+
+    # Sync (DB) routes run in AnyIO's thread pool; size it to the connection pool
+    to_thread.current_default_thread_limiter().total_tokens = get_settings().threadpool_size
+
+    background_tasks = []
+
+    # Cross-worker cache invalidation (Postgres LISTEN/NOTIFY)
+    if response_cache.enabled:
+        dsn = get_engine().url.set(drivername="postgresql").render_as_string(hide_password=False)
+        background_tasks.append(asyncio.create_task(listen_for_invalidations(dsn)))
+
+    # Periodic / post-write snapshot refresh
+    if read_model_snapshot.enabled:
+        background_tasks.append(asyncio.create_task(read_model_snapshot.run_refresher(app)))
+
+    # Sprite atlas of primary images (incremental, after media changes)
+    background_tasks.append(asyncio.create_task(get_sprite_atlas().run_rebuilder()))
+
     yield
 
+    for task in background_tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    get_image_pipeline().shutdown()
+
 
 # FastAPI application
 app = FastAPI(
@@ -62,14 +107,32 @@ Istanbul Tarihi Yarimada Kulturel Miras CBS Platformu API
     version="2.0.0",
     lifespan=lifespan,
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=FastJSONResponse
 )
 
+# Middleware is listed innermost first: route limits only see requests that
+# reach the database, coalescing only sees cache misses, snapshot fallback
+# catches database failures (and load shedding) below the cache, compression
+# only handles what the cache did not already send encoded, and all of them
+# sit inside CORS so no per-origin headers are shared or stored
+app.add_middleware(RouteLimitsMiddleware)
+app.add_middleware(SingleFlightMiddleware)
+app.add_middleware(SnapshotFallbackMiddleware)
+app.add_middleware(ResponseCacheMiddleware)
+app.add_middleware(CompressionMiddleware)
+
+# Opt-in request profiling wraps the whole stack (not installed without a secret)
+if get_request_profiler().enabled:
+    app.add_middleware(ProfilingMiddleware)
+
+# Statement timeouts / cancelled queries -> 504
+app.add_exception_handler(OperationalError, database_error_handler)
+
 # CORS configuration
-allowed_origins = os.getenv("ALLOWED_ORIGINS", "*").split(",")
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=allowed_origins if allowed_origins != ["*"] else ["*"],
+    allow_origins=get_settings().cors_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -80,6 +143,11 @@ app.include_router(assets_router)
 app.include_router(segments_router)
 app.include_router(notes_router)
 app.include_router(ogc_router)
+app.include_router(zones_router)
+app.include_router(viewer_router)
+app.include_router(internal_router)
+app.include_router(images_router)
+app.include_router(sprites_router)
 
 # Static files (CSS, JS, Images) - only if directories exist
 css_path = BASE_DIR / "css"
@@ -93,6 +161,9 @@ if js_path.exists():
 if images_path.exists():
     app.mount("/images", StaticFiles(directory=images_path), name="images")
 
+# Content-hashed build of the above (scripts/build_static.py), cached immutably
+app.mount("/static", HashedStaticFiles(), name="static")
+
 
 # ==================================================
 # Root & Health Endpoints
@@ -103,7 +174,11 @@ async def root():
     """Root endpoint - serve index.html or API info"""
     index_path = BASE_DIR / "index.html"
     if index_path.exists():
-        return FileResponse(index_path)
+        # Always revalidated, so a deploy's new asset hashes are picked up
+        static_manifest = get_static_manifest()
+        if static_manifest.available:
+            return HTMLResponse(static_manifest.index_html(index_path), headers={"Cache-Control": "no-cache"})
+        return FileResponse(index_path, headers={"Cache-Control": "no-cache"})
     return {
         "message": "Tarihi Yarimada CBS API",
         "version": "2.0.0",
@@ -113,7 +188,7 @@ async def root():
 
 
 @app.get("/api/v1/health")
-async def health_check(db: Session = Depends(get_db)):
+def health_check(db: Session = Depends(get_db)):
     """API health check endpoint"""
     try:
         db.execute(text("SELECT 1"))
@@ -138,7 +213,7 @@ async def get_cesium_config():
     Return Cesium Ion Access Token securely.
     Frontend uses this endpoint to get the token.
     """
-    cesium_token = os.getenv("CESIUM_TOKEN")
+    cesium_token = get_settings().CESIUM_TOKEN
 
     if not cesium_token:
         raise HTTPException(
@@ -157,7 +232,7 @@ async def get_cesium_config():
 # ==================================================
 
 @app.get("/api/v1/metadata")
-async def get_dataset_metadata(db: Session = Depends(get_db)):
+def get_dataset_metadata(db: Session = Depends(get_db)):
     """Get dataset-level metadata (ISO 19115)"""
     metadata = db.query(DatasetMetadata).first()
 
@@ -214,7 +289,7 @@ async def get_dataset_metadata(db: Session = Depends(get_db)):
 # ==================================================
 
 @app.get("/api/v1/search")
-async def search(
+def search(
     q: str,
     db: Session = Depends(get_db)
 ):
@@ -223,30 +298,8 @@ async def search(
 
     - **q**: Search query string
     """
-    from .db.models import HeritageAsset
-
-    assets = db.query(HeritageAsset).filter(
-        HeritageAsset.name_tr.ilike(f"%{q}%") |
-        HeritageAsset.name_en.ilike(f"%{q}%")
-    ).limit(20).all()
-
-    results = []
-    for asset in assets:
-        # Get coordinates
-        coords = db.execute(
-            text("SELECT ST_X(location) as lon, ST_Y(location) as lat FROM heritage_assets WHERE id = :id"),
-            {"id": asset.id}
-        ).fetchone()
-
-        results.append({
-            "id": asset.id,
-            "identifier": asset.identifier,
-            "name_tr": asset.name_tr,
-            "name_en": asset.name_en,
-            "asset_type": asset.asset_type,
-            "longitude": coords.lon if coords else None,
-            "latitude": coords.lat if coords else None
-        })
+    rows = fetch_rows(db, filter_assets(asset_select(SEARCH_FIELDS), search=q).limit(20))
+    results = [dict(row._mapping) for row in rows]
 
     return {"results": results, "count": len(results)}
 
@@ -3,11 +3,13 @@ Tarihi Yarimada CBS - Asset Pydantic Schemas
 Request/Response models for Heritage Assets
 """
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, computed_field
 from typing import Optional, List, Any
 from datetime import datetime, date
 from enum import Enum
 
+from ..services.images import get_image_pipeline
+
 
 class AssetType(str, Enum):
     """Heritage asset types"""
@@ -40,6 +42,12 @@ class ModelType(str, Enum):
     TILES_3D = "3DTILES"
 
 
+class Language(str, Enum):
+    """Response language (drops the other language's fields)"""
+    TR = "tr"
+    EN = "en"
+
+
 # ==================================================
 # Asset Schemas
 # ==================================================
@@ -141,7 +149,8 @@ class GeoJSONGeometry(BaseModel):
 class AssetGeoJSONProperties(BaseModel):
     """GeoJSON feature properties for asset"""
     identifier: str
-    name_tr: str
+    name_tr: Optional[str] = None  # name_en instead with ?lang=en
+    name_en: Optional[str] = None
     asset_type: str
     historical_period: Optional[str] = None
     construction_year: Optional[int] = None
@@ -171,6 +180,63 @@ class AssetFeatureCollection(BaseModel):
     features: List[AssetGeoJSONFeature]
 
 
+# ==================================================
+# Spatial Selection Schemas
+# ==================================================
+
+class SelectionOutput(str, Enum):
+    """Spatial selection output formats"""
+    FEATURES = "features"
+    IDS = "ids"
+
+
+class AssetSelectRequest(BaseModel):
+    """Polygon lasso or buffered corridor selection"""
+    geometry: dict                                               # GeoJSON Polygon/MultiPolygon/LineString
+    buffer_m: float = Field(default=0, ge=0, le=5000)
+    output: SelectionOutput = SelectionOutput.FEATURES
+    asset_type: Optional[str] = Field(None, max_length=50)
+    limit: int = Field(default=1000, ge=1, le=10000)
+
+
+class AssetSelectIds(BaseModel):
+    """Spatial selection result as ids only"""
+    ids: List[int]
+    identifiers: List[str]
+    count: int
+
+
+# ==================================================
+# Bulk Import Schemas
+# ==================================================
+
+class ImportFormat(str, Enum):
+    """Bulk import input formats"""
+    GEOJSON = "geojson"
+    CSV = "csv"
+
+
+class AssetImportError(BaseModel):
+    """Rejected import row (1-based record number)"""
+    row: int
+    identifier: Optional[str] = None
+    message: str
+
+
+class AssetImportResult(BaseModel):
+    """Bulk import summary with per-row errors"""
+    received: int
+    valid: int
+    inserted: int
+    updated: int
+    duplicates: int
+    memberships: int
+    error_count: int
+    errors_truncated: bool
+    errors: List[AssetImportError]
+    dry_run: bool
+
+
 # ==================================================
 # Actor Schemas
 # ==================================================
@@ -221,6 +287,18 @@ class MediaResponse(MediaBase):
     asset_id: int
     created_at: Optional[datetime] = None
 
+    @computed_field
+    @property
+    def srcset(self) -> Optional[str]:
+        """Resized WebP variants (/images/derived/{width}/...), None for external URLs"""
+        return get_image_pipeline().srcset(self.url, "webp")
+
+    @computed_field
+    @property
+    def srcset_avif(self) -> Optional[str]:
+        """Resized AVIF variants when the server can encode AVIF"""
+        return get_image_pipeline().srcset(self.url, "avif")
+
 
 # ==================================================
 # Dataset Metadata Schema
@@ -24,6 +24,22 @@ class SegmentType(str, Enum):
     OTHER = "other"            # Diger
 
 
+# Segment type code -> Turkish name (GET /api/v1/segments/types)
+SEGMENT_TYPES = {
+    "dome": "Kubbe",
+    "minaret": "Minare",
+    "portal": "Tackapi/Giris",
+    "wall": "Duvar",
+    "window": "Pencere",
+    "courtyard": "Avlu",
+    "fountain": "Sadirvan",
+    "column": "Sutun",
+    "arch": "Kemer",
+    "roof": "Cati",
+    "other": "Diger"
+}
+
+
 class ConditionType(str, Enum):
     """Segment condition types"""
     ORIGINAL = "original"
@@ -85,6 +101,33 @@ class SegmentWithAsset(SegmentResponse):
     asset_identifier: Optional[str] = None
 
 
+# ==================================================
+# Batch Ingest Schemas (SAM3D export)
+# ==================================================
+
+class SegmentIngestItem(SegmentBase):
+    """One segment of a SAM3D export; object_id is its stable key"""
+    object_id: str = Field(..., min_length=1, max_length=50)
+
+
+class SegmentIngest(BaseModel):
+    """All segments of one model, as exported by a SAM3D run"""
+    segments: List[SegmentIngestItem]
+    prune: bool = Field(True, description="Delete existing segments whose object_id is not in the export")
+    dry_run: bool = False
+
+
+class SegmentIngestResult(BaseModel):
+    """Outcome of a batch ingest"""
+    asset_id: int
+    received: int
+    inserted: int
+    updated: int
+    unchanged: int
+    deleted: int
+    dry_run: bool = False
+
+
 # ==================================================
 # Segment Statistics Schemas
 # ==================================================
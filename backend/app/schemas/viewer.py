@@ -0,0 +1,57 @@
+"""
+Tarihi Yarimada CBS - Viewer Pydantic Schemas
+Request/Response models for Cesium viewer visibility queries
+"""
+
+from pydantic import BaseModel, Field
+from typing import Optional, List
+
+
+# ==================================================
+# Camera Schemas
+# ==================================================
+
+class ViewerCamera(BaseModel):
+    """Cesium camera position and orientation (degrees, ellipsoid height)"""
+    longitude: float = Field(..., ge=-180, le=180)
+    latitude: float = Field(..., ge=-90, le=90)
+    height: float = Field(..., ge=-1000, le=1_000_000)
+    heading: float = 0.0                                          # clockwise from north
+    pitch: float = -45.0                                          # negative looks down
+    roll: float = 0.0
+
+
+class ViewerVisibleRequest(BaseModel):
+    """Frustum visibility query (matches Cesium.PerspectiveFrustum)"""
+    camera: ViewerCamera
+    fov: float = Field(default=60.0, gt=0, lt=180)                # larger-dimension FOV, degrees
+    aspect_ratio: float = Field(default=16 / 9, gt=0)
+    near: float = Field(default=1.0, gt=0)
+    far: float = Field(default=20_000.0, gt=0)
+    screen_height: int = Field(default=1080, gt=0, le=10_000)     # canvas height in pixels
+    min_pixel_size: float = Field(default=2.0, ge=0)
+    max_results: int = Field(default=20, ge=1, le=500)
+
+
+# ==================================================
+# Response Schemas
+# ==================================================
+
+class ViewerVisibleAsset(BaseModel):
+    """Visible asset with recommended level of detail"""
+    id: int
+    identifier: str
+    distance_m: float
+    screen_size_px: float
+    model_lod: str
+    model_type: Optional[str] = None
+    model_url: Optional[str] = None
+    cesium_ion_asset_id: Optional[int] = None
+
+
+class ViewerVisibleResponse(BaseModel):
+    """Assets in the view frustum, most important first"""
+    assets: List[ViewerVisibleAsset]
+    count: int
+    in_frustum: int
+    total_assets: int
@@ -0,0 +1,63 @@
+"""
+Tarihi Yarimada CBS - Protection Zone Pydantic Schemas
+Request/Response models for TUCBS protection zones
+"""
+
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Optional, List, Any, Dict
+from datetime import datetime
+
+
+# ==================================================
+# Protection Zone Schemas
+# ==================================================
+
+class ZoneBase(BaseModel):
+    """Base protection zone schema"""
+    identifier: str = Field(..., max_length=20)
+    name_tr: str = Field(..., min_length=1, max_length=255)
+    name_en: Optional[str] = Field(None, max_length=255)
+    zone_type: Optional[str] = Field(None, max_length=50)
+    protection_status: Optional[str] = Field(None, max_length=50)
+    legal_foundation: Optional[str] = None
+    inspire_id: Optional[str] = Field(None, max_length=100)
+    data_source: Optional[str] = Field(None, max_length=255)
+
+
+class ZoneCreate(ZoneBase):
+    """Schema for creating a zone (geometry as GeoJSON Polygon/MultiPolygon)"""
+    geometry: Dict[str, Any]
+
+
+class ZoneResponse(ZoneBase):
+    """Protection zone response schema"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    asset_count: Optional[int] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+# ==================================================
+# Bulk Import Schemas
+# ==================================================
+
+class ZoneFeature(BaseModel):
+    """GeoJSON Feature for a protection zone"""
+    type: str = "Feature"
+    geometry: Dict[str, Any]
+    properties: ZoneBase
+
+
+class ZoneFeatureCollection(BaseModel):
+    """GeoJSON FeatureCollection for bulk zone import"""
+    type: str = "FeatureCollection"
+    features: List[ZoneFeature]
+
+
+class ZoneImportResult(BaseModel):
+    """Bulk import summary"""
+    imported: int
+    zone_ids: List[int]
+    memberships: int
@@ -0,0 +1,17 @@
+"""
+Services module - domain logic shared between API routers and scripts
+"""
+
+from .zones import (
+    refresh_asset_zones,
+    refresh_zone_assets,
+    upsert_zones,
+    ZONE_FILTER_SQL
+)
+
+__all__ = [
+    "refresh_asset_zones",
+    "refresh_zone_assets",
+    "upsert_zones",
+    "ZONE_FILTER_SQL"
+]
@@ -0,0 +1,314 @@
+"""
+Tarihi Yarimada CBS - Asset Import
+Bulk GeoJSON / CSV asset import through COPY and a single upsert
+
+Records are parsed incrementally from a file object (a GeoJSON
+FeatureCollection one feature at a time, or CSV rows), validated in
+batches against AssetCreate and COPYed into a temporary staging table,
+so memory is bounded by one batch whatever the file size. One statement
+then updates existing assets and inserts new ones (the last row wins for
+repeated identifiers), and zone membership is refreshed for every written
+asset in the same transaction.
+
+Invalid rows are skipped and reported by row number. Each staged row
+carries the columns it provided (a CSV row with an empty cell does not
+provide that column), and an existing asset only has those columns
+updated: a sparse column never blanks the rows that left it empty.
+"""
+
+import csv
+import io
+import json
+import re
+from dataclasses import dataclass, field
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..schemas.asset import AssetCreate
+from .zones import refresh_asset_zones
+
+IMPORT_FORMATS = ("geojson", "csv")
+BATCH_SIZE = 5000
+MAX_REPORTED_ERRORS = 1000
+READ_CHUNK = 1024 * 1024
+MAX_FEATURE_BYTES = 16 * 1024 * 1024
+
+# heritage_assets columns an import can set (location comes from longitude/latitude)
+IMPORT_COLUMNS: Tuple[str, ...] = (
+    "identifier", "name_tr", "name_en", "asset_type", "description_tr", "description_en",
+    "construction_year", "construction_period", "historical_period", "neighborhood",
+    "address", "protection_status", "registration_no", "registration_date",
+    "legal_foundation", "model_url", "model_type", "model_lod", "cesium_ion_asset_id",
+    "is_visitable", "data_source"
+)
+STAGING_COLUMNS: Tuple[str, ...] = ("row_no",) + IMPORT_COLUMNS + ("longitude", "latitude", "provided")
+
+STAGING_SQL = """
+    CREATE TEMP TABLE asset_import_staging (
+        row_no integer, identifier text, name_tr text, name_en text, asset_type text,
+        description_tr text, description_en text, construction_year integer,
+        construction_period text, historical_period text, neighborhood text,
+        address text, protection_status text, registration_no text,
+        registration_date date, legal_foundation text, model_url text,
+        model_type text, model_lod text, cesium_ion_asset_id integer,
+        is_visitable boolean, data_source text,
+        longitude double precision, latitude double precision,
+        provided text[]
+    ) ON COMMIT DROP
+"""
+
+_FEATURES_START = re.compile(r'"features"\s*:\s*\[')
+_SEPARATORS = re.compile(r"[\s,]*")
+
+
+@dataclass
+class ImportReport:
+    received: int = 0
+    valid: int = 0
+    inserted: int = 0
+    updated: int = 0
+    duplicates: int = 0
+    memberships: int = 0
+    error_count: int = 0
+    errors: List[dict] = field(default_factory=list)
+    dry_run: bool = False
+
+    def add_error(self, row: int, identifier: Optional[str], message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "identifier": identifier, "message": message})
+
+    @property
+    def errors_truncated(self) -> bool:
+        return self.error_count > len(self.errors)
+
+
+# ==================================================
+# Streaming Parsers
+# ==================================================
+
+def iter_geojson_records(stream: BinaryIO) -> Iterator[dict]:
+    """
+    Features of a FeatureCollection as flat records (properties plus
+    longitude/latitude), decoded one at a time from READ_CHUNK reads.
+    """
+    text_stream = io.TextIOWrapper(stream, encoding="utf-8-sig")
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    eof = False
+
+    def fill() -> bool:
+        # Drop the consumed prefix, then append the next chunk
+        nonlocal buffer, position, eof
+        chunk = text_stream.read(READ_CHUNK)
+        eof = not chunk
+        buffer = buffer[position:] + chunk
+        position = 0
+        return not eof
+
+    while True:
+        match = _FEATURES_START.search(buffer)
+        if match:
+            position = match.end()
+            break
+        if not fill():
+            raise ValueError("Not a GeoJSON FeatureCollection (no \"features\" array)")
+
+    while True:
+        position = _SEPARATORS.match(buffer, position).end()
+        if position >= len(buffer):
+            if not fill():
+                raise ValueError("Unexpected end of GeoJSON")
+            continue
+        if buffer[position] == "]":
+            return
+        try:
+            feature, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError as e:
+            # Most likely a feature cut at the chunk boundary
+            if eof or len(buffer) - position > MAX_FEATURE_BYTES:
+                raise ValueError(f"Invalid GeoJSON feature: {e}")
+            fill()
+            continue
+        position = end
+        yield _feature_record(feature)
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _feature_record(feature) -> dict:
+    """Flat record of one feature; malformed features become {"_error": ...} rows"""
+    if not isinstance(feature, dict):
+        return {"_error": "Feature is not an object"}
+    properties = feature.get("properties") or {}
+    if not isinstance(properties, dict):
+        return {"_error": "Feature properties must be an object"}
+    record = dict(properties)
+    geometry = feature.get("geometry") or {}
+    if not isinstance(geometry, dict):
+        record["_error"] = "Feature geometry must be an object"
+        return record
+    if geometry.get("type") != "Point":
+        record["_error"] = f"Geometry must be a Point, got {geometry.get('type')}"
+        return record
+    coordinates = geometry.get("coordinates")
+    if not isinstance(coordinates, (list, tuple)) or len(coordinates) < 2 \
+            or not all(_is_number(value) for value in coordinates):
+        record["_error"] = "Point coordinates must be [longitude, latitude] numbers"
+        return record
+    record["longitude"], record["latitude"] = coordinates[0], coordinates[1]
+    return record
+
+
+def iter_csv_records(stream: BinaryIO) -> Iterator[dict]:
+    """CSV rows with a header naming asset fields (plus longitude, latitude)"""
+    text_stream = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    for row in csv.DictReader(text_stream):
+        # Empty cells are missing values, not empty strings
+        yield {key.strip(): value for key, value in row.items() if key and value not in (None, "")}
+
+
+# ==================================================
+# Import
+# ==================================================
+
+def _copy_value(value) -> Optional[str]:
+    if value is None:
+        return None
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def _provided_literal(fields_set) -> str:
+    """Postgres array literal of the import columns a row provided"""
+    return "{" + ",".join(column for column in IMPORT_COLUMNS if column in fields_set) + "}"
+
+
+def _validate_batch(batch: List[Tuple[int, dict]], report: ImportReport) -> List[list]:
+    """AssetCreate-validated staging rows; invalid rows go to the report"""
+    rows = []
+    for row_no, record in batch:
+        identifier = record.get("identifier")
+        if "_error" in record:
+            report.add_error(row_no, identifier, record["_error"])
+            continue
+        try:
+            asset = AssetCreate.model_validate(record)
+        except ValidationError as e:
+            message = "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+            )
+            report.add_error(row_no, identifier, message)
+            continue
+        values = asset.model_dump()
+        rows.append(
+            [row_no]
+            + [_copy_value(values.get(column)) for column in STAGING_COLUMNS[1:-1]]
+            + [_provided_literal(asset.model_fields_set)]
+        )
+    report.valid += len(rows)
+    return rows
+
+
+def _copy_rows(cursor, rows: List[list]) -> None:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        # None -> unquoted empty field, which COPY reads as NULL
+        writer.writerow(["" if value is None else value for value in row])
+    buffer.seek(0)
+    cursor.copy_expert(
+        f"COPY asset_import_staging ({', '.join(STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+        buffer
+    )
+
+
+def _upsert_sql() -> str:
+    """
+    Update existing assets (only the columns each row provided), then
+    insert the new ones. Both run on the statement snapshot, so a row is
+    never written twice; an identifier inserted concurrently by another
+    transaction is left to it (ON CONFLICT DO NOTHING, counted as a duplicate).
+    """
+    columns = ", ".join(IMPORT_COLUMNS)
+    selected = ", ".join(f"l.{column}" for column in IMPORT_COLUMNS)
+    updates = [
+        f"{column} = CASE WHEN '{column}' = ANY(l.provided) THEN l.{column} ELSE ha.{column} END"
+        for column in IMPORT_COLUMNS if column != "identifier"
+    ]
+    location = "ST_SetSRID(ST_MakePoint(l.longitude, l.latitude), 4326)"
+    return f"""
+        WITH latest AS (
+            SELECT DISTINCT ON (s.identifier) s.*
+            FROM asset_import_staging s
+            ORDER BY s.identifier, s.row_no DESC
+        ),
+        updated AS (
+            UPDATE heritage_assets ha SET
+                {", ".join(updates)},
+                location = {location},
+                updated_at = now()
+            FROM latest l
+            WHERE ha.identifier = l.identifier
+            RETURNING ha.id
+        ),
+        inserted AS (
+            INSERT INTO heritage_assets ({columns}, location, created_at, updated_at)
+            SELECT {selected}, {location}, now(), now()
+            FROM latest l
+            WHERE NOT EXISTS (SELECT 1 FROM heritage_assets ha WHERE ha.identifier = l.identifier)
+            ON CONFLICT (identifier) DO NOTHING
+            RETURNING id
+        )
+        SELECT id, false AS inserted FROM updated
+        UNION ALL
+        SELECT id, true AS inserted FROM inserted
+    """
+
+
+def import_assets(db: Session, stream: BinaryIO, fmt: str, dry_run: bool = False,
+                  batch_size: int = BATCH_SIZE) -> ImportReport:
+    """
+    Validate and upsert every record of a GeoJSON or CSV stream (caller
+    commits). With dry_run, rows are only validated.
+    """
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Unsupported import format: {fmt}. Expected: {', '.join(IMPORT_FORMATS)}")
+    records = iter_geojson_records(stream) if fmt == "geojson" else iter_csv_records(stream)
+    report = ImportReport(dry_run=dry_run)
+
+    cursor = None
+    if not dry_run:
+        db.execute(text(STAGING_SQL))
+        cursor = db.connection().connection.cursor()
+
+    batch: List[Tuple[int, dict]] = []
+    for row_no, record in enumerate(records, start=1):
+        report.received += 1
+        batch.append((row_no, record))
+        if len(batch) >= batch_size:
+            rows = _validate_batch(batch, report)
+            if cursor is not None and rows:
+                _copy_rows(cursor, rows)
+            batch = []
+    rows = _validate_batch(batch, report)
+    if cursor is not None and rows:
+        _copy_rows(cursor, rows)
+
+    if dry_run or report.valid == 0:
+        return report
+
+    cursor.close()
+    written = db.execute(text(_upsert_sql())).fetchall()
+    report.inserted = sum(1 for row in written if row.inserted)
+    report.updated = len(written) - report.inserted
+    report.duplicates = report.valid - len(written)
+    report.memberships = refresh_asset_zones(db, [row.id for row in written])
+    return report
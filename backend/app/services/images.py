@@ -0,0 +1,310 @@
+"""
+Tarihi Yarimada CBS - Image Derivatives
+Resized WebP / AVIF / JPEG variants of asset media
+
+Originals under images/ are multi-megabyte camera files. Derivatives are
+rendered at a few fixed widths (never upscaled), orientation applied and
+EXIF/XMP dropped (the ICC profile is kept), JPEGs progressive, in a
+process pool so encoding does not hold the GIL of the serving worker.
+They are written to a disk cache (var/images/<width>/<path>.<format>)
+bounded by size with least-recently-used eviction, and regenerated when
+the original is newer.
+
+Derivatives are produced on media creation (background task), by the
+batch CLI (scripts/generate_derivatives.py) and on demand by
+/images/derived/{width}/{name}.
+"""
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..config import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+WIDTHS: Tuple[int, ...] = (320, 640, 1024, 1600)
+FORMATS: Tuple[str, ...] = ("avif", "webp", "jpeg")
+SOURCE_SUFFIXES: Tuple[str, ...] = (".jpg", ".jpeg", ".png", ".webp", ".tif", ".tiff")
+DERIVED_URL_PREFIX = "/images/derived"
+
+MEDIA_TYPES = {"avif": "image/avif", "webp": "image/webp", "jpeg": "image/jpeg"}
+FILE_SUFFIXES = {"avif": ".avif", "webp": ".webp", "jpeg": ".jpg"}
+FORMAT_BY_SUFFIX = {suffix: fmt for fmt, suffix in FILE_SUFFIXES.items()}
+
+SAVE_OPTIONS = {
+    "jpeg": {"format": "JPEG", "quality": 80, "progressive": True, "optimize": True},
+    "webp": {"format": "WEBP", "quality": 75, "method": 4},
+    "avif": {"format": "AVIF", "quality": 55, "speed": 6},
+}
+
+
+@functools.lru_cache(maxsize=None)
+def supported_formats() -> Tuple[str, ...]:
+    """Formats the installed Pillow can encode (AVIF needs Pillow >= 11.2 built with libavif)"""
+    from PIL import features
+    return tuple(fmt for fmt in FORMATS if fmt == "jpeg" or features.check(fmt))
+
+
+def render_derivative(source: str, target: str, width: int, fmt: str) -> int:
+    """
+    Resize source to width (never upscaling) and encode it as fmt at target.
+
+    Runs in a pool process; returns the size in bytes of the written file.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.width > width:
+            image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+        if fmt == "jpeg" or image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGB" if fmt == "jpeg" or "A" not in image.getbands() else "RGBA")
+
+        options = dict(SAVE_OPTIONS[fmt])
+        icc_profile = original.info.get("icc_profile")
+        if icc_profile:
+            options["icc_profile"] = icc_profile
+
+        # Metadata (EXIF, XMP, comments) is only written when passed explicitly
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        partial = f"{target}.{os.getpid()}.tmp"
+        image.save(partial, **options)
+    os.replace(partial, target)
+    return os.path.getsize(target)
+
+
+# ==================================================
+# Derivative Cache
+# ==================================================
+
+class ImagePipeline:
+    """Derivative paths, on-demand rendering and the size-bounded disk cache"""
+
+    def __init__(self, images_dir: Path, cache_dir: Path, max_bytes: int = 512 * 1024 * 1024,
+                 workers: Optional[int] = None):
+        self.images_dir = images_dir
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.workers = workers or min(2, os.cpu_count() or 1)
+        self.stats = {"hits": 0, "rendered": 0, "evicted": 0, "errors": 0}
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending: Dict[Path, asyncio.Future] = {}
+        self._cache_bytes: Optional[int] = None
+        self._evicting = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "ImagePipeline":
+        if settings.IMAGE_CACHE_DIR:
+            cache_dir = Path(settings.IMAGE_CACHE_DIR)
+        else:
+            cache_dir = settings.BASE_DIR / "var" / "images"
+        return cls(
+            images_dir=settings.BASE_DIR / "images",
+            cache_dir=cache_dir,
+            max_bytes=settings.IMAGE_CACHE_MAX_MB * 1024 * 1024,
+            workers=settings.IMAGE_WORKERS
+        )
+
+    @property
+    def formats(self) -> Tuple[str, ...]:
+        return supported_formats()
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        """Created on first use (after the server has forked its workers)"""
+        if self._executor is None:
+            context = multiprocessing.get_context("forkserver")
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+        return self._executor
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    # Paths -------------------------------------------------------------
+
+    @staticmethod
+    def media_name(url: Optional[str]) -> Optional[Path]:
+        """Path below images/ of a local media URL ("/images/assets/x.jpg"), else None"""
+        if not url or not url.startswith("/images/") or url.startswith(DERIVED_URL_PREFIX + "/"):
+            return None
+        name = Path(url[len("/images/"):])
+        if name.suffix.lower() not in SOURCE_SUFFIXES:
+            return None
+        return name
+
+    def source_for(self, name: str) -> Optional[Path]:
+        """Original under images/ for a derivative name ("assets/x.webp" -> images/assets/x.jpg)"""
+        stem = (self.images_dir / name).with_suffix("")
+        root = self.images_dir.resolve()
+        for suffix in SOURCE_SUFFIXES:
+            candidate = stem.with_suffix(suffix)
+            if candidate.is_file() and candidate.resolve().is_relative_to(root):
+                return candidate
+        return None
+
+    def derived_path(self, width: int, name: str) -> Path:
+        return self.cache_dir / str(width) / name
+
+    def srcset(self, url: Optional[str], fmt: str = "webp") -> Optional[str]:
+        """
+        srcset for a media URL under /images/ ("/images/assets/x.jpg"), or
+        None for external URLs and unsupported formats.
+        """
+        relative = self.media_name(url)
+        if relative is None or fmt not in self.formats:
+            return None
+        name = relative.with_suffix(FILE_SUFFIXES[fmt]).as_posix()
+        return ", ".join(f"{DERIVED_URL_PREFIX}/{width}/{name} {width}w" for width in WIDTHS)
+
+    # Rendering ---------------------------------------------------------
+
+    async def get(self, width: int, name: str) -> Optional[Path]:
+        """
+        Cached derivative for /images/derived/{width}/{name}, rendered on
+        demand; None when there is no original.
+        """
+        path = Path(name)
+        fmt = FORMAT_BY_SUFFIX.get(path.suffix.lower())
+        if width not in WIDTHS or fmt not in self.formats or path.is_absolute() or ".." in path.parts:
+            raise ValueError(f"Unsupported derivative {width}/{name}")
+        source = self.source_for(name)
+        if source is None:
+            return None
+
+        target = self.derived_path(width, name)
+        try:
+            stat = target.stat()
+            if stat.st_mtime >= source.stat().st_mtime:
+                self.stats["hits"] += 1
+                # Access time drives LRU eviction (set explicitly: mounts may be noatime)
+                os.utime(target, (time.time(), stat.st_mtime))
+                return target
+        except FileNotFoundError:
+            pass
+
+        await self.render(source, target, width, fmt)
+        return target
+
+    async def render(self, source: Path, target: Path, width: int, fmt: str) -> None:
+        """Render in the process pool; concurrent requests for one file share the work"""
+        pending = self._pending.get(target)
+        if pending is None:
+            loop = asyncio.get_running_loop()
+            pending = loop.run_in_executor(
+                self.executor, render_derivative, str(source), str(target), width, fmt
+            )
+            self._pending[target] = pending
+            pending.add_done_callback(lambda future: self._rendered(target, future))
+        await asyncio.shield(pending)
+
+    def _rendered(self, target: Path, future: asyncio.Future) -> None:
+        self._pending.pop(target, None)
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            self.stats["errors"] += 1
+            logger.warning("Rendering %s failed: %s", target, future.exception())
+            if isinstance(future.exception(), BrokenProcessPool):
+                # A crashed encoder (e.g. out of memory) breaks the whole pool
+                self.shutdown()
+            return
+        self.stats["rendered"] += 1
+        self._account(future.result())
+
+    async def generate(self, url: str, formats: Optional[Iterable[str]] = None) -> int:
+        """Every width x format of a media URL (background task on media creation)"""
+        name = self.media_name(url)
+        if name is None:
+            return 0
+        jobs = [
+            self.get(width, name.with_suffix(FILE_SUFFIXES[fmt]).as_posix())
+            for fmt in (formats or self.formats) if fmt in self.formats
+            for width in WIDTHS
+        ]
+        results = await asyncio.gather(*jobs, return_exceptions=True)
+        return sum(1 for result in results if isinstance(result, Path))
+
+    # Disk cache bound -------------------------------------------------
+
+    def _cache_files(self) -> List[Tuple[float, int, Path]]:
+        """(atime, size, path) of every cached derivative"""
+        files = []
+        for path in self.cache_dir.rglob("*"):
+            if path.is_file() and not path.name.endswith(".tmp"):
+                stat = path.stat()
+                files.append((stat.st_atime, stat.st_size, path))
+        return files
+
+    def _account(self, size: int) -> None:
+        """Track the cache size; scan / evict in a thread, off the event loop"""
+        if self._cache_bytes is not None:
+            self._cache_bytes += size
+        if self._evicting or (self._cache_bytes is not None and self._cache_bytes <= self.max_bytes):
+            return
+        self._evicting = True
+        threading.Thread(target=self._evict_in_background, daemon=True).start()
+
+    def _evict_in_background(self) -> None:
+        try:
+            self.evict()
+        except OSError as e:
+            logger.warning("Image cache eviction failed: %s", e)
+        finally:
+            self._evicting = False
+
+    def evict(self) -> int:
+        """Delete least recently used derivatives until the cache is at 90% of its budget"""
+        with self._lock:
+            files = sorted(self._cache_files())
+            total = sum(size for _, size, _ in files)
+            removed = 0
+            for _, size, path in files:
+                if total <= self.max_bytes * 0.9:
+                    break
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+                total -= size
+                removed += 1
+            self._cache_bytes = total
+            self.stats["evicted"] += removed
+            return removed
+
+    def snapshot(self) -> dict:
+        return {
+            "pid": os.getpid(),
+            "cache_dir": str(self.cache_dir),
+            "cache_bytes": self._cache_bytes,
+            "max_bytes": self.max_bytes,
+            "formats": list(self.formats),
+            "widths": list(WIDTHS),
+            "workers": self.workers,
+            "pending": len(self._pending),
+            **self.stats
+        }
+
+
+@functools.lru_cache()
+def get_image_pipeline() -> ImagePipeline:
+    """Image derivative pipeline from settings, built on first use"""
+    return ImagePipeline.from_settings(get_settings())
+
+
+def __getattr__(name: str):
+    # `from app.services.images import image_pipeline` keeps working (PEP 562)
+    if name == "image_pipeline":
+        return get_image_pipeline()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
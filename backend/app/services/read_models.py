@@ -0,0 +1,139 @@
+"""
+Tarihi Yarimada CBS - Asset Read Models
+Column-projected Core queries for list, detail and map views
+
+Read paths select only the columns a view needs (narrowed further by
+?fields= and ?lang=), with coordinates and segment counts computed in the
+same statement, and serialize the result rows straight to JSON with
+orjson. No ORM instances are built, nothing enters the session identity
+map, and there are no per-row follow-up queries (the ORM list path issued
+one coordinate query and one lazy segment load per asset). Full
+HeritageAsset objects remain for write paths, where the long text columns
+are deferred (group "long_text").
+"""
+
+from typing import Iterable, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, exists, func, or_, select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from ..db.models import HeritageAsset, AssetSegment, AssetProtectionZone
+from ..core.responses import dumps
+
+ha = HeritageAsset.__table__
+apz = AssetProtectionZone.__table__
+
+SEGMENT_COUNT = (
+    select(func.count(AssetSegment.id))
+    .where(AssetSegment.asset_id == ha.c.id)
+    .correlate(ha)
+    .scalar_subquery()
+)
+
+# Response field -> SQL expression (order matches AssetWithLocation)
+ASSET_COLUMNS = {
+    "id": ha.c.id,
+    "identifier": ha.c.identifier,
+    "name_tr": ha.c.name_tr,
+    "name_en": ha.c.name_en,
+    "asset_type": ha.c.asset_type,
+    "description_tr": ha.c.description_tr,
+    "description_en": ha.c.description_en,
+    "construction_year": ha.c.construction_year,
+    "construction_period": ha.c.construction_period,
+    "historical_period": ha.c.historical_period,
+    "neighborhood": ha.c.neighborhood,
+    "address": ha.c.address,
+    "protection_status": ha.c.protection_status,
+    "registration_no": ha.c.registration_no,
+    "model_url": ha.c.model_url,
+    "model_type": ha.c.model_type,
+    "model_lod": ha.c.model_lod,
+    "cesium_ion_asset_id": ha.c.cesium_ion_asset_id,
+    "is_visitable": ha.c.is_visitable,
+    "data_source": ha.c.data_source,
+    "created_at": ha.c.created_at,
+    "updated_at": ha.c.updated_at,
+    "segment_count": SEGMENT_COUNT,
+    "longitude": func.ST_X(ha.c.location),
+    "latitude": func.ST_Y(ha.c.location),
+}
+
+ASSET_FIELDS: Tuple[str, ...] = tuple(ASSET_COLUMNS)
+SEARCH_FIELDS: Tuple[str, ...] = (
+    "id", "identifier", "name_tr", "name_en", "asset_type", "longitude", "latitude"
+)
+
+
+# Fields dropped by ?lang= (the other language)
+LANGUAGE_EXCLUDED_FIELDS = {
+    "tr": frozenset({"name_en", "description_en"}),
+    "en": frozenset({"name_tr", "description_tr"}),
+}
+
+
+def project_fields(fields: Optional[str], lang: Optional[str] = None,
+                   available: Sequence[str] = ASSET_FIELDS) -> Tuple[str, ...]:
+    """
+    Resolve ?fields=a,b,c and ?lang=tr|en into the fields to select.
+
+    "id" is always included. Raises ValueError for unknown field names.
+    """
+    if fields:
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = requested.difference(available)
+        if unknown:
+            raise ValueError(
+                f"Unknown fields: {', '.join(sorted(unknown))}. Available: {', '.join(available)}"
+            )
+        requested.add("id")
+    else:
+        requested = set(available)
+    if lang:
+        requested -= LANGUAGE_EXCLUDED_FIELDS[lang]
+    return tuple(name for name in available if name in requested)
+
+
+def asset_select(fields: Sequence[str] = ASSET_FIELDS) -> Select:
+    """SELECT of the given response fields from heritage_assets"""
+    return select(*(ASSET_COLUMNS[name].label(name) for name in fields)).select_from(ha)
+
+
+def filter_assets(stmt: Select, asset_type: Optional[str] = None,
+                  historical_period: Optional[str] = None, neighborhood: Optional[str] = None,
+                  protection_status: Optional[str] = None, zone_id: Optional[int] = None,
+                  search: Optional[str] = None) -> Select:
+    """Apply the asset list filters"""
+    if asset_type:
+        stmt = stmt.where(func.lower(ha.c.asset_type) == asset_type.lower())
+    if historical_period:
+        stmt = stmt.where(func.lower(ha.c.historical_period) == historical_period.lower())
+    if neighborhood:
+        stmt = stmt.where(func.lower(ha.c.neighborhood) == neighborhood.lower())
+    if protection_status:
+        stmt = stmt.where(ha.c.protection_status.ilike(f"%{protection_status}%"))
+    if zone_id:
+        stmt = stmt.where(exists().where(apz.c.asset_id == ha.c.id, apz.c.zone_id == zone_id))
+    if search:
+        stmt = stmt.where(or_(ha.c.name_tr.ilike(f"%{search}%"), ha.c.name_en.ilike(f"%{search}%")))
+    return stmt
+
+
+def fetch_rows(db: Session, stmt: Select) -> Sequence[Row]:
+    """Execute a read-model statement; rows are lightweight named tuples"""
+    return db.execute(stmt).all()
+
+
+# ==================================================
+# JSON Serialization
+# ==================================================
+
+def rows_to_json(rows: Iterable[Row]) -> bytes:
+    """Serialize rows as a JSON array of objects keyed by column label"""
+    return dumps([dict(row._mapping) for row in rows])
+
+
+def row_to_json(row: Row) -> bytes:
+    """Serialize one row as a JSON object"""
+    return dumps(dict(row._mapping))
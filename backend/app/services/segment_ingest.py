@@ -0,0 +1,157 @@
+"""
+Tarihi Yarimada CBS - Segment Ingest
+Apply a whole SAM3D segmentation export to an asset in one transaction
+
+A SAM3D run produces every part of a model at once (object ids, types,
+measurements). The export is validated once, diffed against the asset's
+existing segments by object_id, and applied with one bulk statement per
+kind of change: a multi-row INSERT for new objects, one
+UPDATE ... FROM jsonb_to_recordset for changed ones and one DELETE for
+objects missing from the export (unless prune is off). Unchanged segments
+are not written, so re-ingesting the same export is a no-op.
+
+The parent asset row is locked (SELECT ... FOR UPDATE) for the duration,
+so concurrent ingests of the same model apply one after the other.
+Segments without an object_id (created by hand) are never touched.
+"""
+
+import json
+from dataclasses import dataclass
+from typing import Dict, List, Sequence
+
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session
+
+from ..db.models import AssetSegment
+from ..schemas.segment import SEGMENT_TYPES, SegmentIngestItem
+
+# Columns an export sets; object_id is the diff key
+SEGMENT_COLUMNS = (
+    "segment_name", "segment_type", "material", "height_m", "width_m", "volume_m3",
+    "condition", "restoration_year", "description_tr", "description_en"
+)
+RECORDSET_TYPES = {
+    "segment_name": "text", "segment_type": "text", "material": "text",
+    "height_m": "double precision", "width_m": "double precision", "volume_m3": "double precision",
+    "condition": "text", "restoration_year": "integer",
+    "description_tr": "text", "description_en": "text"
+}
+
+LOCK_ASSET_SQL = "SELECT id FROM heritage_assets WHERE id = :asset_id FOR UPDATE"
+
+EXISTING_SQL = f"""
+    SELECT id, object_id, {", ".join(SEGMENT_COLUMNS)}
+    FROM asset_segments
+    WHERE asset_id = :asset_id AND object_id IS NOT NULL
+    ORDER BY id
+"""
+
+UPDATE_SQL = f"""
+    UPDATE asset_segments s
+    SET {", ".join(f"{column} = v.{column}" for column in SEGMENT_COLUMNS)}
+    FROM jsonb_to_recordset(CAST(:rows AS jsonb)) AS v(
+        id integer, {", ".join(f"{column} {RECORDSET_TYPES[column]}" for column in SEGMENT_COLUMNS)}
+    )
+    WHERE s.id = v.id
+"""
+
+DELETE_SQL = "DELETE FROM asset_segments WHERE id = ANY(:ids)"
+
+
+class AssetNotFound(LookupError):
+    """The target asset does not exist"""
+
+
+@dataclass
+class IngestReport:
+    asset_id: int
+    received: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+    dry_run: bool = False
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.inserted or self.updated or self.deleted)
+
+
+def validate_export(items: Sequence[SegmentIngestItem]) -> List[dict]:
+    """
+    Normalized column values of every item. Raises ValueError listing all
+    unknown segment types and repeated object ids at once.
+    """
+    rows = []
+    invalid_types = set()
+    seen = set()
+    repeated = set()
+    for item in items:
+        values = item.model_dump(include={"object_id", *SEGMENT_COLUMNS})
+        values["segment_type"] = values["segment_type"].lower()
+        if values["segment_type"] not in SEGMENT_TYPES:
+            invalid_types.add(item.segment_type)
+        if item.object_id in seen:
+            repeated.add(item.object_id)
+        seen.add(item.object_id)
+        rows.append(values)
+
+    problems = []
+    if invalid_types:
+        problems.append(
+            f"Invalid segment types {sorted(invalid_types)}. Valid types: {list(SEGMENT_TYPES.keys())}"
+        )
+    if repeated:
+        problems.append(f"Repeated object_id values: {sorted(repeated)}")
+    if problems:
+        raise ValueError("; ".join(problems))
+    return rows
+
+
+def ingest_segments(db: Session, asset_id: int, items: Sequence[SegmentIngestItem],
+                    prune: bool = True, dry_run: bool = False) -> IngestReport:
+    """
+    Make the asset's segments match a SAM3D export (caller commits).
+    Raises AssetNotFound or ValueError before anything is written.
+    """
+    rows = validate_export(items)
+    report = IngestReport(asset_id=asset_id, received=len(rows), dry_run=dry_run)
+
+    if db.execute(text(LOCK_ASSET_SQL), {"asset_id": asset_id}).first() is None:
+        raise AssetNotFound(asset_id)
+
+    existing: Dict[str, dict] = {}
+    stale_ids: List[int] = []
+    for row in db.execute(text(EXISTING_SQL), {"asset_id": asset_id}).mappings():
+        if row["object_id"] in existing:
+            # Duplicate object ids left by earlier one-by-one creates
+            stale_ids.append(row["id"])
+        else:
+            existing[row["object_id"]] = dict(row)
+
+    inserts: List[dict] = []
+    updates: List[dict] = []
+    for values in rows:
+        current = existing.pop(values["object_id"], None)
+        if current is None:
+            inserts.append({"asset_id": asset_id, **values})
+        elif any(current[column] != values[column] for column in SEGMENT_COLUMNS):
+            updates.append({"id": current["id"], **{column: values[column] for column in SEGMENT_COLUMNS}})
+        else:
+            report.unchanged += 1
+    if prune:
+        stale_ids.extend(current["id"] for current in existing.values())
+
+    report.inserted = len(inserts)
+    report.updated = len(updates)
+    report.deleted = len(stale_ids)
+    if dry_run:
+        return report
+
+    if stale_ids:
+        db.execute(text(DELETE_SQL), {"ids": stale_ids})
+    if updates:
+        db.execute(text(UPDATE_SQL), {"rows": json.dumps(updates)})
+    if inserts:
+        db.execute(insert(AssetSegment), inserts)
+    return report
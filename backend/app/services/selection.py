@@ -0,0 +1,127 @@
+"""
+Tarihi Yarimada CBS - Spatial Selection Service
+Polygon lasso and buffered corridor selection geometries
+
+Drawn geometries are parsed, validated and serialized once and kept in a
+small LRU cache keyed by their canonical GeoJSON, so repeated selections
+with the same shape (map redraws, pagination, shared links) skip the
+shapely round trip and reuse the precomputed index envelope.
+"""
+
+import json
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Tuple
+
+SELECTION_GEOMETRY_TYPES = ("Polygon", "MultiPolygon", "LineString", "MultiLineString")
+LINE_GEOMETRY_TYPES = ("LineString", "MultiLineString")
+
+# Metres per degree of latitude (WGS84 mean)
+METERS_PER_DEGREE = 111_320.0
+
+
+@dataclass(frozen=True)
+class SelectionGeometry:
+    """Validated selection geometry, ready to bind into SQL"""
+    wkb_hex: str
+    geom_type: str
+    envelope: Tuple[float, float, float, float]                  # west, south, east, north (buffer included)
+    buffer_m: float
+
+
+def _expand_bounds(bounds: tuple, buffer_m: float) -> Tuple[float, float, float, float]:
+    """Expand lon/lat bounds by a metric buffer (conservative at the polar edge)"""
+    west, south, east, north = bounds
+    if buffer_m <= 0:
+        return west, south, east, north
+    d_lat = buffer_m / METERS_PER_DEGREE
+    max_lat = min(max(abs(south), abs(north)) + d_lat, 89.0)
+    d_lon = buffer_m / (METERS_PER_DEGREE * math.cos(math.radians(max_lat)))
+    return west - d_lon, south - d_lat, east + d_lon, north + d_lat
+
+
+@lru_cache(maxsize=256)
+def _prepare(canonical: str, buffer_m: float) -> SelectionGeometry:
+    import numpy
+    from shapely import get_coordinates
+    from shapely.errors import GEOSException
+    from shapely.geometry import shape
+    from shapely.validation import make_valid
+
+    if not math.isfinite(buffer_m):
+        raise ValueError("buffer_m must be a finite number")
+    geometry = json.loads(canonical)
+    try:
+        geom = shape(geometry)
+        if geom.is_empty:
+            raise ValueError("Selection geometry is empty")
+        # NaN/Infinity parse as floats and GEOS skips them in bounds and predicates
+        if not numpy.isfinite(get_coordinates(geom, include_z=geom.has_z)).all():
+            raise ValueError("Selection geometry coordinates must be finite numbers")
+        if not geom.is_valid:
+            geom = make_valid(geom)
+    except GEOSException as e:
+        # e.g. a LineString with a single point
+        raise ValueError(f"Invalid selection geometry: {e}")
+
+    return SelectionGeometry(
+        wkb_hex=geom.wkb_hex,
+        geom_type=geometry["type"],
+        envelope=_expand_bounds(geom.bounds, buffer_m),
+        buffer_m=buffer_m
+    )
+
+
+def prepare_selection_geometry(geometry: dict, buffer_m: float = 0) -> SelectionGeometry:
+    """
+    Validate a GeoJSON selection geometry and return its cached prepared form.
+
+    Raises ValueError for unsupported types, unbuffered lines and invalid
+    coordinates or geometries.
+    """
+    geom_type = (geometry or {}).get("type")
+    if geom_type not in SELECTION_GEOMETRY_TYPES:
+        raise ValueError(
+            f"Invalid selection geometry type: {geom_type}. "
+            f"Expected: {', '.join(SELECTION_GEOMETRY_TYPES)}"
+        )
+    if geom_type in LINE_GEOMETRY_TYPES and buffer_m <= 0:
+        raise ValueError("buffer_m must be greater than 0 for LineString selections")
+
+    canonical = json.dumps(
+        {"type": geom_type, "coordinates": geometry.get("coordinates")},
+        sort_keys=True,
+        separators=(",", ":")
+    )
+    try:
+        return _prepare(canonical, float(buffer_m))
+    except (TypeError, KeyError, IndexError, AttributeError) as e:
+        raise ValueError(f"Invalid selection geometry coordinates: {e}")
+
+
+def build_selection_sql(selection: SelectionGeometry) -> Tuple[str, dict]:
+    """
+    Return the WHERE fragment (alias "ha") and params for a selection.
+
+    The envelope test (&&) lets the planner use idx_assets_location before
+    the exact ST_Intersects / geography ST_DWithin check runs.
+    """
+    west, south, east, north = selection.envelope
+    params = {
+        "sel_wkb": selection.wkb_hex,
+        "sel_west": west,
+        "sel_south": south,
+        "sel_east": east,
+        "sel_north": north
+    }
+    sql = " AND ha.location && ST_MakeEnvelope(:sel_west, :sel_south, :sel_east, :sel_north, 4326)"
+    if selection.buffer_m > 0:
+        sql += (
+            " AND ST_DWithin(ha.location::geography,"
+            " ST_GeomFromWKB(decode(:sel_wkb, 'hex'), 4326)::geography, :sel_buffer)"
+        )
+        params["sel_buffer"] = selection.buffer_m
+    else:
+        sql += " AND ST_Intersects(ha.location, ST_GeomFromWKB(decode(:sel_wkb, 'hex'), 4326))"
+    return sql, params
@@ -0,0 +1,298 @@
+"""
+Tarihi Yarimada CBS - Thumbnail Sprite Atlas
+Primary media thumbnails composited into a few sprite sheets
+
+The asset list shows one thumbnail per asset. Instead of one image request
+per asset, the primary image (Media.is_primary) of every asset is cropped
+to a square cell and packed into sprite sheets of up to 16 x 16 cells,
+written under content-hashed names (atlas-0.<hash10>.webp). index.json
+maps asset identifiers to their sheet and pixel offset.
+
+Rebuilds are incremental: cropped cells are cached by source file
+fingerprint (path, size, mtime), so only changed originals are decoded,
+and nothing is written when the fingerprint of the whole atlas is
+unchanged. The server rebuilds after media changes (the "media" and
+"assets" invalidation tags, debounced) and once at startup;
+scripts/build_sprites.py builds from the command line.
+"""
+
+import asyncio
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from ..config import Settings, get_settings
+from ..core.cache import on_invalidate
+from .images import get_image_pipeline
+
+logger = logging.getLogger(__name__)
+
+SPRITE_URL_PREFIX = "/api/v1/sprites/"
+SHEET_COLUMNS = 16
+SHEET_ROWS = 16
+SHEET_QUALITY = 80
+
+# Tags whose invalidation can change the atlas (see core/cache.py)
+SPRITE_TAGS = frozenset({"media", "assets", "*"})
+
+PRIMARY_MEDIA_SQL = """
+    SELECT DISTINCT ON (a.identifier) a.identifier, m.url
+    FROM media m
+    JOIN heritage_assets a ON a.id = m.asset_id
+    WHERE m.is_primary
+    ORDER BY a.identifier, m.id
+"""
+
+
+def render_cell(source: Path, target: Path, size: int) -> None:
+    """Center-cropped size x size thumbnail of source, saved losslessly"""
+    from PIL import Image, ImageOps
+
+    with Image.open(source) as original:
+        # JPEG decodes at 1/2..1/8 scale directly, much faster than a full decode
+        original.draft("RGB", (size * 2, size * 2))
+        image = ImageOps.exif_transpose(original).convert("RGB")
+        cell = ImageOps.fit(image, (size, size), Image.LANCZOS)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    partial = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    cell.save(partial, format="PNG")
+    os.replace(partial, target)
+
+
+class SpriteAtlas:
+    """Sprite sheet build (incremental, file-locked) and index.json reads"""
+
+    def __init__(self, root: Path, cell_size: int = 96, debounce_seconds: float = 2.0):
+        self.root = root
+        self.cell_size = cell_size
+        self.debounce_seconds = debounce_seconds
+        self.index_path = root / "index.json"
+        self.stats = {
+            "builds": 0, "skipped": 0, "busy": 0,
+            "cells_rendered": 0, "cells_reused": 0, "build_errors": 0
+        }
+        self._dirty = True
+        self._index: Optional[Tuple[float, bytes, dict]] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "SpriteAtlas":
+        if settings.SPRITE_DIR:
+            root = Path(settings.SPRITE_DIR)
+        else:
+            root = settings.BASE_DIR / "var" / "sprites"
+        return cls(root, cell_size=settings.SPRITE_CELL_PX)
+
+    # Index -------------------------------------------------------------
+
+    def index(self) -> Tuple[Optional[bytes], dict]:
+        """(raw index.json, parsed index), reloaded when the file changes"""
+        try:
+            mtime = self.index_path.stat().st_mtime
+        except FileNotFoundError:
+            return None, {}
+        with self._lock:
+            if self._index is None or self._index[0] != mtime:
+                raw = self.index_path.read_bytes()
+                self._index = (mtime, raw, json.loads(raw))
+            return self._index[1], self._index[2]
+
+    def sheet_path(self, name: str) -> Optional[Path]:
+        """Sheet file for a name listed in the current index"""
+        _, index = self.index()
+        if not any(sheet["name"] == name for sheet in index.get("sheets", [])):
+            return None
+        return self.root / name
+
+    # Build -------------------------------------------------------------
+
+    def _sources(self, db) -> List[Tuple[str, Path]]:
+        """(identifier, original file) of every asset with a local primary image"""
+        image_pipeline = get_image_pipeline()
+        sources = []
+        for row in db.execute(text(PRIMARY_MEDIA_SQL)):
+            name = image_pipeline.media_name(row.url)
+            source = image_pipeline.source_for(name.as_posix()) if name is not None else None
+            if source is not None:
+                sources.append((row.identifier, source))
+        return sources
+
+    def _cell_key(self, source: Path) -> str:
+        stat = source.stat()
+        fingerprint = f"{source.resolve()}|{stat.st_size}|{stat.st_mtime_ns}|{self.cell_size}"
+        return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()[:20]
+
+    def _cell(self, key: str, source: Path):
+        from PIL import Image
+
+        path = self.root / "cells" / f"{key}.png"
+        if path.exists():
+            self.stats["cells_reused"] += 1
+        else:
+            render_cell(source, path, self.cell_size)
+            self.stats["cells_rendered"] += 1
+        with Image.open(path) as cell:
+            cell.load()
+            return cell
+
+    def build(self, db, force: bool = False) -> Optional[dict]:
+        """
+        Rebuild the atlas if its sources changed. Returns the new index, or
+        None when it was up to date or another process is building.
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.root / ".lock", "w") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                self.stats["busy"] += 1
+                return None
+
+            sources = self._sources(db)
+            keys = [(identifier, self._cell_key(source)) for identifier, source in sources]
+            fingerprint = hashlib.sha256(json.dumps(keys).encode("utf-8")).hexdigest()[:20]
+            _, current = self.index()
+            if not force and current.get("fingerprint") == fingerprint:
+                self.stats["skipped"] += 1
+                return None
+
+            index = self._write(sources, keys, fingerprint)
+            self._remove_stale(current, index, {key for _, key in keys})
+            self.stats["builds"] += 1
+            return index
+
+    def _write(self, sources: List[Tuple[str, Path]], keys: List[Tuple[str, str]], fingerprint: str) -> dict:
+        from PIL import Image
+
+        per_sheet = SHEET_COLUMNS * SHEET_ROWS
+        size = self.cell_size
+        sheets: List[dict] = []
+        assets: Dict[str, dict] = {}
+        for start in range(0, len(sources), per_sheet):
+            chunk = list(zip(sources[start:start + per_sheet], keys[start:start + per_sheet]))
+            columns = min(SHEET_COLUMNS, len(chunk))
+            rows = -(-len(chunk) // SHEET_COLUMNS)
+            sheet = Image.new("RGB", (columns * size, rows * size), (32, 32, 32))
+            positions = {}
+            for slot, ((identifier, source), (_, key)) in enumerate(chunk):
+                x, y = (slot % SHEET_COLUMNS) * size, (slot // SHEET_COLUMNS) * size
+                try:
+                    sheet.paste(self._cell(key, source), (x, y))
+                except OSError as e:
+                    logger.warning("Sprite cell for %s (%s) failed: %s", identifier, source, e)
+                    continue
+                positions[identifier] = {"x": x, "y": y}
+
+            partial = self.root / f"sheet.{os.getpid()}.tmp"
+            sheet.save(partial, format="WEBP", quality=SHEET_QUALITY, method=4)
+            digest = hashlib.sha256(partial.read_bytes()).hexdigest()[:10]
+            name = f"atlas-{len(sheets)}.{digest}.webp"
+            os.replace(partial, self.root / name)
+
+            for identifier, position in positions.items():
+                assets[identifier] = {"sheet": len(sheets), **position}
+            sheets.append({
+                "name": name,
+                "url": SPRITE_URL_PREFIX + name,
+                "width": sheet.width,
+                "height": sheet.height
+            })
+
+        index = {
+            "version": 1,
+            "fingerprint": fingerprint,
+            "cell": size,
+            "sheets": sheets,
+            "assets": assets
+        }
+        partial = self.index_path.with_name(f"index.{os.getpid()}.tmp")
+        partial.write_text(json.dumps(index, indent=1, sort_keys=True), encoding="utf-8")
+        os.replace(partial, self.index_path)
+        return index
+
+    def _remove_stale(self, previous: dict, current: dict, cell_keys: set) -> None:
+        """Drop sheets of older generations (the previous one stays for in-flight pages) and unused cells"""
+        keep = {sheet["name"] for index in (previous, current) for sheet in index.get("sheets", [])}
+        for path in self.root.glob("atlas-*.webp"):
+            if path.name not in keep:
+                path.unlink(missing_ok=True)
+        for path in (self.root / "cells").glob("*.png"):
+            if path.stem not in cell_keys:
+                path.unlink(missing_ok=True)
+
+    # Server rebuilds ----------------------------------------------------
+
+    def mark_dirty(self, tags=None) -> None:
+        if tags is None or SPRITE_TAGS & set(tags):
+            self._dirty = True
+
+    def _build_with_session(self) -> Optional[dict]:
+        from ..db.database import SessionLocal, get_engine
+        db = SessionLocal(bind=get_engine())
+        try:
+            return self.build(db)
+        finally:
+            db.close()
+
+    async def run_rebuilder(self) -> None:
+        """Rebuild at startup and shortly after media changes (debounced)"""
+        loop = asyncio.get_running_loop()
+        while True:
+            if self._dirty:
+                # Cleared first so changes during the build mark it again
+                self._dirty = False
+                busy = self.stats["busy"]
+                started = time.perf_counter()
+                try:
+                    index = await loop.run_in_executor(None, self._build_with_session)
+                    if index is not None:
+                        logger.info("Sprite atlas rebuilt: %d assets, %d sheets in %.2fs",
+                                    len(index["assets"]), len(index["sheets"]),
+                                    time.perf_counter() - started)
+                    elif self.stats["busy"] != busy:
+                        # Another worker is building and may have read the sources before the change
+                        self._dirty = True
+                except asyncio.CancelledError:
+                    self._dirty = True
+                    raise
+                except Exception as e:
+                    self._dirty = True
+                    self.stats["build_errors"] += 1
+                    logger.warning("Sprite atlas build failed: %s", e)
+            await asyncio.sleep(self.debounce_seconds)
+
+    def snapshot(self) -> dict:
+        _, index = self.index()
+        return {
+            "root": str(self.root),
+            "fingerprint": index.get("fingerprint"),
+            "assets": len(index.get("assets", {})),
+            "sheets": [sheet["name"] for sheet in index.get("sheets", [])],
+            "dirty": self._dirty,
+            **self.stats
+        }
+
+
+@lru_cache()
+def get_sprite_atlas() -> SpriteAtlas:
+    """Sprite atlas from settings, built on first use"""
+    atlas = SpriteAtlas.from_settings(get_settings())
+    # Rebuild soon after media or asset writes on any worker
+    on_invalidate(atlas.mark_dirty)
+    return atlas
+
+
+def __getattr__(name: str):
+    # `from app.services.sprites import sprite_atlas` keeps working (PEP 562)
+    if name == "sprite_atlas":
+        return get_sprite_atlas()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,244 @@
+"""
+Tarihi Yarimada CBS - Media Uploads
+Streaming multipart image uploads, stored content-addressed
+
+The request body is fed chunk by chunk to python-multipart's incremental
+parser; file data is hashed (SHA-256) and written to a temporary file as
+it arrives, so a worker holds one network chunk of an upload in memory
+regardless of the file size. The type is checked from the leading bytes
+and the size against UPLOAD_MAX_MB while streaming, so bad uploads are
+rejected after their first chunk.
+
+Files are stored as images/uploads/<sha[:2]>/<sha256>.<ext>: identical
+uploads share one file, and their URLs (/images/uploads/...) work with
+the image derivative pipeline like any other file under images/.
+"""
+
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO, List, Optional
+
+from anyio import to_thread
+from multipart.multipart import MultipartParser, parse_options_header
+from starlette.datastructures import Headers
+
+from ..config import Settings, get_settings
+
+UPLOAD_URL_PREFIX = "/images/uploads/"
+FILE_FIELD = "file"
+
+# Leading bytes of accepted image types -> stored suffix (WebP is RIFF....WEBP)
+SIGNATURES = (
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+    (b"II*\x00", ".tif"),
+    (b"MM\x00*", ".tif"),
+)
+SNIFF_BYTES = 12
+ACCEPTED_CONTENT_TYPES = {"image/jpeg", "image/png", "image/webp", "image/tiff", "application/octet-stream"}
+
+# Multipart framing and small form fields on top of the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class UploadError(Exception):
+    """Rejected upload; status_code maps to the HTTP response"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def sniff_suffix(head: bytes) -> Optional[str]:
+    """Stored suffix for an accepted image type, from its first bytes"""
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    for signature, suffix in SIGNATURES:
+        if head.startswith(signature):
+            return suffix
+    return None
+
+
+@dataclass
+class StoredUpload:
+    sha256: str
+    url: str
+    size: int
+    filename: Optional[str]
+    deduplicated: bool
+
+
+class _FilePart:
+    """Multipart parser callbacks; file data is queued for the async writer"""
+
+    def __init__(self):
+        self.header_name = b""
+        self.header_value = b""
+        self.headers: List[tuple] = []
+        self.in_file = False
+        self.files = 0
+        self.filename: Optional[str] = None
+        self.content_type: Optional[str] = None
+        self.pending: List[bytes] = []
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_part_data": self.on_part_data,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+        }
+
+    def on_part_begin(self) -> None:
+        self.headers = []
+        self.in_file = False
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        # Other form fields are skipped (metadata comes in the query string)
+        if self.in_file:
+            self.pending.append(data[start:end])
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self.header_name += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self.header_value += data[start:end]
+
+    def on_header_end(self) -> None:
+        self.headers.append((self.header_name.lower(), self.header_value))
+        self.header_name = b""
+        self.header_value = b""
+
+    def on_headers_finished(self) -> None:
+        headers = Headers(raw=self.headers)
+        _, options = parse_options_header(headers.get("content-disposition", ""))
+        if options.get(b"name", b"").decode("latin-1") != FILE_FIELD or b"filename" not in options:
+            return
+        self.files += 1
+        if self.files > 1:
+            raise UploadError(400, "Upload one file per request")
+        self.in_file = True
+        self.filename = options[b"filename"].decode("utf-8", errors="replace")
+        self.content_type = headers.get("content-type", "application/octet-stream").split(";")[0].strip().lower()
+        if self.content_type not in ACCEPTED_CONTENT_TYPES:
+            raise UploadError(415, f"Unsupported content type {self.content_type}")
+
+
+class MediaUploadStore:
+    """Content-addressed upload storage under images/uploads"""
+
+    def __init__(self, root: Path, max_bytes: int = 40 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "MediaUploadStore":
+        return cls(settings.BASE_DIR / "images" / "uploads", max_bytes=settings.UPLOAD_MAX_MB * 1024 * 1024)
+
+    def path_for(self, digest: str, suffix: str) -> Path:
+        return self.root / digest[:2] / f"{digest}{suffix}"
+
+    def url_for(self, digest: str, suffix: str) -> str:
+        return f"{UPLOAD_URL_PREFIX}{digest[:2]}/{digest}{suffix}"
+
+    def check_headers(self, headers: Headers) -> bytes:
+        """Reject by headers alone, before reading the body; returns the multipart boundary"""
+        content_type, params = parse_options_header(headers.get("content-type", ""))
+        if content_type != b"multipart/form-data" or b"boundary" not in params:
+            raise UploadError(415, "Expected multipart/form-data with a 'file' field")
+        length = headers.get("content-length")
+        if length and length.isdigit() and int(length) > self.max_bytes + MULTIPART_OVERHEAD:
+            raise UploadError(413, f"Upload exceeds {self.max_bytes // (1024 * 1024)} MB")
+        return params[b"boundary"]
+
+    async def receive(self, headers: Headers, stream: AsyncIterator[bytes]) -> StoredUpload:
+        """Stream the 'file' part of a multipart body into the store"""
+        boundary = self.check_headers(headers)
+        part = _FilePart()
+        parser = MultipartParser(boundary, part.callbacks())
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        temp: BinaryIO = await to_thread.run_sync(
+            lambda: tempfile.NamedTemporaryFile(dir=self.root, prefix=".upload-", delete=False)
+        )
+        digest = hashlib.sha256()
+        size = 0
+        head = b""
+        suffix: Optional[str] = None
+        try:
+            async for chunk in stream:
+                parser.write(chunk)
+                if not part.pending:
+                    continue
+                data = b"".join(part.pending)
+                part.pending.clear()
+
+                if suffix is None:
+                    head += data[:SNIFF_BYTES]
+                    if len(head) >= SNIFF_BYTES:
+                        suffix = sniff_suffix(head)
+                        if suffix is None:
+                            raise UploadError(415, "File is not a JPEG, PNG, WebP or TIFF image")
+                size += len(data)
+                if size > self.max_bytes:
+                    raise UploadError(413, f"Upload exceeds {self.max_bytes // (1024 * 1024)} MB")
+                digest.update(data)
+                await to_thread.run_sync(temp.write, data)
+            parser.finalize()
+
+            if part.files == 0:
+                raise UploadError(400, "Missing 'file' field")
+            if suffix is None:
+                suffix = sniff_suffix(head)
+                if suffix is None:
+                    raise UploadError(415, "File is not a JPEG, PNG, WebP or TIFF image")
+
+            await to_thread.run_sync(temp.close)
+            sha256 = digest.hexdigest()
+            deduplicated = await to_thread.run_sync(self._commit, Path(temp.name), sha256, suffix)
+            return StoredUpload(
+                sha256=sha256,
+                url=self.url_for(sha256, suffix),
+                size=size,
+                filename=part.filename,
+                deduplicated=deduplicated
+            )
+        except BaseException:
+            await to_thread.run_sync(self._discard, temp)
+            raise
+
+    def _commit(self, temp_path: Path, sha256: str, suffix: str) -> bool:
+        """Move into place; True when an identical file was already stored"""
+        target = self.path_for(sha256, suffix)
+        if target.exists():
+            temp_path.unlink(missing_ok=True)
+            return True
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, target)
+        return False
+
+    @staticmethod
+    def _discard(temp: BinaryIO) -> None:
+        temp.close()
+        Path(temp.name).unlink(missing_ok=True)
+
+
+@lru_cache()
+def get_upload_store() -> MediaUploadStore:
+    """Media upload store from settings, built on first use"""
+    return MediaUploadStore.from_settings(get_settings())
+
+
+def __getattr__(name: str):
+    # `from app.services.uploads import upload_store` keeps working (PEP 562)
+    if name == "upload_store":
+        return get_upload_store()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,252 @@
+"""
+Tarihi Yarimada CBS - Viewer Visibility Service
+Camera frustum culling and LOD selection for the Cesium viewer
+
+Asset positions are loaded once into NumPy arrays with the ECEF
+conversion already applied; a visibility query is then a handful of
+vectorized dot products over all assets instead of per-asset work on
+the client. The arrays are reloaded after POSITION_TTL_SECONDS or when
+invalidate() is called.
+"""
+
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..core.cache import on_invalidate
+
+# WGS84 ellipsoid
+WGS84_A = 6_378_137.0
+WGS84_E2 = 6.694_379_990_14e-3
+
+# Asset bases are placed at this ellipsoid height (terrain + geoid
+# undulation in the Historic Peninsula is roughly 40 m)
+GROUND_HEIGHT_M = 40.0
+DEFAULT_RADIUS_M = 30.0
+
+POSITION_TTL_SECONDS = 60.0
+
+# Recommended LOD by camera distance (meters)
+LOD_DISTANCE_THRESHOLDS = (
+    (300.0, "LOD3"),
+    (1500.0, "LOD2"),
+)
+LOD_FALLBACK = "LOD1"
+LOD_ORDER = {"LOD1": 1, "LOD2": 2, "LOD3": 3}
+
+
+POSITIONS_SQL = """
+    SELECT
+        ha.id, ha.identifier, ha.model_type, ha.model_url, ha.model_lod,
+        ha.cesium_ion_asset_id,
+        ST_X(ha.location) as lon, ST_Y(ha.location) as lat,
+        COALESCE(SQRT(ST_Area(ha.footprint::geography) / PI()), 0) as footprint_radius,
+        COALESCE(MAX(s.height_m), 0) as max_height
+    FROM heritage_assets ha
+    LEFT JOIN asset_segments s ON s.asset_id = ha.id
+    GROUP BY ha.id
+    ORDER BY ha.id
+"""
+
+
+def geodetic_to_ecef(lon_deg, lat_deg, height_m) -> np.ndarray:
+    """Convert WGS84 lon/lat/height (scalars or arrays) to ECEF (..., 3)"""
+    lon = np.radians(lon_deg)
+    lat = np.radians(lat_deg)
+    sin_lat = np.sin(lat)
+    cos_lat = np.cos(lat)
+    n = WGS84_A / np.sqrt(1.0 - WGS84_E2 * sin_lat * sin_lat)
+    x = (n + height_m) * cos_lat * np.cos(lon)
+    y = (n + height_m) * cos_lat * np.sin(lon)
+    z = (n * (1.0 - WGS84_E2) + height_m) * sin_lat
+    return np.stack([x, y, z], axis=-1)
+
+
+@dataclass
+class AssetPositions:
+    """Column arrays for all assets (index-aligned)"""
+    ids: np.ndarray
+    ecef: np.ndarray                                              # (N, 3) bounding sphere centers
+    radius: np.ndarray                                            # (N,) bounding sphere radii
+    identifiers: List[str]
+    model_type: List[Optional[str]]
+    model_url: List[Optional[str]]
+    model_lod: List[Optional[str]]
+    cesium_ion_asset_id: List[Optional[int]]
+
+    def __len__(self) -> int:
+        return len(self.identifiers)
+
+
+def load_asset_positions(db: Session) -> AssetPositions:
+    """Load asset bounding spheres from PostGIS and precompute ECEF centers"""
+    rows = db.execute(text(POSITIONS_SQL)).fetchall()
+
+    lon = np.fromiter((row.lon for row in rows), dtype=np.float64, count=len(rows))
+    lat = np.fromiter((row.lat for row in rows), dtype=np.float64, count=len(rows))
+    max_height = np.fromiter((row.max_height for row in rows), dtype=np.float64, count=len(rows))
+    footprint_radius = np.fromiter((row.footprint_radius for row in rows), dtype=np.float64, count=len(rows))
+
+    # Sphere centered at half the tallest segment, covering footprint and height
+    radius = np.maximum(np.maximum(footprint_radius, max_height / 2.0), DEFAULT_RADIUS_M)
+    center_height = GROUND_HEIGHT_M + max_height / 2.0
+
+    return AssetPositions(
+        ids=np.fromiter((row.id for row in rows), dtype=np.int64, count=len(rows)),
+        ecef=geodetic_to_ecef(lon, lat, center_height).reshape(-1, 3),
+        radius=radius,
+        identifiers=[row.identifier for row in rows],
+        model_type=[row.model_type for row in rows],
+        model_url=[row.model_url for row in rows],
+        model_lod=[row.model_lod for row in rows],
+        cesium_ion_asset_id=[row.cesium_ion_asset_id for row in rows]
+    )
+
+
+class AssetPositionIndex:
+    """Per-worker cache of AssetPositions with TTL reload"""
+
+    def __init__(self, ttl_seconds: float = POSITION_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._positions: Optional[AssetPositions] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, db: Session) -> AssetPositions:
+        positions = self._positions
+        if positions is not None and time.monotonic() - self._loaded_at < self.ttl_seconds:
+            return positions
+        with self._lock:
+            if self._positions is None or time.monotonic() - self._loaded_at >= self.ttl_seconds:
+                self._positions = load_asset_positions(db)
+                self._loaded_at = time.monotonic()
+            return self._positions
+
+    def invalidate(self) -> None:
+        self._loaded_at = 0.0
+
+
+position_index = AssetPositionIndex()
+
+# Reload positions as soon as assets or segments change on any worker
+on_invalidate(
+    lambda tags: position_index.invalidate() if tags & {"assets", "segments", "*"} else None
+)
+
+
+# ==================================================
+# Frustum Culling
+# ==================================================
+
+def camera_basis(lon_deg: float, lat_deg: float, heading_deg: float,
+                 pitch_deg: float, roll_deg: float) -> tuple:
+    """Return (direction, right, up) unit vectors in ECEF (Cesium conventions)"""
+    lon = math.radians(lon_deg)
+    lat = math.radians(lat_deg)
+    heading = math.radians(heading_deg)
+    pitch = math.radians(pitch_deg)
+    roll = math.radians(roll_deg)
+
+    # Local east-north-up frame at the camera
+    east = np.array([-math.sin(lon), math.cos(lon), 0.0])
+    north = np.array([-math.sin(lat) * math.cos(lon), -math.sin(lat) * math.sin(lon), math.cos(lat)])
+    up = np.array([math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon), math.sin(lat)])
+
+    direction = (
+        math.sin(heading) * math.cos(pitch) * east
+        + math.cos(heading) * math.cos(pitch) * north
+        + math.sin(pitch) * up
+    )
+    right = math.cos(heading) * east - math.sin(heading) * north
+    cam_up = np.cross(right, direction)
+
+    if roll:
+        right, cam_up = (
+            math.cos(roll) * right - math.sin(roll) * cam_up,
+            math.sin(roll) * right + math.cos(roll) * cam_up
+        )
+    return direction, right, cam_up
+
+
+def recommend_lod(distance_m: float, available: Optional[str]) -> str:
+    """LOD from distance thresholds, capped at the asset's best available LOD"""
+    lod = LOD_FALLBACK
+    for threshold, threshold_lod in LOD_DISTANCE_THRESHOLDS:
+        if distance_m <= threshold:
+            lod = threshold_lod
+            break
+    if available in LOD_ORDER and LOD_ORDER[available] < LOD_ORDER[lod]:
+        return available
+    return lod
+
+
+def compute_visible(positions: AssetPositions, camera, fov: float, aspect_ratio: float,
+                    near: float, far: float, screen_height: int,
+                    min_pixel_size: float, max_results: int) -> tuple:
+    """
+    Cull asset bounding spheres against the camera frustum.
+
+    Returns (visible list of dicts sorted by screen size, frustum hit count).
+    """
+    if not len(positions):
+        return [], 0
+
+    direction, right, cam_up = camera_basis(
+        camera.longitude, camera.latitude, camera.heading, camera.pitch, camera.roll
+    )
+    origin = geodetic_to_ecef(camera.longitude, camera.latitude, camera.height)
+
+    # Cesium applies fov to the larger screen dimension
+    half_fov = math.radians(fov) / 2.0
+    if aspect_ratio >= 1.0:
+        tan_x = math.tan(half_fov)
+        tan_y = tan_x / aspect_ratio
+    else:
+        tan_y = math.tan(half_fov)
+        tan_x = tan_y * aspect_ratio
+
+    offsets = positions.ecef - origin
+    z = offsets @ direction
+    x = offsets @ right
+    y = offsets @ cam_up
+    r = positions.radius
+
+    # Sphere vs. plane tests (side planes pass through the camera)
+    inside = (
+        (z + r >= near)
+        & (z - r <= far)
+        & (np.abs(x) - z * tan_x <= r * math.sqrt(1.0 + tan_x * tan_x))
+        & (np.abs(y) - z * tan_y <= r * math.sqrt(1.0 + tan_y * tan_y))
+    )
+
+    distance = np.sqrt(np.einsum("ij,ij->i", offsets, offsets))
+    screen_size = r / (np.maximum(z, near) * tan_y) * (screen_height / 2.0)
+
+    candidates = np.nonzero(inside & (screen_size >= min_pixel_size))[0]
+    in_frustum = int(np.count_nonzero(inside))
+    if not len(candidates):
+        return [], in_frustum
+
+    # Largest projected size first
+    order = candidates[np.argsort(-screen_size[candidates], kind="stable")][:max_results]
+
+    visible = []
+    for i in order:
+        dist = float(distance[i])
+        visible.append({
+            "id": int(positions.ids[i]),
+            "identifier": positions.identifiers[i],
+            "distance_m": round(dist, 1),
+            "screen_size_px": round(float(screen_size[i]), 1),
+            "model_lod": recommend_lod(dist, positions.model_lod[i]),
+            "model_type": positions.model_type[i],
+            "model_url": positions.model_url[i],
+            "cesium_ion_asset_id": positions.cesium_ion_asset_id[i]
+        })
+    return visible, in_frustum
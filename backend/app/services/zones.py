@@ -0,0 +1,142 @@
+"""
+Tarihi Yarimada CBS - Protection Zone Service
+Zone import and precomputed asset-zone membership
+
+Membership is stored in asset_protection_zones and recomputed only when
+an asset or a zone is written. Read paths filter with ZONE_FILTER_SQL,
+which is an index lookup on (zone_id, asset_id) instead of an
+ST_Intersects against large polygons on every request.
+"""
+
+import json
+from typing import Iterable, List, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+ZONE_GEOMETRY_TYPES = ("Polygon", "MultiPolygon")
+
+# Raw SQL fragment for routers that build SQL by hand (alias "ha")
+ZONE_FILTER_SQL = (
+    " AND EXISTS (SELECT 1 FROM asset_protection_zones apz"
+    " WHERE apz.asset_id = ha.id AND apz.zone_id = :zone_id)"
+)
+
+# GeoJSON -> valid EPSG:4326 MultiPolygon
+_ZONE_GEOMETRY_SQL = (
+    "ST_Multi(ST_CollectionExtract(ST_MakeValid("
+    "ST_SetSRID(ST_GeomFromGeoJSON(r.geometry::text), 4326)), 3))"
+)
+
+
+# ==================================================
+# Membership
+# ==================================================
+
+def refresh_asset_zones(db: Session, asset_ids: Sequence[int]) -> int:
+    """Recompute zone membership for the given assets (caller commits)"""
+    if not asset_ids:
+        return 0
+    ids = list(asset_ids)
+    db.execute(
+        text("DELETE FROM asset_protection_zones WHERE asset_id = ANY(:ids)"),
+        {"ids": ids}
+    )
+    result = db.execute(
+        text("""
+            INSERT INTO asset_protection_zones (asset_id, zone_id)
+            SELECT ha.id, z.id
+            FROM heritage_assets ha
+            JOIN protection_zones z ON ST_Intersects(z.geometry, ha.location)
+            WHERE ha.id = ANY(:ids)
+        """),
+        {"ids": ids}
+    )
+    return result.rowcount
+
+
+def refresh_zone_assets(db: Session, zone_ids: Sequence[int]) -> int:
+    """Recompute member assets for the given zones (caller commits)"""
+    if not zone_ids:
+        return 0
+    ids = list(zone_ids)
+    db.execute(
+        text("DELETE FROM asset_protection_zones WHERE zone_id = ANY(:ids)"),
+        {"ids": ids}
+    )
+    result = db.execute(
+        text("""
+            INSERT INTO asset_protection_zones (asset_id, zone_id)
+            SELECT ha.id, z.id
+            FROM protection_zones z
+            JOIN heritage_assets ha ON ST_Intersects(z.geometry, ha.location)
+            WHERE z.id = ANY(:ids)
+        """),
+        {"ids": ids}
+    )
+    return result.rowcount
+
+
+# ==================================================
+# Import
+# ==================================================
+
+def _zone_row(properties: dict, geometry: dict) -> dict:
+    """Validate one zone and flatten it into a recordset row"""
+    geom_type = (geometry or {}).get("type")
+    if geom_type not in ZONE_GEOMETRY_TYPES:
+        raise ValueError(
+            f"Invalid zone geometry type: {geom_type}. Expected: {', '.join(ZONE_GEOMETRY_TYPES)}"
+        )
+    return {**properties, "geometry": geometry}
+
+
+def upsert_zones(db: Session, zones: Iterable[tuple]) -> Tuple[List[int], int]:
+    """
+    Insert or update zones by identifier in a single statement.
+
+    zones: iterable of (properties dict, GeoJSON geometry dict). When an
+    identifier repeats, the last occurrence wins (ON CONFLICT cannot
+    update one row twice in a statement).
+    Returns (zone ids, membership count); membership is refreshed for
+    all written zones in the same transaction.
+    """
+    rows = list({
+        row["identifier"]: row
+        for row in (_zone_row(properties, geometry) for properties, geometry in zones)
+    }.values())
+    if not rows:
+        return [], 0
+
+    result = db.execute(
+        text(f"""
+            INSERT INTO protection_zones (
+                identifier, name_tr, name_en, zone_type, protection_status,
+                legal_foundation, inspire_id, data_source, geometry,
+                created_at, updated_at
+            )
+            SELECT
+                r.identifier, r.name_tr, r.name_en, r.zone_type, r.protection_status,
+                r.legal_foundation, r.inspire_id, r.data_source, {_ZONE_GEOMETRY_SQL},
+                now(), now()
+            FROM jsonb_to_recordset(CAST(:rows AS jsonb)) AS r(
+                identifier text, name_tr text, name_en text, zone_type text,
+                protection_status text, legal_foundation text, inspire_id text,
+                data_source text, geometry jsonb
+            )
+            ON CONFLICT (identifier) DO UPDATE SET
+                name_tr = EXCLUDED.name_tr,
+                name_en = EXCLUDED.name_en,
+                zone_type = EXCLUDED.zone_type,
+                protection_status = EXCLUDED.protection_status,
+                legal_foundation = EXCLUDED.legal_foundation,
+                inspire_id = EXCLUDED.inspire_id,
+                data_source = EXCLUDED.data_source,
+                geometry = EXCLUDED.geometry,
+                updated_at = now()
+            RETURNING id
+        """),
+        {"rows": json.dumps(rows)}
+    )
+    zone_ids = [row.id for row in result]
+    return zone_ids, refresh_zone_assets(db, zone_ids)
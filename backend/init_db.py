@@ -5,34 +5,15 @@ PostGIS extension'ını ekler ve tüm tabloları oluşturur.
 """
 
 import sys
-import os
 from pathlib import Path
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import declarative_base
-from dotenv import load_dotenv
-
-# .env dosyasını yükle
-env_path = Path(__file__).parent.parent / ".env"
-if env_path.exists():
-    load_dotenv(env_path)
-else:
-    # Backend klasöründeki .env'i dene
-    env_path = Path(__file__).parent / ".env"
-    if env_path.exists():
-        load_dotenv(env_path)
-    else:
-        load_dotenv()  # Mevcut dizinde .env ara
 
 # Python'un 'app' modülünü bulabilmesi için mevcut dizini listeye ekliyoruz
 sys.path.append(str(Path(__file__).parent))
 
-# Database URL'i al - önce local_database_url (küçük harf), sonra LOCAL_DATABASE_URL, sonra DATABASE_URL
-DATABASE_URL = (
-    os.getenv("local_database_url") or 
-    os.getenv("LOCAL_DATABASE_URL") or 
-    os.getenv("DATABASE_URL") or
-    os.getenv("AZURE_DATABASE_URL")
-)
+from app.config import get_settings  # noqa: E402
+from app.db.database import init_db  # noqa: E402
+
+DATABASE_URL = get_settings().DATABASE_URL
 
 if not DATABASE_URL:
     raise ValueError(
@@ -40,23 +21,8 @@ if not DATABASE_URL:
         ".env dosyasında 'local_database_url', 'LOCAL_DATABASE_URL' veya 'DATABASE_URL' tanımlı olmalı."
     )
 
-# database.py modülü DATABASE_URL bekliyor, environment variable olarak set et
-os.environ["DATABASE_URL"] = DATABASE_URL
-
 print(f"Veritabanı bağlantısı: {DATABASE_URL.split('@')[-1] if '@' in DATABASE_URL else DATABASE_URL}")
 
-# SQLAlchemy Engine oluştur
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,
-    echo=False  # SQL sorgularını gösterme
-)
-
-# Modelleri import et (Base'e kaydolmaları için)
-# database.py'den Base'i al (artık DATABASE_URL set edildi)
-from app.db.database import Base  # noqa: E402
-from app.db import models  # noqa: E402, F401
-
 
 def init_database():
     """PostGIS extension'ını ekle ve tüm tabloları oluştur"""
@@ -65,17 +31,10 @@ def init_database():
     print("="*60)
     
     try:
-        # PostGIS extension'ını ekle
-        print("\n[1/2] PostGIS extension kontrol ediliyor...")
-        with engine.connect() as conn:
-            conn.execute(text("CREATE EXTENSION IF NOT EXISTS postgis;"))
-            conn.commit()
-        print("[OK] PostGIS extension hazır")
-        
-        # Tüm tabloları oluştur
-        print("\n[2/2] Veritabanı tabloları oluşturuluyor...")
-        Base.metadata.create_all(bind=engine)
-        
+        # PostGIS extension, tablolar ve şema sürümü (schema_version)
+        print("\n[1/1] PostGIS extension ve veritabanı tabloları oluşturuluyor...")
+        init_db(mode="always")
+
         print("\n" + "="*60)
         print("[OK] Veritabanı başarıyla güncellendi!")
         print("="*60)
@@ -87,6 +46,9 @@ def init_database():
         print("  - asset_actors (Varlık-Aktör ilişkileri)")
         print("  - media (Medya dosyaları)")
         print("  - user_notes (Kullanıcı notları)")
+        print("  - protection_zones (Koruma alanı poligonları)")
+        print("  - asset_protection_zones (Varlık-Koruma alanı üyelikleri)")
+        print("  - schema_version (Şema sürümü - hızlı başlatma)")
         print("\n")
         
     except Exception as e:
@@ -0,0 +1,145 @@
+"""
+Tarihi Yarimada CBS - Read Model Benchmark
+Compares the ORM list path with the Core read-model path per page
+
+For one page of assets (default 1000 rows) it measures wall time, peak
+Python memory (tracemalloc) and SQL statement count of:
+
+- orm: HeritageAsset instances + asset_to_response + one coordinate
+  query per row + response_model validation (the previous list path)
+- read_model: one projected Core SELECT serialized straight to JSON
+
+Requires a populated database (see scripts/seed_data.py). Exits with
+status 1 when --min-speedup is given and not reached.
+
+Usage:
+    python scripts/bench_read_models.py --page-size 1000 --repeat 5
+    python scripts/bench_read_models.py --min-speedup 3
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import List
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import event, text  # noqa: E402
+from sqlalchemy.orm import undefer_group  # noqa: E402
+
+from app.db.database import SessionLocal, get_engine  # noqa: E402
+from app.db.models import HeritageAsset  # noqa: E402
+from app.api.assets import asset_to_response  # noqa: E402
+from app.schemas.asset import AssetWithLocation  # noqa: E402
+from app.services.read_models import ha, asset_select, fetch_rows, rows_to_json  # noqa: E402
+
+ASSET_LIST_ADAPTER = TypeAdapter(List[AssetWithLocation])
+
+
+def orm_page(db, limit: int) -> bytes:
+    assets = (
+        db.query(HeritageAsset)
+        .options(undefer_group("long_text"))
+        .order_by(HeritageAsset.id)
+        .limit(limit)
+        .all()
+    )
+    result = []
+    for asset in assets:
+        asset_dict = asset_to_response(asset)
+        coords = db.execute(
+            text("SELECT ST_X(location) as lon, ST_Y(location) as lat FROM heritage_assets WHERE id = :id"),
+            {"id": asset.id}
+        ).fetchone()
+        asset_dict["longitude"] = coords.lon
+        asset_dict["latitude"] = coords.lat
+        result.append(asset_dict)
+
+    # What FastAPI does with response_model=List[AssetWithLocation]
+    validated = ASSET_LIST_ADAPTER.validate_python(result)
+    return json.dumps(jsonable_encoder(validated)).encode("utf-8")
+
+
+def read_model_page(db, limit: int) -> bytes:
+    return rows_to_json(fetch_rows(db, asset_select().order_by(ha.c.id).limit(limit)))
+
+
+PATHS = {"orm": orm_page, "read_model": read_model_page}
+
+
+def measure(fn, limit: int, repeat: int, statements: list) -> dict:
+    times = []
+    for _ in range(repeat):
+        db = SessionLocal()
+        try:
+            statements[0] = 0
+            started = time.perf_counter()
+            body = fn(db, limit)
+            times.append(time.perf_counter() - started)
+        finally:
+            db.close()
+    statement_count = statements[0]
+
+    db = SessionLocal()
+    try:
+        tracemalloc.start()
+        fn(db, limit)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        db.close()
+
+    return {
+        "median_ms": statistics.median(times) * 1000,
+        "peak_kb": peak / 1024,
+        "statements": statement_count,
+        "bytes": len(body),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Read model benchmark")
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-speedup", type=float, default=0.0,
+                        help="Fail unless read_model is this many times faster than orm")
+    args = parser.parse_args()
+
+    engine = get_engine()
+    statements = [0]
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_statements(*_):
+        statements[0] += 1
+
+    with engine.connect() as conn:
+        total = conn.execute(text("SELECT COUNT(*) FROM heritage_assets")).scalar()
+    rows = min(total, args.page_size)
+    print(f"Page size: {rows} rows (of {total})\n")
+
+    results = {name: measure(fn, args.page_size, args.repeat, statements) for name, fn in PATHS.items()}
+
+    print(f"{'path':12s} {'median ms':>10s} {'peak KB':>10s} {'SQL':>6s} {'bytes':>10s}")
+    for name, result in results.items():
+        print(f"{name:12s} {result['median_ms']:10.1f} {result['peak_kb']:10.0f} "
+              f"{result['statements']:6d} {result['bytes']:10d}")
+
+    speedup = results["orm"]["median_ms"] / max(results["read_model"]["median_ms"], 1e-6)
+    memory = results["orm"]["peak_kb"] / max(results["read_model"]["peak_kb"], 1e-6)
+    print(f"\nread_model: {speedup:.1f}x faster, {memory:.1f}x less peak memory")
+
+    if args.min_speedup and speedup < args.min_speedup:
+        print(f"FAIL: speedup {speedup:.1f}x below {args.min_speedup}x")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+"""
+Tarihi Yarimada CBS - Serialization Benchmark
+Before/after JSON encoding cost per 1000 assets (no database needed)
+
+Synthetic rows shaped like the real query results are pushed through:
+
+- asset list:  stdlib json.dumps of row dicts (previous read model) vs orjson
+- geojson:     pydantic models + response_model re-validation +
+               jsonable_encoder + json.dumps (previous route) vs plain
+               dicts + orjson
+- segments:    response_model validation from ORM attributes + json.dumps
+               vs validate-once TypeAdapter + pydantic-core dump_json
+
+Both sides must produce the same JSON document. Exits with status 1 if
+they differ, or when --min-speedup is given and a case is slower than that.
+
+Usage:
+    python scripts/bench_serialization.py
+    python scripts/bench_serialization.py --rows 1000 --repeat 20 --min-speedup 1.5
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from typing import List
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+
+from app.api.assets import feature_collection_response  # noqa: E402
+from app.api.segments import SEGMENT_LIST_ADAPTER  # noqa: E402
+from app.core.responses import adapter_response  # noqa: E402
+from app.schemas.asset import (  # noqa: E402
+    AssetFeatureCollection, AssetGeoJSONFeature, AssetGeoJSONProperties, GeoJSONGeometry
+)
+from app.schemas.segment import SegmentResponse  # noqa: E402
+from app.services.read_models import ASSET_FIELDS, rows_to_json  # noqa: E402
+
+LOOP = asyncio.new_event_loop()
+
+
+class AssetRow(namedtuple("AssetRow", ASSET_FIELDS)):
+    """Stand-in for a read-model Row"""
+
+    @property
+    def _mapping(self):
+        return self._asdict()
+
+
+GeoJSONRow = namedtuple("GeoJSONRow", [
+    "id", "identifier", "name_tr", "asset_type", "historical_period", "construction_year",
+    "protection_status", "model_type", "lon", "lat", "segment_count"
+])
+
+
+def make_assets(count: int) -> List[AssetRow]:
+    created = datetime(2024, 3, 1, 9, 30)
+    return [
+        AssetRow(
+            id=i, identifier=f"TY-{i:05d}", name_tr=f"Süleymaniye Camii {i}",
+            name_en=f"Suleymaniye Mosque {i}", asset_type="mosque",
+            description_tr="Mimar Sinan eseri, Osmanlı klasik dönem yapısı. " * 4,
+            description_en="A classical Ottoman work by Mimar Sinan. " * 4,
+            construction_year=1550 + i % 300, construction_period="16. yüzyıl",
+            historical_period="Osmanli", neighborhood="Fatih", address=f"Sokak {i}, Fatih",
+            protection_status="1. derece", registration_no=f"REG-{i}",
+            model_url=f"/models/{i}/tileset.json", model_type="3dtiles", model_lod=2,
+            cesium_ion_asset_id=None, is_visitable=i % 2 == 0, data_source="IBB",
+            created_at=created, updated_at=created + timedelta(days=i % 30, microseconds=i),
+            segment_count=i % 12, longitude=28.95 + i * 1e-5, latitude=41.01 + i * 1e-5
+        )
+        for i in range(count)
+    ]
+
+
+def make_geojson_rows(assets: List[AssetRow]) -> List[GeoJSONRow]:
+    return [
+        GeoJSONRow(a.id, a.identifier, a.name_tr, a.asset_type, a.historical_period,
+                   a.construction_year, a.protection_status, a.model_type,
+                   a.longitude, a.latitude, a.segment_count)
+        for a in assets
+    ]
+
+
+def make_segments(count: int) -> list:
+    return [
+        SimpleNamespace(
+            id=i, asset_id=i // 6, segment_name=f"Kubbe {i}", segment_type="dome",
+            object_id=f"obj_{i}", material="Kesme tas", height_m=12.5 + i % 9, width_m=3.25,
+            volume_m3=None, condition="original", restoration_year=1990 + i % 30,
+            description_tr="Ana kubbe, kursun kaplama.", description_en=None,
+            created_at=datetime(2024, 3, 1, 9, 30)
+        )
+        for i in range(count)
+    ]
+
+
+# ==================================================
+# Previous implementations
+# ==================================================
+
+def legacy_rows_to_json(rows) -> bytes:
+    def default(value):
+        if isinstance(value, datetime):
+            return value.isoformat()
+        raise TypeError(type(value).__name__)
+    return json.dumps(
+        [dict(row._mapping) for row in rows], default=default, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def legacy_response(field, content) -> bytes:
+    """What FastAPI does for a route returning content with response_model"""
+    serialized = LOOP.run_until_complete(
+        serialize_response(field=field, response_content=content, is_coroutine=False)
+    )
+    return JSONResponse(serialized).body
+
+
+GEOJSON_FIELD = create_response_field(name="geojson", type_=AssetFeatureCollection)
+SEGMENTS_FIELD = create_response_field(name="segments", type_=List[SegmentResponse])
+
+
+def legacy_geojson(rows) -> bytes:
+    features = [
+        AssetGeoJSONFeature(
+            id=row.identifier,
+            geometry=GeoJSONGeometry(coordinates=[row.lon, row.lat]),
+            properties=AssetGeoJSONProperties(
+                identifier=row.identifier, name_tr=row.name_tr, asset_type=row.asset_type,
+                historical_period=row.historical_period, construction_year=row.construction_year,
+                protection_status=row.protection_status, model_type=row.model_type,
+                segment_count=row.segment_count
+            )
+        )
+        for row in rows
+    ]
+    return legacy_response(GEOJSON_FIELD, AssetFeatureCollection(features=features))
+
+
+def legacy_segments(segments) -> bytes:
+    return legacy_response(SEGMENTS_FIELD, segments)
+
+
+def fast_segments(segments) -> bytes:
+    validated = SEGMENT_LIST_ADAPTER.validate_python(segments, from_attributes=True)
+    return adapter_response(SEGMENT_LIST_ADAPTER, validated).body
+
+
+# ==================================================
+# Runner
+# ==================================================
+
+def timed(fn, data, repeat: int) -> float:
+    fn(data)
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(data)
+        times.append(time.perf_counter() - started)
+    return statistics.median(times) * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="JSON serialization benchmark")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--min-speedup", type=float, default=0.0,
+                        help="Fail unless every case is this many times faster")
+    args = parser.parse_args()
+
+    assets = make_assets(args.rows)
+    cases = [
+        ("asset list", assets, legacy_rows_to_json, rows_to_json),
+        ("geojson", make_geojson_rows(assets), legacy_geojson,
+         lambda rows: feature_collection_response(rows).body),
+        ("segments", make_segments(args.rows), legacy_segments, fast_segments),
+    ]
+
+    per_1000 = 1000 / args.rows
+    failed = False
+    print(f"{'case':12s} {'before ms':>10s} {'after ms':>10s} {'speedup':>8s} {'bytes':>10s}  (per 1000 rows)")
+    for name, data, before, after in cases:
+        if json.loads(before(data)) != json.loads(after(data)):
+            print(f"{name:12s} FAIL: output differs from the previous implementation")
+            failed = True
+            continue
+        before_ms = timed(before, data, args.repeat) * per_1000
+        after_ms = timed(after, data, args.repeat) * per_1000
+        speedup = before_ms / max(after_ms, 1e-6)
+        print(f"{name:12s} {before_ms:10.2f} {after_ms:10.2f} {speedup:7.1f}x {len(after(data)):10d}")
+        if args.min_speedup and speedup < args.min_speedup:
+            print(f"{name:12s} FAIL: speedup {speedup:.1f}x below {args.min_speedup}x")
+            failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
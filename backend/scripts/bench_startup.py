@@ -0,0 +1,103 @@
+"""
+Tarihi Yarimada CBS - Startup Benchmark
+Measures application import time and lifespan startup time
+
+Each run uses a fresh interpreter so module caches do not hide import
+costs. Exits with status 1 when the median exceeds a budget, so it can
+run in CI next to the build.
+
+Usage:
+    python scripts/bench_startup.py
+    python scripts/bench_startup.py --runs 7 --import-budget 0.8 --startup-budget 0.3
+    python scripts/bench_startup.py --top 15      # slowest modules (-X importtime)
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Runs inside the child interpreter
+PROBE = """
+import asyncio, json, time
+started = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+
+async def startup():
+    async with app.router.lifespan_context(app):
+        return time.perf_counter()
+
+ready = asyncio.run(startup())
+print(json.dumps({"import": imported - started, "startup": ready - imported}))
+"""
+
+
+def run_probe(env: dict) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", PROBE],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(env: dict, top: int) -> list:
+    """Cumulative import time per top-level package (microseconds, nested)"""
+    result = subprocess.run(
+        [sys.executable, "-W", "ignore", "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    totals = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        if cumulative.strip().isdigit() and "." not in name:
+            totals[name] = max(totals.get(name, 0), int(cumulative))
+    return sorted(totals.items(), key=lambda item: -item[1])[:top]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Startup benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreter runs")
+    parser.add_argument("--import-budget", type=float, default=1.0, help="Median import budget (s)")
+    parser.add_argument("--startup-budget", type=float, default=0.5, help="Median lifespan startup budget (s)")
+    parser.add_argument("--top", type=int, default=0, help="Show the N slowest top-level imports")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("DB_INIT_MODE", "auto")
+    # Keep the refresher and listener from touching shared state
+    env.setdefault("SNAPSHOT_REFRESH_SECONDS", "3600")
+
+    samples = [run_probe(env) for _ in range(args.runs)]
+    import_times = [sample["import"] for sample in samples]
+    startup_times = [sample["startup"] for sample in samples]
+
+    failed = False
+    for label, times, budget in (
+        ("import", import_times, args.import_budget),
+        ("startup", startup_times, args.startup_budget),
+    ):
+        median = statistics.median(times)
+        status = "OK" if median <= budget else "OVER BUDGET"
+        failed = failed or median > budget
+        print(f"{label:8s} median {median * 1000:7.1f} ms  max {max(times) * 1000:7.1f} ms"
+              f"  budget {budget * 1000:7.1f} ms  {status}")
+
+    if args.top:
+        print("\nSlowest top-level imports:")
+        for package, micros in slowest_imports(env, args.top):
+            print(f"  {package:30s} {micros / 1000:8.1f} ms")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""
+Tarihi Yarimada CBS - Sprite Atlas Build
+Composite primary media thumbnails into sprite sheets
+
+Builds the same atlas the server rebuilds after media changes (see
+app/services/sprites.py): only originals that changed since the last build
+are decoded, and nothing is written when no primary image changed unless
+--force is given. Exits with status 1 when the build fails.
+
+Usage:
+    python scripts/build_sprites.py
+    python scripts/build_sprites.py --force
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.db.database import SessionLocal, get_engine  # noqa: E402
+from app.services.sprites import sprite_atlas  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build the thumbnail sprite atlas")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if no primary image changed")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    db = SessionLocal(bind=get_engine())
+    try:
+        index = sprite_atlas.build(db, force=args.force)
+    except Exception as e:
+        print(f"Sprite atlas build failed: {e}")
+        return 1
+    finally:
+        db.close()
+
+    stats = sprite_atlas.stats
+    if index is None:
+        print(f"Sprite atlas is up to date ({sprite_atlas.index_path})")
+        return 0
+    for sheet in index["sheets"]:
+        size = (sprite_atlas.root / sheet["name"]).stat().st_size
+        print(f"  {sheet['name']:32s} {sheet['width']:>5d}x{sheet['height']:<5d} {size:>9d} bytes")
+    print(f"\n{len(index['assets'])} assets in {len(index['sheets'])} sheets "
+          f"({stats['cells_rendered']} cells rendered, {stats['cells_reused']} reused) "
+          f"in {time.perf_counter() - started:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""
+Tarihi Yarimada CBS - Static Asset Build
+Fingerprint and precompress css/, js/ and images/ for /static
+
+For every file under the source directories:
+
+1. CSS url(...) references to other built files are rewritten to their
+   hashed names (images are processed first)
+2. The file is written as <name>.<hash10><ext> (sha256 of the content)
+3. Text files above --min-bytes get .gz (level 9) and, when the brotli
+   module is installed, .br (quality 11) siblings if they are smaller
+
+manifest.json maps source paths to hashed paths; the server rewrites
+index.html from it (see app/core/static.py). The output directory is
+rebuilt from scratch on every run.
+
+Usage:
+    python scripts/build_static.py
+    python scripts/build_static.py --out /tmp/static --min-bytes 512
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+from pathlib import Path
+from typing import Dict
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.config import BASE_DIR, get_settings  # noqa: E402
+from app.core.static import StaticManifest  # noqa: E402
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+SOURCE_DIRS = ("images", "css", "js")
+# User uploads are served from /images/uploads as stored (already content-addressed)
+EXCLUDED_DIRS = ("images/uploads",)
+TEXT_SUFFIXES = {".css", ".js", ".json", ".svg", ".html", ".txt", ".xml", ".geojson"}
+CSS_URL_PATTERN = re.compile(r"""url\(\s*(?P<quote>["']?)(?P<path>[^"')]+)(?P=quote)\s*\)""")
+
+
+def hashed_name(relative: str, content: bytes) -> str:
+    digest = hashlib.sha256(content).hexdigest()[:10]
+    path = Path(relative)
+    return str(path.with_name(f"{path.stem}.{digest}{path.suffix}")).replace(os.sep, "/")
+
+
+def rewrite_css(relative: str, content: bytes, files: Dict[str, str]) -> bytes:
+    """Point url(...) references at already built (hashed) files"""
+    folder = Path(relative).parent
+
+    def replace(match: re.Match) -> str:
+        target = match.group("path").strip()
+        if target.startswith(("data:", "http:", "https:", "//", "#")):
+            return match.group(0)
+        if target.startswith("/"):
+            source = target.lstrip("/")
+        else:
+            source = os.path.normpath(folder / target).replace(os.sep, "/")
+        hashed = files.get(source)
+        if hashed is None:
+            return match.group(0)
+        return f"url(\"/static/{hashed}\")"
+
+    return CSS_URL_PATTERN.sub(replace, content.decode("utf-8")).encode("utf-8")
+
+
+def precompress(target: Path, content: bytes, min_bytes: int) -> Dict[str, int]:
+    """Write .gz / .br siblings that are at least 5% smaller; returns their sizes"""
+    sizes = {}
+    if target.suffix not in TEXT_SUFFIXES or len(content) < min_bytes:
+        return sizes
+    variants = {".gz": gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(content, quality=11)
+    for suffix, compressed in variants.items():
+        if len(compressed) < len(content) * 0.95:
+            target.with_name(target.name + suffix).write_bytes(compressed)
+            sizes[suffix] = len(compressed)
+    return sizes
+
+
+def build(source_root: Path, out: Path, min_bytes: int) -> Dict[str, str]:
+    if out.exists():
+        shutil.rmtree(out)
+    out.mkdir(parents=True)
+
+    files: Dict[str, str] = {}
+    totals = {"files": 0, "bytes": 0, ".gz": 0, ".br": 0}
+    for directory in SOURCE_DIRS:
+        source_dir = source_root / directory
+        if not source_dir.is_dir():
+            continue
+        for source in sorted(source_dir.rglob("*")):
+            if not source.is_file() or source.name.startswith("."):
+                continue
+            relative = source.relative_to(source_root).as_posix()
+            if relative.startswith(tuple(f"{excluded}/" for excluded in EXCLUDED_DIRS)):
+                continue
+            content = source.read_bytes()
+            if source.suffix == ".css":
+                content = rewrite_css(relative, content, files)
+
+            files[relative] = hashed_name(relative, content)
+            target = out / files[relative]
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(content)
+            sizes = precompress(target, content, min_bytes)
+
+            totals["files"] += 1
+            totals["bytes"] += len(content)
+            for suffix, size in sizes.items():
+                totals[suffix] += size
+            variants = " ".join(f"{suffix[1:]}={size}" for suffix, size in sizes.items())
+            print(f"  {relative:40s} -> {files[relative]:48s} {len(content):>9d} {variants}")
+
+    manifest = {"version": 1, "files": files}
+    (out / "manifest.json").write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+
+    print(f"\n{totals['files']} files, {totals['bytes']} bytes "
+          f"(gzip variants {totals['.gz']} bytes, brotli variants {totals['.br']} bytes)")
+    if brotli is None:
+        print("brotli not installed: only .gz variants were written")
+    return files
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build content-hashed static assets")
+    parser.add_argument("--source", type=Path, default=BASE_DIR, help="Directory containing css/, js/, images/")
+    parser.add_argument("--out", type=Path, default=None, help="Output directory (default: STATIC_DIST_DIR)")
+    parser.add_argument("--min-bytes", type=int, default=256, help="Smallest text file to precompress")
+    args = parser.parse_args()
+
+    out = args.out or StaticManifest.from_settings(get_settings()).root
+    print(f"Building static assets: {args.source} -> {out}\n")
+    files = build(args.source, out, args.min_bytes)
+    return 0 if files else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+Tarihi Yarimada CBS - Disconnect Cancellation Check
+Client disconnects cancel a request's own queries, never shared work
+
+Runs the real SingleFlightMiddleware and RouteLimitsMiddleware around a
+stub route that registers a fake database connection with the request
+guard, and checks that:
+
+- a client that disconnects from an uncoalesced GET has its query
+  cancelled
+- a coalesced leader that disconnects does not cancel the computation
+  its followers are waiting for, and every client gets the response
+
+No database is needed. Exits with status 1 when a check fails.
+
+Usage:
+    python scripts/check_disconnect_cancel.py
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.limits import AdmissionControl, RouteLimitsMiddleware, request_guard  # noqa: E402
+from app.core.singleflight import SingleFlight, SingleFlightMiddleware  # noqa: E402
+
+QUERY_SECONDS = 0.2
+COALESCED_PATH = "/api/v1/assets/geojson"
+UNCOALESCED_PATH = "/api/v1/assets"
+
+
+class FakeConnection:
+    """Stands in for a psycopg2 connection; records cancel() calls"""
+
+    def __init__(self):
+        self.cancelled = 0
+
+    def cancel(self):
+        self.cancelled += 1
+
+
+async def route(scope, receive, send, connection: FakeConnection):
+    """Stub route: a query of QUERY_SECONDS on the request's connection"""
+    guard = request_guard.get()
+    guard.attach(object(), connection)
+    await asyncio.sleep(QUERY_SECONDS)
+    status = 500 if guard.cancelled else 200
+    await send({"type": "http.response.start", "status": status, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+def client(disconnect_after: float = None):
+    """receive() of a client that optionally disconnects after a delay"""
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        if disconnect_after is None:
+            await asyncio.Event().wait()
+        await asyncio.sleep(disconnect_after)
+        return {"type": "http.disconnect"}
+
+    return receive
+
+
+async def request(app, path: str, receive) -> int:
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": path, "query_string": b"", "headers": []}
+    await app(scope, receive, send)
+    return messages[0]["status"]
+
+
+def build_stack(connection: FakeConnection):
+    async def app(scope, receive, send):
+        await route(scope, receive, send, connection)
+
+    admission = AdmissionControl(limiters={}, default_timeout_ms=1000, retry_after=1, enabled=False)
+    return SingleFlightMiddleware(RouteLimitsMiddleware(app, admission), SingleFlight())
+
+
+async def run_checks() -> list:
+    failures = []
+
+    connection = FakeConnection()
+    stack = build_stack(connection)
+    status = await request(stack, UNCOALESCED_PATH, client(disconnect_after=QUERY_SECONDS / 4))
+    if connection.cancelled != 1:
+        failures.append(f"uncoalesced disconnect: expected 1 cancel, got {connection.cancelled} (status {status})")
+
+    connection = FakeConnection()
+    stack = build_stack(connection)
+    leader = asyncio.ensure_future(request(stack, COALESCED_PATH, client(disconnect_after=QUERY_SECONDS / 4)))
+    await asyncio.sleep(0)
+    followers = [asyncio.ensure_future(request(stack, COALESCED_PATH, client())) for _ in range(3)]
+    statuses = await asyncio.gather(leader, *followers)
+    if connection.cancelled:
+        failures.append(f"coalesced leader disconnect cancelled the shared query ({connection.cancelled}x)")
+    if any(status != 200 for status in statuses):
+        failures.append(f"coalesced clients got {statuses}, expected all 200")
+    return failures
+
+
+def main() -> int:
+    failures = asyncio.run(run_checks())
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if not failures:
+        print("OK   disconnects cancel their own queries, not coalesced work")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,457 @@
+"""
+Tarihi Yarimada CBS - Synthetic Dataset Generator
+Deterministic, large datasets for load tests and benchmarks
+
+seed_data.py inserts five real monuments; benchmarks need realistic volume.
+This script generates N heritage assets over the Historic Peninsula with
+footprints, actors, asset-actor links, SAM3D segments, media and notes:
+
+- locations are clustered: cluster centers (complexes, neighborhoods) with
+  Zipf-distributed sizes and Gaussian spread, plus a uniform background,
+  all inside the peninsula bounding box
+- per-asset child counts follow a Zipf law (--skew): most assets have a
+  few segments, photos and notes, a few landmarks have hundreds, and a
+  few prolific architects / patrons own most actor links
+- the output is reproducible: every batch draws from its own generator
+  (seed, batch number), so the same --seed, --assets and --batch-size
+  give the same rows whatever the worker count
+
+Batches are generated and loaded in parallel worker processes, each with
+its own connection and transaction, through COPY. Asset and actor ids are
+assigned up front (after the current maximum) so children of a batch are
+loaded in the same transaction as their assets. Zone membership is
+refreshed and the tables analyzed at the end.
+
+Generated rows use the --prefix identifier namespace (default "SY"), so
+they can be replaced (--replace) without touching curated data. --out
+writes the CSV files instead of loading them (with a checksum per table).
+
+Usage:
+    python scripts/generate_dataset.py --assets 100000
+    python scripts/generate_dataset.py --assets 20000 --seed 7 --skew 1.4 --workers 8 --replace
+    python scripts/generate_dataset.py --assets 1000 --out /tmp/dataset
+"""
+
+import argparse
+import csv
+import hashlib
+import io
+import math
+import multiprocessing
+import sys
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.schemas.segment import SEGMENT_TYPES  # noqa: E402
+
+# Historic Peninsula (Tarihi Yarimada), EPSG:4326
+BBOX = (28.916, 40.996, 28.990, 41.030)
+METERS_PER_DEG_LAT = 111_320.0
+METERS_PER_DEG_LON = 111_320.0 * math.cos(math.radians(41.013))
+BACKGROUND_SHARE = 0.15
+EPOCH = datetime(2024, 1, 1)
+
+ASSET_TYPES = (
+    ("cami", 0.20), ("cesme", 0.17), ("turbe", 0.11), ("konak", 0.11), ("medrese", 0.07),
+    ("hamam", 0.06), ("han", 0.06), ("kilise", 0.04), ("sebil", 0.04), ("anit", 0.03),
+    ("sarnic", 0.03), ("kutuphane", 0.02), ("hazire", 0.05), ("saray", 0.01)
+)
+# Footprint side lengths in meters (min, max)
+FOOTPRINT_SIZE = {
+    "cami": (25, 90), "kilise": (20, 70), "saray": (60, 200), "medrese": (30, 70), "han": (30, 80),
+    "hamam": (20, 50), "konak": (12, 30), "kutuphane": (12, 30), "sarnic": (20, 140), "turbe": (6, 15),
+    "hazire": (8, 25), "cesme": (2, 6), "sebil": (3, 7), "anit": (2, 8)
+}
+# Types with many SAM3D parts; the rest get a handful at most
+STRUCTURED_TYPES = {"cami", "kilise", "saray", "medrese", "han", "hamam"}
+
+PERIODS = (
+    ("bizans", 0.14, 330, 1452), ("osmanli_erken", 0.16, 1453, 1520),
+    ("osmanli_klasik", 0.34, 1520, 1700), ("osmanli_gec", 0.30, 1700, 1922),
+    ("cumhuriyet", 0.06, 1923, 1990)
+)
+NEIGHBORHOODS = (
+    "Sultanahmet", "Süleymaniye", "Fatih", "Edirnekapı", "Eminönü", "Beyazıt", "Kumkapı",
+    "Zeyrek", "Balat", "Fener", "Aksaray", "Cerrahpaşa", "Samatya", "Kocamustafapaşa",
+    "Vefa", "Sirkeci", "Cağaloğlu", "Laleli", "Karagümrük", "Yedikule"
+)
+PROTECTION_STATUSES = (("1. derece", 0.45), ("2. derece", 0.35), ("UNESCO", 0.08), (None, 0.12))
+MODEL_TYPES = (("3DTILES", 0.5), ("SPLAT", 0.3), ("MESH", 0.2))
+MATERIALS = ("Kesme taş", "Tuğla", "Kurşun kaplama", "Mermer", "Ahşap", "Moloz taş", "Alçı")
+CONDITIONS = (("original", 0.5), ("restored", 0.4), ("damaged", 0.1))
+MEDIA_TYPES = (("image", 0.8), ("historical", 0.12), ("360", 0.08))
+NOTE_TEXTS = (
+    "Cephede restorasyon izleri var.", "Giriş kapısı kapalıydı.", "Avluda yeni aydınlatma var.",
+    "Kitabe okunaklı durumda.", "Çatıda kurşun eksikleri gözlendi.", "Ziyaret saatleri değişmiş.",
+    "Fotoğraf arşivine eklendi.", "Çevre düzenlemesi devam ediyor."
+)
+
+TABLE_COLUMNS = {
+    "actors": ("id", "identifier", "name_tr", "actor_type", "birth_year", "death_year"),
+    "heritage_assets": (
+        "id", "identifier", "name_tr", "name_en", "asset_type", "construction_year", "historical_period",
+        "location", "footprint", "neighborhood", "protection_status", "registration_no", "model_url",
+        "model_type", "model_lod", "is_visitable", "created_at", "updated_at", "data_source"
+    ),
+    "asset_actors": ("asset_id", "actor_id", "role"),
+    "asset_segments": (
+        "asset_id", "segment_name", "segment_type", "object_id", "material", "height_m", "width_m",
+        "volume_m3", "condition", "restoration_year", "created_at"
+    ),
+    "media": ("asset_id", "media_type", "url", "caption", "is_primary", "created_at"),
+    "user_notes": ("asset_id", "user_identifier", "note_text", "created_at"),
+}
+SEGMENT_CODES = tuple(SEGMENT_TYPES)
+
+# Load order within a batch (children after their assets)
+BATCH_TABLES = ("heritage_assets", "asset_actors", "asset_segments", "media", "user_notes")
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    assets: int
+    seed: int
+    skew: float
+    clusters: int
+    batch_size: int
+    prefix: str
+    first_asset_id: int = 1
+    first_actor_id: int = 1
+
+    @property
+    def batches(self) -> int:
+        return -(-self.assets // self.batch_size)
+
+    @property
+    def actors(self) -> int:
+        return max(20, self.assets // 50)
+
+    def rng(self, *stream: int) -> np.random.Generator:
+        return np.random.default_rng(np.random.SeedSequence([self.seed, *stream]))
+
+
+# ==================================================
+# Generation
+# ==================================================
+
+def _choice(rng: np.random.Generator, weighted: tuple, size: int) -> np.ndarray:
+    """Indexes into a ((value, weight, ...), ...) table"""
+    weights = np.array([entry[1] for entry in weighted], dtype=float)
+    return rng.choice(len(weighted), size=size, p=weights / weights.sum())
+
+
+def _zipf(rng: np.random.Generator, skew: float, size: int, cap: int) -> np.ndarray:
+    """Zipf counts starting at 0, capped"""
+    return np.minimum(rng.zipf(skew, size) - 1, cap)
+
+
+def make_layout(spec: DatasetSpec) -> dict:
+    """Cluster centers, spreads and weights shared by all batches"""
+    rng = spec.rng(0)
+    west, south, east, north = BBOX
+    weights = 1.0 / np.arange(1, spec.clusters + 1) ** 0.8
+    rng.shuffle(weights)
+    return {
+        "lon": rng.uniform(west + 0.003, east - 0.003, spec.clusters),
+        "lat": rng.uniform(south + 0.003, north - 0.003, spec.clusters),
+        "sigma_m": rng.uniform(60, 350, spec.clusters),
+        "weights": weights / weights.sum(),
+        "neighborhood": rng.integers(0, len(NEIGHBORHOODS), spec.clusters),
+        "images": sorted(
+            f"/images/assets/{path.name}"
+            for path in (Path(__file__).parent.parent.parent / "images" / "assets").glob("*.jpg")
+        ) or ["/images/assets/placeholder.jpg"],
+    }
+
+
+def make_actors(spec: DatasetSpec) -> List[list]:
+    rng = spec.rng(1)
+    rows = []
+    for i in range(spec.actors):
+        # Roughly two architects per patron
+        actor_type = "patron" if i % 3 == 2 else "architect"
+        birth = int(rng.integers(1400, 1880))
+        rows.append([
+            spec.first_actor_id + i, f"{spec.prefix}-AC-{i + 1:06d}", f"Sentetik {actor_type.title()} {i + 1}",
+            actor_type, birth, birth + int(rng.integers(35, 90))
+        ])
+    return rows
+
+
+def _footprint(lon: float, lat: float, width: float, depth: float, angle: float) -> str:
+    cos_a, sin_a = math.cos(angle), math.sin(angle)
+    corners = []
+    for dx, dy in ((-1, -1), (1, -1), (1, 1), (-1, 1), (-1, -1)):
+        x, y = dx * width / 2, dy * depth / 2
+        corners.append(
+            f"{lon + (x * cos_a - y * sin_a) / METERS_PER_DEG_LON:.7f} "
+            f"{lat + (x * sin_a + y * cos_a) / METERS_PER_DEG_LAT:.7f}"
+        )
+    return f"SRID=4326;POLYGON(({', '.join(corners)}))"
+
+
+def _ordinals(counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(owner index, ordinal within owner) of every child, for per-owner counts"""
+    owners = np.repeat(np.arange(len(counts)), counts)
+    starts = np.repeat(np.cumsum(counts) - counts, counts)
+    return owners, np.arange(len(owners)) - starts
+
+
+def generate_batch(spec: DatasetSpec, layout: dict, index: int) -> Dict[str, List[list]]:
+    """Rows of every table for assets [index * batch_size, ...), from the batch's own generator"""
+    rng = spec.rng(2, index)
+    start = index * spec.batch_size
+    count = min(spec.batch_size, spec.assets - start)
+    west, south, east, north = BBOX
+    numbers = np.arange(start + 1, start + count + 1)
+    asset_ids = spec.first_asset_id + numbers - 1
+    created = [EPOCH + timedelta(seconds=int(s)) for s in rng.integers(0, 700 * 86400, count)]
+
+    # Locations: clustered with a uniform background
+    cluster = rng.choice(len(layout["weights"]), size=count, p=layout["weights"])
+    background = rng.random(count) < BACKGROUND_SHARE
+    sigma = layout["sigma_m"][cluster]
+    lon = layout["lon"][cluster] + rng.normal(0, 1, count) * sigma / METERS_PER_DEG_LON
+    lat = layout["lat"][cluster] + rng.normal(0, 1, count) * sigma / METERS_PER_DEG_LAT
+    lon = np.where(background, rng.uniform(west, east, count), np.clip(lon, west, east))
+    lat = np.where(background, rng.uniform(south, north, count), np.clip(lat, south, north))
+
+    types = _choice(rng, ASSET_TYPES, count)
+    periods = _choice(rng, PERIODS, count)
+    years = rng.integers([PERIODS[p][2] for p in periods], [PERIODS[p][3] + 1 for p in periods])
+    statuses = _choice(rng, PROTECTION_STATUSES, count)
+    model_types = _choice(rng, MODEL_TYPES, count)
+    has_model = rng.random(count) < 0.3
+    angles = rng.uniform(0, math.pi, count)
+    sides = rng.random((count, 2))
+    # One popularity draw drives segments and photos: landmarks have many of both
+    popularity = _zipf(rng, spec.skew, count, 400)
+
+    rows: Dict[str, List[list]] = {table: [] for table in BATCH_TABLES}
+    for i in range(count):
+        number, asset_type = int(numbers[i]), ASSET_TYPES[types[i]][0]
+        low, high = FOOTPRINT_SIZE[asset_type]
+        model_type = MODEL_TYPES[model_types[i]][0] if has_model[i] else None
+        rows["heritage_assets"].append([
+            int(asset_ids[i]), f"{spec.prefix}-{number:07d}", f"Sentetik {asset_type.title()} {number}",
+            f"Synthetic {asset_type} {number}", asset_type, int(years[i]), PERIODS[periods[i]][0],
+            f"SRID=4326;POINT({lon[i]:.7f} {lat[i]:.7f})",
+            _footprint(float(lon[i]), float(lat[i]), low + sides[i, 0] * (high - low),
+                       low + sides[i, 1] * (high - low), float(angles[i])),
+            NEIGHBORHOODS[layout["neighborhood"][cluster[i]]], PROTECTION_STATUSES[statuses[i]][0],
+            f"34.{number:07d}", f"/models/synthetic/{number}/tileset.json" if model_type else None,
+            model_type, "LOD2" if model_type else None, True, created[i], created[i],
+            f"generate_dataset.py seed={spec.seed}"
+        ])
+
+    # Actors: popular architects and patrons get most links
+    architects = [spec.first_actor_id + i for i in range(spec.actors) if i % 3 != 2]
+    patrons = [spec.first_actor_id + i for i in range(spec.actors) if i % 3 == 2]
+    for role, pool, share in (("architect", architects, 0.7), ("patron", patrons, 0.5)):
+        linked = np.flatnonzero(rng.random(count) < share)
+        ranks = (rng.zipf(spec.skew, len(linked)) - 1) % len(pool)
+        rows["asset_actors"].extend([int(asset_ids[i]), pool[r], role] for i, r in zip(linked, ranks))
+
+    # SAM3D segments: landmarks have hundreds of parts
+    structured = np.isin(types, [n for n, (name, _) in enumerate(ASSET_TYPES) if name in STRUCTURED_TYPES])
+    owners, ordinals = _ordinals(np.where(structured, popularity, np.minimum(popularity, 4)))
+    total = len(owners)
+    segment_types = rng.integers(0, len(SEGMENT_CODES), total)
+    heights = rng.uniform(1, 60, total).round(2)
+    widths = rng.uniform(0.5, 30, total).round(2)
+    materials = rng.integers(0, len(MATERIALS), total)
+    conditions = _choice(rng, CONDITIONS, total)
+    restored = rng.integers(1950, 2024, total)
+    for j in range(total):
+        code, condition = SEGMENT_CODES[segment_types[j]], CONDITIONS[conditions[j]][0]
+        rows["asset_segments"].append([
+            int(asset_ids[owners[j]]), f"{SEGMENT_TYPES[code]} {ordinals[j] + 1}", code,
+            f"{code}_{ordinals[j]:03d}", MATERIALS[materials[j]], float(heights[j]), float(widths[j]),
+            round(float(heights[j] * widths[j] * widths[j]) * 0.5, 1), condition,
+            int(restored[j]) if condition == "restored" else None, created[owners[j]]
+        ])
+
+    # Media: one primary photo, more for popular assets
+    owners, ordinals = _ordinals(1 + np.minimum(popularity // 4, 24))
+    images = rng.integers(0, len(layout["images"]), len(owners))
+    media_types = _choice(rng, MEDIA_TYPES, len(owners))
+    for j in range(len(owners)):
+        primary = ordinals[j] == 0
+        rows["media"].append([
+            int(asset_ids[owners[j]]), "image" if primary else MEDIA_TYPES[media_types[j]][0],
+            layout["images"][images[j]], f"Sentetik {numbers[owners[j]]} - {ordinals[j] + 1}",
+            bool(primary), created[owners[j]]
+        ])
+
+    # Notes: an independent, lighter tail (most assets have none)
+    owners, _ = _ordinals(_zipf(rng, spec.skew + 0.6, count, 1000))
+    users = rng.zipf(spec.skew, len(owners)) % 10000
+    texts = rng.integers(0, len(NOTE_TEXTS), len(owners))
+    offsets = rng.integers(0, 300 * 86400, len(owners))
+    for j in range(len(owners)):
+        rows["user_notes"].append([
+            int(asset_ids[owners[j]]), f"user-{users[j]:04d}", NOTE_TEXTS[texts[j]],
+            created[owners[j]] + timedelta(seconds=int(offsets[j]))
+        ])
+    return rows
+
+
+def to_csv(rows: List[list]) -> io.StringIO:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        # None -> unquoted empty field, which COPY reads as NULL
+        writer.writerow(["" if value is None else value for value in row])
+    buffer.seek(0)
+    return buffer
+
+
+# ==================================================
+# Loading
+# ==================================================
+
+def copy_rows(cursor, table: str, rows: List[list]) -> None:
+    if rows:
+        cursor.copy_expert(
+            f"COPY {table} ({', '.join(TABLE_COLUMNS[table])}) FROM STDIN WITH (FORMAT csv)", to_csv(rows)
+        )
+
+
+def load_batch(job: Tuple[DatasetSpec, dict, int]) -> Dict[str, int]:
+    """Worker: generate one batch and COPY it in one transaction"""
+    from app.db.database import get_engine
+
+    spec, layout, index = job
+    rows = generate_batch(spec, layout, index)
+    connection = get_engine().raw_connection()
+    try:
+        cursor = connection.cursor()
+        for table in BATCH_TABLES:
+            copy_rows(cursor, table, rows[table])
+        connection.commit()
+    finally:
+        connection.close()
+    return {table: len(rows[table]) for table in BATCH_TABLES}
+
+
+def write_csv(spec: DatasetSpec, layout: dict, out: Path) -> None:
+    """Write every table to <out>/<table>.csv and print checksums"""
+    out.mkdir(parents=True, exist_ok=True)
+    files = {table: open(out / f"{table}.csv", "w", encoding="utf-8", newline="") for table in TABLE_COLUMNS}
+    try:
+        for table, handle in files.items():
+            handle.write(",".join(TABLE_COLUMNS[table]) + "\n")
+        files["actors"].write(to_csv(make_actors(spec)).getvalue())
+        for index in range(spec.batches):
+            rows = generate_batch(spec, layout, index)
+            for table in BATCH_TABLES:
+                files[table].write(to_csv(rows[table]).getvalue())
+    finally:
+        for handle in files.values():
+            handle.close()
+    for table in TABLE_COLUMNS:
+        path = out / f"{table}.csv"
+        lines = sum(1 for _ in open(path, encoding="utf-8")) - 1
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()[:16]
+        print(f"  {table:18s} {lines:>10d} rows  sha256 {digest}")
+
+
+def load_database(spec: DatasetSpec, layout: dict, workers: int, replace: bool) -> Dict[str, int]:
+    from sqlalchemy import text
+    from app.core.cache import invalidate_on_commit
+    from app.db.database import SessionLocal, get_engine, init_db
+    from app.services.zones import refresh_zone_assets
+
+    init_db()
+    db = SessionLocal(bind=get_engine())
+    try:
+        pattern = {"pattern": f"{spec.prefix}-%"}
+        existing = db.execute(text("SELECT count(*) FROM heritage_assets WHERE identifier LIKE :pattern"),
+                              pattern).scalar()
+        if existing and not replace:
+            raise SystemExit(f"{existing} assets with prefix {spec.prefix} exist; use --replace or --prefix")
+        if existing:
+            print(f"Deleting {existing} previously generated assets...")
+        db.execute(text("DELETE FROM heritage_assets WHERE identifier LIKE :pattern"), pattern)
+        db.execute(text("DELETE FROM actors WHERE identifier LIKE :pattern"), pattern)
+        first_asset_id = db.execute(text("SELECT coalesce(max(id), 0) + 1 FROM heritage_assets")).scalar()
+        first_actor_id = db.execute(text("SELECT coalesce(max(id), 0) + 1 FROM actors")).scalar()
+        spec = replace(spec, first_asset_id=first_asset_id, first_actor_id=first_actor_id)
+        # Move the sequences past the reserved ids before anything else inserts
+        db.execute(text("SELECT setval(pg_get_serial_sequence('heritage_assets', 'id'), :last)"),
+                   {"last": first_asset_id + spec.assets - 1})
+        db.execute(text("SELECT setval(pg_get_serial_sequence('actors', 'id'), :last)"),
+                   {"last": first_actor_id + spec.actors - 1})
+        copy_rows(db.connection().connection.cursor(), "actors", make_actors(spec))
+        db.commit()
+
+        totals = {"actors": spec.actors, **{table: 0 for table in BATCH_TABLES}}
+        jobs = [(spec, layout, index) for index in range(spec.batches)]
+        done = 0
+        with multiprocessing.get_context("spawn").Pool(workers) as pool:
+            for counts in pool.imap_unordered(load_batch, jobs):
+                for table, count in counts.items():
+                    totals[table] += count
+                done += 1
+                print(f"  batch {done}/{spec.batches}: {totals['heritage_assets']} assets loaded", end="\r")
+        print()
+
+        zone_ids = [row.id for row in db.execute(text("SELECT id FROM protection_zones"))]
+        totals["asset_protection_zones"] = refresh_zone_assets(db, zone_ids) if zone_ids else 0
+        invalidate_on_commit(db, "*")
+        db.commit()
+    finally:
+        db.close()
+
+    # ANALYZE outside a transaction block so the planner sees the new volume
+    with get_engine().connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for table in ("actors", *BATCH_TABLES, "asset_protection_zones"):
+            conn.execute(text(f"ANALYZE {table}"))
+    return totals
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Generate a synthetic heritage dataset")
+    parser.add_argument("--assets", type=int, default=100_000, help="Number of heritage assets")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (same seed, same data)")
+    parser.add_argument("--skew", type=float, default=1.6,
+                        help="Zipf exponent for per-asset child counts (> 1; lower = heavier tail)")
+    parser.add_argument("--clusters", type=int, default=60, help="Spatial clusters")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Assets per generated/COPY batch")
+    parser.add_argument("--workers", type=int, default=4, help="Parallel loader processes")
+    parser.add_argument("--prefix", default="SY", help="Identifier prefix of generated rows")
+    parser.add_argument("--replace", action="store_true", help="Delete earlier rows with the same prefix")
+    parser.add_argument("--out", type=Path, default=None, help="Write CSV files here instead of loading")
+    args = parser.parse_args()
+
+    if args.skew <= 1:
+        parser.error("--skew must be greater than 1")
+    spec = DatasetSpec(
+        assets=args.assets, seed=args.seed, skew=args.skew, clusters=args.clusters,
+        batch_size=args.batch_size, prefix=args.prefix
+    )
+    layout = make_layout(spec)
+
+    started = time.perf_counter()
+    if args.out is not None:
+        print(f"Writing {spec.assets} assets (seed {spec.seed}) to {args.out}...")
+        write_csv(spec, layout, args.out)
+    else:
+        print(f"Loading {spec.assets} assets (seed {spec.seed}) with {args.workers} workers...")
+        totals = load_database(spec, layout, args.workers, args.replace)
+        for table, count in totals.items():
+            print(f"  {table:24s} {count:>10d} rows")
+    print(f"\nDone in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+Tarihi Yarimada CBS - Image Derivative Batch
+Pre-render resized WebP / AVIF / JPEG variants of every image under images/
+
+Writes the same files /images/derived/{width}/{name} renders on demand
+(see app/services/images.py) into the derivative cache, in a process pool.
+Up-to-date derivatives are skipped unless --force is given. Exits with
+status 1 when any image fails to render.
+
+Usage:
+    python scripts/generate_derivatives.py
+    python scripts/generate_derivatives.py --widths 320,640 --formats webp,avif
+    python scripts/generate_derivatives.py --force --workers 4
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.images import (  # noqa: E402
+    image_pipeline, render_derivative, supported_formats,
+    FILE_SUFFIXES, SOURCE_SUFFIXES, WIDTHS
+)
+
+
+def parse_list(value: str) -> list:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def plan(widths: list, formats: list, force: bool) -> list:
+    """(source, target, width, format) for every derivative that needs rendering"""
+    jobs = []
+    for source in sorted(image_pipeline.images_dir.rglob("*")):
+        if not source.is_file() or source.suffix.lower() not in SOURCE_SUFFIXES:
+            continue
+        relative = source.relative_to(image_pipeline.images_dir)
+        for fmt in formats:
+            name = relative.with_suffix(FILE_SUFFIXES[fmt]).as_posix()
+            for width in widths:
+                target = image_pipeline.derived_path(width, name)
+                if not force and target.exists() and target.stat().st_mtime >= source.stat().st_mtime:
+                    continue
+                jobs.append((source, target, width, fmt))
+    return jobs
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Generate responsive image derivatives")
+    parser.add_argument("--widths", default=",".join(map(str, WIDTHS)), help="Comma-separated widths")
+    parser.add_argument("--formats", default=None, help="Comma-separated formats (default: all supported)")
+    parser.add_argument("--force", action="store_true", help="Re-render up-to-date derivatives")
+    parser.add_argument("--workers", type=int, default=None, help="Encoder processes (default: CPU count)")
+    args = parser.parse_args()
+
+    widths = [int(width) for width in parse_list(args.widths)]
+    formats = parse_list(args.formats) if args.formats else list(supported_formats())
+    unknown = [width for width in widths if width not in WIDTHS]
+    unknown += [fmt for fmt in formats if fmt not in supported_formats()]
+    if unknown:
+        print(f"Unsupported widths/formats: {unknown} (widths {list(WIDTHS)}, "
+              f"formats {list(supported_formats())})")
+        return 1
+
+    jobs = plan(widths, formats, args.force)
+    print(f"Rendering {len(jobs)} derivatives: {image_pipeline.images_dir} -> {image_pipeline.cache_dir}\n")
+
+    started = time.perf_counter()
+    written = failed = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {
+            pool.submit(render_derivative, str(source), str(target), width, fmt): target
+            for source, target, width, fmt in jobs
+        }
+        for future in as_completed(futures):
+            target = futures[future]
+            relative = target.relative_to(image_pipeline.cache_dir)
+            try:
+                size = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"  FAILED {relative}: {e}")
+                continue
+            written += size
+            print(f"  {str(relative):56s} {size:>9d}")
+
+    evicted = image_pipeline.evict()
+    print(f"\n{len(jobs) - failed} rendered ({written} bytes), {failed} failed, "
+          f"{evicted} evicted in {time.perf_counter() - started:.1f}s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
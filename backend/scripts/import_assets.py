@@ -0,0 +1,76 @@
+"""
+Tarihi Yarimada CBS - Bulk Asset Import
+Import a GeoJSON FeatureCollection or CSV file into heritage_assets
+
+Same path as POST /api/v1/assets/import (see app/services/asset_import.py):
+streamed parsing, batch validation, COPY into a staging table and one
+upsert by identifier, with zone membership refreshed in the same
+transaction. Rejected rows are printed; the exit status is 1 when any row
+was rejected (or nothing could be imported).
+
+Usage:
+    python scripts/import_assets.py inventory.geojson
+    python scripts/import_assets.py inventory.csv --dry-run
+    python scripts/import_assets.py export.txt --format csv --batch-size 10000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.cache import invalidate_on_commit  # noqa: E402
+from app.db.database import SessionLocal, get_engine  # noqa: E402
+from app.services.asset_import import import_assets, BATCH_SIZE, IMPORT_FORMATS  # noqa: E402
+
+SUFFIX_FORMATS = {".geojson": "geojson", ".json": "geojson", ".csv": "csv"}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Bulk import heritage assets")
+    parser.add_argument("path", type=Path, help="GeoJSON FeatureCollection or CSV file")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, default=None, help="Default: from the file suffix")
+    parser.add_argument("--dry-run", action="store_true", help="Validate only, write nothing")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Rows validated and copied per batch")
+    parser.add_argument("--max-errors", type=int, default=50, help="Rejected rows to print")
+    args = parser.parse_args()
+
+    fmt = args.format or SUFFIX_FORMATS.get(args.path.suffix.lower())
+    if fmt is None:
+        print(f"Cannot tell the format of {args.path}; use --format {'/'.join(IMPORT_FORMATS)}")
+        return 1
+
+    started = time.perf_counter()
+    db = SessionLocal(bind=get_engine())
+    try:
+        with open(args.path, "rb") as stream:
+            report = import_assets(db, stream, fmt, dry_run=args.dry_run, batch_size=args.batch_size)
+        if args.dry_run or not (report.inserted or report.updated):
+            db.rollback()
+        else:
+            invalidate_on_commit(db, "assets")
+            db.commit()
+    except ValueError as e:
+        db.rollback()
+        print(f"Import failed: {e}")
+        return 1
+    finally:
+        db.close()
+
+    for error in report.errors[:args.max_errors]:
+        print(f"  row {error['row']:>7d} {error['identifier'] or '-':20s} {error['message']}")
+    if report.error_count > args.max_errors:
+        print(f"  ... {report.error_count - args.max_errors} more rejected rows")
+
+    mode = "validated (dry run)" if args.dry_run else "imported"
+    print(f"\n{report.received} rows read, {report.valid} valid, {report.error_count} rejected; "
+          f"{report.inserted} inserted, {report.updated} updated, {report.duplicates} duplicate identifiers, "
+          f"{report.memberships} zone memberships - {mode} in {time.perf_counter() - started:.1f}s")
+    return 1 if report.error_count or not report.valid else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
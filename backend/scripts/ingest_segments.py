@@ -0,0 +1,104 @@
+"""
+Tarihi Yarimada CBS - SAM3D Segment Ingest
+Apply a SAM3D segmentation export to one asset
+
+Same path as PUT /api/v1/segments/by-asset/{asset_id} (see
+app/services/segment_ingest.py): the export is validated once, diffed
+against the asset's segments by object_id and applied with bulk
+statements in one transaction. Running it again with the same export
+changes nothing. Exits with status 1 when the export is rejected.
+
+The export is a JSON file with the segments list, and optionally the
+target asset:
+    {"asset_identifier": "HA-0001", "segments": [{"object_id": "dome_01", ...}]}
+
+Usage:
+    python scripts/ingest_segments.py sam3d/suleymaniye.json
+    python scripts/ingest_segments.py export.json --identifier HA-0003 --dry-run
+    python scripts/ingest_segments.py export.json --asset-id 12 --keep-missing
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pydantic import TypeAdapter, ValidationError  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+from app.core.cache import invalidate_on_commit  # noqa: E402
+from app.db.database import SessionLocal, get_engine  # noqa: E402
+from app.schemas.segment import SegmentIngestItem  # noqa: E402
+from app.services.segment_ingest import ingest_segments, AssetNotFound  # noqa: E402
+
+ITEMS_ADAPTER = TypeAdapter(List[SegmentIngestItem])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Apply a SAM3D segment export to an asset")
+    parser.add_argument("path", type=Path, help="SAM3D export (JSON object with 'segments', or a list)")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--asset-id", type=int, help="Target asset id (default: from the export)")
+    target.add_argument("--identifier", help="Target asset identifier, e.g. HA-0001")
+    parser.add_argument("--keep-missing", action="store_true",
+                        help="Keep existing segments whose object_id is not in the export")
+    parser.add_argument("--dry-run", action="store_true", help="Print the diff, write nothing")
+    args = parser.parse_args()
+
+    export = json.loads(args.path.read_text(encoding="utf-8"))
+    if isinstance(export, list):
+        export = {"segments": export}
+    try:
+        items = ITEMS_ADAPTER.validate_python(export.get("segments", []))
+    except ValidationError as e:
+        print(f"Invalid export {args.path}:\n{e}")
+        return 1
+
+    started = time.perf_counter()
+    db = SessionLocal(bind=get_engine())
+    try:
+        asset_id = args.asset_id or export.get("asset_id")
+        identifier = args.identifier or export.get("asset_identifier")
+        if asset_id is None and identifier:
+            asset_id = db.execute(
+                text("SELECT id FROM heritage_assets WHERE identifier = :identifier"),
+                {"identifier": identifier}
+            ).scalar()
+            if asset_id is None:
+                print(f"Asset {identifier} not found")
+                return 1
+        if asset_id is None:
+            print("No target asset: pass --asset-id / --identifier or set asset_identifier in the export")
+            return 1
+
+        report = ingest_segments(db, asset_id, items, prune=not args.keep_missing, dry_run=args.dry_run)
+        if args.dry_run or not report.changed:
+            db.rollback()
+        else:
+            invalidate_on_commit(db, "segments")
+            db.commit()
+    except AssetNotFound:
+        db.rollback()
+        print(f"Asset {asset_id} not found")
+        return 1
+    except ValueError as e:
+        db.rollback()
+        print(f"Export rejected: {e}")
+        return 1
+    finally:
+        db.close()
+
+    mode = "diffed (dry run)" if args.dry_run else "applied"
+    print(f"Asset {report.asset_id}: {report.received} segments in export; {report.inserted} inserted, "
+          f"{report.updated} updated, {report.unchanged} unchanged, {report.deleted} deleted - "
+          f"{mode} in {time.perf_counter() - started:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
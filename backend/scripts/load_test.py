@@ -0,0 +1,352 @@
+"""
+Tarihi Yarimada CBS - Frontend Session Load Test
+Virtual users replaying the request sequence of the web frontend
+
+Each virtual user behaves like a visitor of index.html, issuing the same
+requests as js/main.js, js/assets.js and js/cesiumViewer.js:
+
+- page load: /api/v1/health, /api/v1/assets, /api/cesium-config,
+  /api/v1/sprites and its sprite sheets (once per session, like a browser)
+- asset panel: /api/v1/assets/{id}/media, /api/v1/notes/by-asset/{id} and
+  one gallery image from the srcset (/images/derived/640/...)
+- search: /api/v1/search?q=...
+
+Visitors pause between actions (--think-min/--think-max), open a handful
+of asset panels and searches per session (popular assets more often),
+then leave and a new visitor starts with a fresh page load. Users are
+ramped up linearly over --ramp-up seconds.
+
+The report has throughput and p50 / p95 / p99 per route, plus a timeline
+of requests per second, latency and server saturation: /api/v1/internal/pool
+is polled every --pool-interval seconds for connection pool occupancy,
+busy sync threads and admission queues (per worker pid). Client event
+loop lag is reported too; when it grows, the load generator itself is the
+bottleneck (use fewer users per process or several processes).
+
+Run it against a local server configured like the production instance,
+with a disposable PostGIS (benchmarks/docker-compose.yml) filled by
+generate_dataset.py. Exits with status 1 when the error rate exceeds
+--max-error-rate or the overall p95 exceeds --p95-budget-ms.
+
+Usage:
+    python scripts/load_test.py --url http://localhost:8000 --users 2000 --duration 300
+    python scripts/load_test.py --users 500 --ramp-up 60 --think-min 1 --think-max 5 --report load.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import httpx
+
+# Search terms visitors type (asset types and famous names)
+SEARCH_TERMS = ("cami", "Sultanahmet", "çeşme", "türbe", "Süleymaniye", "hamam", "Ayasofya", "medrese", "sütun")
+
+# Concrete paths -> route labels for the report
+ROUTE_PATTERNS = (
+    (re.compile(r"^/images/derived/\d+/.+$"), "/images/derived/{width}/{name}"),
+    (re.compile(r"^/api/v1/sprites/.+$"), "/api/v1/sprites/{name}"),
+    (re.compile(r"/\d+(?=/|$)"), "/{id}"),
+)
+
+
+def route_label(path: str) -> str:
+    for pattern, label in ROUTE_PATTERNS[:2]:
+        if pattern.match(path):
+            return label
+    return ROUTE_PATTERNS[2][0].sub(ROUTE_PATTERNS[2][1], path)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, min(len(sorted_values), math.ceil(pct / 100 * len(sorted_values))))
+    return sorted_values[rank - 1]
+
+
+@dataclass
+class Metrics:
+    started: float = field(default_factory=time.perf_counter)
+    latencies: Dict[str, List[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    statuses: Dict[int, int] = field(default_factory=lambda: defaultdict(int))
+    # Per elapsed second: [requests, errors, latencies]
+    seconds: Dict[int, list] = field(default_factory=lambda: defaultdict(lambda: [0, 0, []]))
+    pool_samples: List[dict] = field(default_factory=list)
+    active_users: int = 0
+    sessions: int = 0
+
+    def record(self, route: str, elapsed_ms: float, status: Optional[int]) -> None:
+        second = self.seconds[int(time.perf_counter() - self.started)]
+        second[0] += 1
+        second[2].append(elapsed_ms)
+        self.latencies[route].append(elapsed_ms)
+        if status is not None:
+            self.statuses[status] += 1
+        if status is None or status >= 400:
+            self.errors[route] += 1
+            second[1] += 1
+
+
+# ==================================================
+# Virtual User
+# ==================================================
+
+class VirtualUser:
+    """One visitor after another: page load, then asset panels and searches"""
+
+    def __init__(self, client: httpx.AsyncClient, metrics: Metrics, rng: random.Random, args):
+        self.client = client
+        self.metrics = metrics
+        self.rng = rng
+        self.args = args
+
+    async def get(self, path: str, **params):
+        started = time.perf_counter()
+        status = None
+        try:
+            response = await self.client.get(path, params=params or None)
+            status = response.status_code
+            return response if status < 400 else None
+        except httpx.HTTPError:
+            return None
+        finally:
+            self.metrics.record(route_label(path), (time.perf_counter() - started) * 1000, status)
+
+    async def think(self) -> None:
+        await asyncio.sleep(self.rng.uniform(self.args.think_min, self.args.think_max))
+
+    async def page_load(self) -> List[int]:
+        """Requests of index.html start-up; returns the asset ids of the list"""
+        await self.get("/api/v1/health")
+        response = await self.get("/api/v1/assets")
+        assets = [asset["id"] for asset in response.json()] if response is not None else []
+        await self.get("/api/cesium-config")
+        response = await self.get("/api/v1/sprites")
+        if response is not None:
+            for sheet in response.json().get("sheets", []):
+                await self.get(sheet["url"])
+        return assets
+
+    def pick_asset(self, assets: List[int]) -> int:
+        # Popular assets are opened far more often (Zipf-like)
+        rank = min(int(self.rng.paretovariate(1.2)) - 1, len(assets) - 1)
+        return assets[rank]
+
+    async def open_asset(self, asset_id: int) -> None:
+        response = await self.get(f"/api/v1/assets/{asset_id}/media")
+        await self.get(f"/api/v1/notes/by-asset/{asset_id}")
+        if response is None:
+            return
+        media = response.json()
+        if media and media[0].get("srcset"):
+            # The browser picks one candidate for the 360px gallery slot
+            candidates = [entry.rsplit(" ", 1)[0] for entry in media[0]["srcset"].split(", ")]
+            await self.get(candidates[min(1, len(candidates) - 1)])
+
+    async def session(self, deadline: float) -> None:
+        self.metrics.sessions += 1
+        assets = await self.page_load()
+        for _ in range(self.rng.randint(self.args.actions_min, self.args.actions_max)):
+            await self.think()
+            if time.perf_counter() >= deadline:
+                return
+            if assets and self.rng.random() < 0.75:
+                await self.open_asset(self.pick_asset(assets))
+            else:
+                await self.get("/api/v1/search", q=self.rng.choice(SEARCH_TERMS))
+
+    async def run(self, deadline: float) -> None:
+        self.metrics.active_users += 1
+        try:
+            while time.perf_counter() < deadline:
+                await self.session(deadline)
+        finally:
+            self.metrics.active_users -= 1
+
+
+# ==================================================
+# Monitoring
+# ==================================================
+
+async def monitor(client: httpx.AsyncClient, metrics: Metrics, interval: float, deadline: float) -> None:
+    """Poll server pool occupancy and measure client event loop lag"""
+    while time.perf_counter() < deadline:
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lag_ms = max(0.0, (time.perf_counter() - expected) * 1000)
+        sample = {"t": round(time.perf_counter() - metrics.started, 1), "users": metrics.active_users,
+                  "loop_lag_ms": round(lag_ms, 1)}
+        try:
+            response = await client.get("/api/v1/internal/pool", timeout=5)
+            response.raise_for_status()
+            sample["pool"] = response.json()
+        except httpx.HTTPError as e:
+            sample["pool_error"] = str(e)
+        metrics.pool_samples.append(sample)
+
+
+# ==================================================
+# Report
+# ==================================================
+
+def build_report(metrics: Metrics, elapsed: float) -> dict:
+    routes = {}
+    for route, values in sorted(metrics.latencies.items()):
+        values = sorted(values)
+        routes[route] = {
+            "requests": len(values),
+            "rps": round(len(values) / elapsed, 2),
+            "errors": metrics.errors.get(route, 0),
+            "p50_ms": round(percentile(values, 50), 1),
+            "p95_ms": round(percentile(values, 95), 1),
+            "p99_ms": round(percentile(values, 99), 1),
+        }
+    everything = sorted(value for values in metrics.latencies.values() for value in values)
+    total = len(everything)
+
+    # Timeline: latest pool sample per worker pid within each window
+    timeline = []
+    for second in sorted(metrics.seconds):
+        requests, errors, latencies = metrics.seconds[second]
+        samples = [sample for sample in metrics.pool_samples if second <= sample["t"] < second + 1]
+        workers = {sample["pool"]["pid"]: sample["pool"] for sample in samples if "pool" in sample}
+        timeline.append({
+            "t": second,
+            "users": samples[-1]["users"] if samples else None,
+            "rps": requests,
+            "errors": errors,
+            "p95_ms": round(percentile(sorted(latencies), 95), 1),
+            "pool_utilization": max((pool["utilization"] for pool in workers.values()), default=None),
+            "threads_busy": sum(pool["threads"]["busy"] for pool in workers.values()) if workers else None,
+            "admission_waiting": sum(
+                group["waiting"] for pool in workers.values() for group in pool["admission"].values()
+            ) if workers else None,
+            "loop_lag_ms": max((sample["loop_lag_ms"] for sample in samples), default=None),
+        })
+
+    pools = [sample["pool"] for sample in metrics.pool_samples if "pool" in sample]
+    return {
+        "duration_s": round(elapsed, 1),
+        "sessions": metrics.sessions,
+        "requests": total,
+        "rps": round(total / elapsed, 2),
+        "errors": sum(metrics.errors.values()),
+        "error_rate": round(sum(metrics.errors.values()) / total, 4) if total else 0.0,
+        "statuses": dict(sorted(metrics.statuses.items())),
+        "p50_ms": round(percentile(everything, 50), 1),
+        "p95_ms": round(percentile(everything, 95), 1),
+        "p99_ms": round(percentile(everything, 99), 1),
+        "routes": routes,
+        "pool": {
+            "workers_seen": len({pool["pid"] for pool in pools}),
+            "max_utilization": max((pool["utilization"] for pool in pools), default=None),
+            "saturated_share": round(sum(1 for pool in pools if pool["utilization"] >= 1) / len(pools), 3)
+            if pools else None,
+            "max_admission_waiting": max(
+                (sum(group["waiting"] for group in pool["admission"].values()) for pool in pools), default=None
+            ),
+        },
+        "max_loop_lag_ms": max((sample["loop_lag_ms"] for sample in metrics.pool_samples), default=None),
+        "timeline": timeline,
+    }
+
+
+def print_report(report: dict, timeline_step: int) -> None:
+    print(f"\n{'Route':40s} {'req':>8s} {'rps':>8s} {'err':>6s} {'p50':>8s} {'p95':>8s} {'p99':>8s}")
+    for route, stats in report["routes"].items():
+        print(f"{route:40s} {stats['requests']:>8d} {stats['rps']:>8.1f} {stats['errors']:>6d} "
+              f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f}")
+    print(f"{'TOTAL':40s} {report['requests']:>8d} {report['rps']:>8.1f} {report['errors']:>6d} "
+          f"{report['p50_ms']:>8.1f} {report['p95_ms']:>8.1f} {report['p99_ms']:>8.1f}")
+
+    print(f"\n{'t (s)':>6s} {'users':>6s} {'rps':>6s} {'err':>5s} {'p95 ms':>8s} {'pool':>6s} "
+          f"{'threads':>8s} {'queued':>7s} {'lag ms':>7s}")
+    for row in report["timeline"][::max(1, timeline_step)]:
+        def show(value, fmt):
+            return format(value, fmt) if value is not None else "-"
+        print(f"{row['t']:>6d} {show(row['users'], '>6d'):>6s} {row['rps']:>6d} {row['errors']:>5d} "
+              f"{row['p95_ms']:>8.1f} {show(row['pool_utilization'], '>6.0%'):>6s} "
+              f"{show(row['threads_busy'], '>8d'):>8s} {show(row['admission_waiting'], '>7d'):>7s} "
+              f"{show(row['loop_lag_ms'], '>7.1f'):>7s}")
+
+    pool = report["pool"]
+    print(f"\n{report['sessions']} sessions, {report['requests']} requests in {report['duration_s']}s "
+          f"({report['rps']} req/s), error rate {report['error_rate']:.2%}, statuses {report['statuses']}")
+    if pool["max_utilization"] is not None:
+        print(f"Pool: {pool['workers_seen']} workers seen, max utilization {pool['max_utilization']:.0%}, "
+              f"saturated in {pool['saturated_share']:.0%} of samples, "
+              f"max admission queue {pool['max_admission_waiting']}")
+    if report["max_loop_lag_ms"] and report["max_loop_lag_ms"] > 100:
+        print(f"Warning: client event loop lagged up to {report['max_loop_lag_ms']:.0f} ms; "
+              f"the load generator may be the bottleneck")
+
+
+async def run(args) -> dict:
+    limits = httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+    timeout = httpx.Timeout(args.timeout)
+    metrics = Metrics()
+    deadline = metrics.started + args.duration
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=timeout,
+                                 headers={"Accept-Encoding": "br, gzip"}) as client, \
+            httpx.AsyncClient(base_url=args.url) as monitor_client:
+        tasks = [asyncio.create_task(monitor(monitor_client, metrics, args.pool_interval, deadline))]
+        for number in range(args.users):
+            user = VirtualUser(client, metrics, random.Random(args.seed * 1_000_003 + number), args)
+            tasks.append(asyncio.create_task(user.run(deadline)))
+            if args.ramp_up:
+                await asyncio.sleep(args.ramp_up / args.users)
+        # Users stop at the deadline after their current request
+        await asyncio.gather(*tasks)
+    return build_report(metrics, time.perf_counter() - metrics.started)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replay frontend sessions with concurrent virtual users")
+    parser.add_argument("--url", default="http://localhost:8000", help="Server base URL")
+    parser.add_argument("--users", type=int, default=1000, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=120, help="Test length in seconds (incl. ramp-up)")
+    parser.add_argument("--ramp-up", type=float, default=30, help="Seconds to start all users")
+    parser.add_argument("--think-min", type=float, default=2.0, help="Min pause between actions (s)")
+    parser.add_argument("--think-max", type=float, default=8.0, help="Max pause between actions (s)")
+    parser.add_argument("--actions-min", type=int, default=3, help="Min actions per session")
+    parser.add_argument("--actions-max", type=int, default=12, help="Max actions per session")
+    parser.add_argument("--max-connections", type=int, default=None, help="Client connections (default: users)")
+    parser.add_argument("--timeout", type=float, default=30, help="Request timeout (s)")
+    parser.add_argument("--pool-interval", type=float, default=1.0, help="Server pool polling interval (s)")
+    parser.add_argument("--seed", type=int, default=42, help="Virtual user random seed")
+    parser.add_argument("--timeline-step", type=int, default=5, help="Print every Nth second of the timeline")
+    parser.add_argument("--report", default=None, help="Write the full report as JSON")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="Fail above this error rate")
+    parser.add_argument("--p95-budget-ms", type=float, default=None, help="Fail when the overall p95 exceeds this")
+    args = parser.parse_args()
+    args.max_connections = args.max_connections or args.users
+
+    print(f"{args.users} users against {args.url} for {args.duration:.0f}s (ramp-up {args.ramp_up:.0f}s)...")
+    report = asyncio.run(run(args))
+    print_report(report, args.timeline_step)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), **report}, f, indent=2)
+        print(f"Report written to {args.report}")
+
+    failed = report["error_rate"] > args.max_error_rate
+    if args.p95_budget_ms is not None and report["p95_ms"] > args.p95_budget_ms:
+        print(f"p95 {report['p95_ms']:.1f} ms exceeds the budget of {args.p95_budget_ms:.1f} ms")
+        failed = True
+    if report["error_rate"] > args.max_error_rate:
+        print(f"Error rate {report['error_rate']:.2%} exceeds {args.max_error_rate:.2%}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
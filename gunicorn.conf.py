@@ -0,0 +1,104 @@
+"""
+Tarihi Yarimada CBS - Gunicorn Configuration
+Production server: preloaded app, uvicorn workers, connection-aware sizing
+
+The app is imported once in the master (preload_app) and forked, so
+workers share its memory copy-on-write and boot without re-importing.
+Worker count and per-worker pool sizes are derived from the CPU count and
+the Postgres connection budget of this instance (DB_MAX_CONNECTIONS), so
+that scaling workers never exceeds the server's connection limit:
+
+    workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW + 1 LISTEN + 1 EXPLAIN) <= DB_MAX_CONNECTIONS
+
+LISTEN (cache invalidation) and EXPLAIN (slow query plan capture, its own
+unpooled engine) connections are held outside the pool. The snapshot
+builder and sprite rebuilder check out pooled connections, so the pool is
+sized BACKGROUND_DB_CONNECTIONS above the request share, and admission
+control leaves those out.
+
+Explicit WEB_CONCURRENCY / DB_POOL_SIZE / DB_MAX_OVERFLOW / THREADPOOL_SIZE
+values always win over the derived ones.
+
+Usage:
+    gunicorn -c gunicorn.conf.py
+"""
+
+import multiprocessing
+import os
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.config import BACKGROUND_DB_CONNECTIONS, load_environment  # noqa: E402
+
+load_environment()
+
+# Connections each worker holds outside its pool
+LISTEN_CONNECTIONS_PER_WORKER = 1       # cache invalidation (LISTEN)
+EXPLAIN_CONNECTIONS_PER_WORKER = 1      # slow query plan capture (NullPool engine)
+UNPOOLED_CONNECTIONS_PER_WORKER = LISTEN_CONNECTIONS_PER_WORKER + EXPLAIN_CONNECTIONS_PER_WORKER
+# Two for requests, the background jobs' share of the pool, and the unpooled ones
+MIN_CONNECTIONS_PER_WORKER = 2 + BACKGROUND_DB_CONNECTIONS + UNPOOLED_CONNECTIONS_PER_WORKER
+
+
+def derive_sizing(cpu_count: int, max_connections: int) -> dict:
+    """Worker count and per-worker pool sizes within the connection budget"""
+    workers = int(os.getenv("WEB_CONCURRENCY") or 0) or max(
+        1, min(cpu_count * 2 + 1, max_connections // MIN_CONNECTIONS_PER_WORKER)
+    )
+    # Pool + overflow, including the background jobs' share
+    per_worker = max(2 + BACKGROUND_DB_CONNECTIONS, max_connections // workers - UNPOOLED_CONNECTIONS_PER_WORKER)
+    pool_size = int(os.getenv("DB_POOL_SIZE") or 0) or max(1, per_worker // 2)
+    max_overflow = int(os.getenv("DB_MAX_OVERFLOW") or -1)
+    if max_overflow < 0:
+        max_overflow = max(0, per_worker - pool_size)
+    return {"workers": workers, "pool_size": pool_size, "max_overflow": max_overflow}
+
+
+sizing = derive_sizing(multiprocessing.cpu_count(), int(os.getenv("DB_MAX_CONNECTIONS", "40")))
+
+# Read by app.config.Settings when the app is preloaded below
+os.environ["DB_POOL_SIZE"] = str(sizing["pool_size"])
+os.environ["DB_MAX_OVERFLOW"] = str(sizing["max_overflow"])
+
+
+# ==================================================
+# Server
+# ==================================================
+
+wsgi_app = "app.main:app"
+chdir = str(BACKEND_DIR)
+preload_app = True
+
+workers = sizing["workers"]
+worker_class = "uvicorn.workers.UvicornWorker"
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+timeout = 120
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = "-"
+errorlog = "-"
+
+
+# ==================================================
+# Hooks
+# ==================================================
+
+def on_starting(server):
+    server.log.info(
+        "Workers: %d, DB pool per worker: %d + %d overflow (budget %s connections)",
+        sizing["workers"], sizing["pool_size"], sizing["max_overflow"],
+        os.getenv("DB_MAX_CONNECTIONS", "40")
+    )
+
+
+def post_fork(server, worker):
+    """Drop pooled connections inherited from the master"""
+    from app.db.database import get_engine
+
+    if get_engine.cache_info().currsize:
+        # close=False: leave the parent's sockets alone, just forget them
+        get_engine().dispose(close=False)
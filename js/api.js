@@ -149,7 +149,8 @@ const API = (function() {
 
     /**
      * Tüm yapıları getir
-     * @param {object} params - { asset_type, historical_period, neighborhood, search, limit, offset }
+     * @param {object} params - { asset_type, historical_period, neighborhood, search, limit, offset,
+     *                            fields: 'id,name_tr,longitude,latitude', lang: 'tr'|'en' }
      */
     async function getAssets(params = {}) {
         return get('/assets', params);
@@ -157,19 +158,28 @@ const API = (function() {
 
     /**
      * Tek bir yapıyı getir (ID ile)
+     * @param {object} params - { fields, lang: 'tr'|'en' }
      */
-    async function getAsset(id) {
-        return get(`/assets/${id}`);
+    async function getAsset(id, params = {}) {
+        return get(`/assets/${id}`, params);
     }
 
     /**
      * Yapıları GeoJSON formatında getir
-     * @param {object} params - { asset_type, historical_period, bbox }
+     * @param {object} params - { asset_type, historical_period, bbox, lang: 'tr'|'en' }
      */
     async function getAssetsGeoJSON(params = {}) {
         return get('/assets/geojson', params);
     }
 
+    /**
+     * Çizilen poligon veya tamponlu hat içindeki yapıları seç
+     * @param {object} data - { geometry, buffer_m, output: 'features'|'ids', asset_type, limit }
+     */
+    async function selectAssets(data) {
+        return post('/assets/select', data);
+    }
+
     /**
      * Yapı identifier ile getir (örn: HA-0001)
      */
@@ -186,11 +196,45 @@ const API = (function() {
 
     /**
      * Yapının medyalarını getir
+     * Yerel görseller için srcset (WebP) ve srcset_avif alanları
+     * /images/derived/{genişlik}/... türevlerini listeler
      */
     async function getAssetMedia(assetId) {
         return get(`/assets/${assetId}/media`);
     }
 
+    /**
+     * Yapıya fotoğraf yükle (multipart, "file" alanı)
+     * Aynı dosya tekrar yüklenirse mevcut medya döner (200)
+     */
+    async function uploadAssetMedia(assetId, file, options = {}) {
+        const params = new URLSearchParams();
+        if (options.caption) params.set('caption', options.caption);
+        if (options.mediaType) params.set('media_type', options.mediaType);
+        if (options.isPrimary) params.set('is_primary', 'true');
+
+        const form = new FormData();
+        form.append('file', file);
+
+        // Content-Type (boundary) tarayıcı tarafından ayarlanır; büyük dosyalar için zaman aşımı yok
+        const response = await fetch(`${config.baseUrl}/assets/${assetId}/media/upload?${params}`, {
+            method: 'POST',
+            body: form
+        });
+        if (!response.ok) {
+            throw new Error(`HTTP Error: ${response.status} ${response.statusText}`);
+        }
+        return response.json();
+    }
+
+    /**
+     * Ana fotoğraf sprite atlas indeksini getir
+     * { cell, sheets: [{ url, width, height }], assets: { identifier: { sheet, x, y } } }
+     */
+    async function getSpriteIndex() {
+        return get('/sprites');
+    }
+
     /**
      * Yapı istatistiklerini getir
      */
@@ -198,6 +242,14 @@ const API = (function() {
         return get('/assets/stats/summary');
     }
 
+    /**
+     * Kamera görüş alanındaki yapıları getir (önem sırasına göre, önerilen LOD ile)
+     * @param {object} data - { camera: { longitude, latitude, height, heading, pitch, roll }, fov, aspect_ratio, screen_height, max_results }
+     */
+    async function getVisibleAssets(data) {
+        return post('/viewer/visible', data);
+    }
+
     // ============================================
     // Segments API (3D Model Parçaları)
     // ============================================
@@ -328,10 +380,14 @@ const API = (function() {
         getAssets,
         getAsset,
         getAssetsGeoJSON,
+        selectAssets,
         getAssetByIdentifier,
         getAssetActors,
         getAssetMedia,
+        uploadAssetMedia,
+        getSpriteIndex,
         getAssetsStats,
+        getVisibleAssets,
         
         // Legacy/Uyumluluk (eski kod için)
         getBuildings,
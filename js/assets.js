@@ -254,6 +254,25 @@ const AssetsData = {
             console.error('Media yüklenirken hata:', error);
             return [];
         }
+    },
+
+    /**
+     * Ana fotoğraf küçük resimlerinin sprite atlas indeksini yükle
+     * (tüm liste için tek JSON + birkaç sprite görseli)
+     */
+    async loadSpriteIndex() {
+        try {
+            const apiBaseUrl = this.getApiBaseUrl();
+            const response = await fetch(`${apiBaseUrl}/api/v1/sprites`);
+            if (!response.ok) {
+                console.warn(`Sprite indeksi yüklenemedi: ${response.status}`);
+                return null;
+            }
+            return await response.json();
+        } catch (error) {
+            console.error('Sprite indeksi yüklenirken hata:', error);
+            return null;
+        }
     }
 };
 
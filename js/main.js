@@ -368,6 +368,7 @@ const App = (function() {
                 button.className = 'dropdown-item';
                 button.dataset.asset = asset.id;
                 button.innerHTML = `
+                    <span class="asset-thumb" aria-hidden="true"></span>
                     <span class="asset-name">${asset.name}</span>
                     <span class="asset-period-tag">${asset.period}</span>
                 `;
@@ -384,6 +385,32 @@ const App = (function() {
         });
 
         console.log('Dropdown menüsü yapı tiplerine göre oluşturuldu:', orderedTypes);
+
+        applyAssetThumbnails(dropdownContent);
+    }
+
+    /**
+     * Liste küçük resimlerini sprite atlastan uygula (N yerine 1-2 görsel isteği)
+     */
+    async function applyAssetThumbnails(container) {
+        const index = await AssetsData.loadSpriteIndex();
+        if (!index || !index.cell) return;
+
+        const apiBaseUrl = AssetsData.getApiBaseUrl();
+        const thumbSize = 40;
+        const scale = thumbSize / index.cell;
+
+        container.querySelectorAll('.dropdown-item').forEach(button => {
+            const thumb = button.querySelector('.asset-thumb');
+            const position = index.assets[button.dataset.asset];
+            if (!thumb || !position) return;
+
+            const sheet = index.sheets[position.sheet];
+            thumb.style.backgroundImage = `url("${apiBaseUrl}${sheet.url}")`;
+            thumb.style.backgroundSize = `${sheet.width * scale}px ${sheet.height * scale}px`;
+            thumb.style.backgroundPosition = `-${position.x * scale}px -${position.y * scale}px`;
+            thumb.classList.add('loaded');
+        });
     }
 
     /**
@@ -508,10 +535,30 @@ const App = (function() {
                     img.src = imgUrl;
                     img.alt = item.caption || 'Fotoğraf';
                     img.loading = 'lazy';
+                    img.decoding = 'async';
                     img.onerror = () => {
                         galleryItem.style.display = 'none';
                     };
 
+                    // Küçültülmüş WebP/AVIF türevleri: panel genişliğine uygun olan indirilir
+                    const sizes = '(max-width: 768px) 100vw, 360px';
+                    const withBase = (srcset) => srcset.split(', ')
+                        .map(candidate => candidate.startsWith('/') ? `${apiBaseUrl}${candidate}` : candidate)
+                        .join(', ');
+                    let picture = null;
+                    if (item.srcset_avif) {
+                        picture = document.createElement('picture');
+                        const source = document.createElement('source');
+                        source.type = 'image/avif';
+                        source.srcset = withBase(item.srcset_avif);
+                        source.sizes = sizes;
+                        picture.appendChild(source);
+                    }
+                    if (item.srcset) {
+                        img.srcset = withBase(item.srcset);
+                        img.sizes = sizes;
+                    }
+
                     if (item.caption) {
                         const caption = document.createElement('span');
                         caption.className = 'gallery-caption';
@@ -519,7 +566,12 @@ const App = (function() {
                         galleryItem.appendChild(caption);
                     }
 
-                    galleryItem.appendChild(img);
+                    if (picture) {
+                        picture.appendChild(img);
+                        galleryItem.appendChild(picture);
+                    } else {
+                        galleryItem.appendChild(img);
+                    }
                     elements.photoGallery.appendChild(galleryItem);
                 });
             } else {
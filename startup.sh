@@ -6,12 +6,12 @@ cd /home/site/wwwroot
 # Virtual environment'ı aktifleştir
 source antenv/bin/activate
 
-# Gunicorn ile FastAPI uygulamasını başlat
-gunicorn backend.main:app \
-    --workers 2 \
-    --worker-class uvicorn.workers.UvicornWorker \
-    --bind 0.0.0.0:${PORT:-8000} \
-    --timeout 120 \
-    --access-logfile - \
-    --error-logfile -
+# Statik dosyalar CI'da derlenir (dist/static); yoksa burada derle
+if [ ! -f dist/static/manifest.json ]; then
+    python backend/scripts/build_static.py
+fi
 
+# Gunicorn ile FastAPI uygulamasını başlat
+# Worker sayısı ve bağlantı havuzu gunicorn.conf.py içinde CPU sayısı ve
+# DB_MAX_CONNECTIONS'a göre hesaplanır (WEB_CONCURRENCY ile geçersiz kılınabilir)
+gunicorn -c gunicorn.conf.py